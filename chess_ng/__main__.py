@@ -4,23 +4,35 @@ Created on Mon Feb  8 13:36:04 2021
 
 @author: Korean_Crimson
 """
+import argparse
+import functools
+import importlib
 import itertools
+import os
 import random
 import time
 from typing import Any, Callable, Optional
 
-from chess_ng import hashing, output
-from chess_ng.algorithm import (
-    Minimax,
-    evaluate_distance,
-    evaluate_length,
-    mating_strategy,
-)
+from chess_ng import hashing, output, pgn
+from chess_ng.algorithm import Minimax, mating_strategy
 from chess_ng.board import Board
 from chess_ng.cli import create_parser
-from chess_ng.consts import BLACK, LATE_VALUES, MID_VALUES, WHITE
+from chess_ng.consts import BLACK, LATE_VALUES, MID_VALUES, NNUE_PATH_VARIABLE, WHITE
+from chess_ng.engine import EVALUATIONS
 from chess_ng.fen import load_fen_notation
 from chess_ng.game import ChessPositionError, Game, GameParams
+from chess_ng.ponder import Ponderer
+from chess_ng.renderer import TerminalRenderer
+
+COMMANDS = {
+    "analyse": "chess_ng.analysis",
+    "epdtest": "chess_ng.epdtest",
+    "tune": "chess_ng.tuning",
+    "tournament": "chess_ng.tournament",
+    "uci": "chess_ng.uci",
+    "serve": "chess_ng.server",
+    "datagen": "chess_ng.datagen",
+}
 
 
 def move_player_automatically(game: Game, params: GameParams) -> None:
@@ -30,14 +42,22 @@ def move_player_automatically(game: Game, params: GameParams) -> None:
     game.player = BLACK if game.side_to_move == WHITE else WHITE
 
 
-def move_player_by_cli(game: Game, _: GameParams) -> None:
-    """Moves the player using input from stdin"""
+def move_player_by_cli(
+    game: Game, params: GameParams, ponderer: Optional[Ponderer] = None
+) -> None:
+    """Moves the player using input from stdin. If a ponderer is passed, the engine
+    searches the expected player reply while waiting for input.
+    """
+    if ponderer is not None:
+        ponderer.start(game, params)
     while True:
         try:
             source_square, dest_square = input(
                 "Input a source square to move from "
                 "and a destination square to move to (e.g. 'e2 e4'): "
             ).split()
+            if ponderer is not None:
+                ponderer.stop(game, source_square, dest_square)
             game.run_player(source_square, dest_square)
             return
         except ValueError:
@@ -46,13 +66,26 @@ def move_player_by_cli(game: Game, _: GameParams) -> None:
             print(f"Invalid input: {exc.message}")
 
 
+def configure_nnue(parser: argparse.ArgumentParser, args: Any) -> None:
+    """Passes the weights file of the --nnue option to the nnue evaluation through
+    the environment, which worker processes inherit, and reports weights which
+    cannot be loaded as a usage error if the nnue evaluation is used
+    """
+    if args.nnue is not None:
+        os.environ[NNUE_PATH_VARIABLE] = args.nnue
+    elif getattr(args, "eval_algorithm", None) != "nnue":
+        return
+    try:
+        EVALUATIONS["nnue"]()
+    except ValueError as exc:  # a NetworkFormatError
+        parser.error(str(exc))
+
+
 def init_game(args: Any) -> Game:
     """Initialises a game from CLI args"""
-    evaluation = (
-        evaluate_length
-        if args.eval_algorithm == "moves"  # type: ignore
-        else evaluate_distance
-    )
+    evaluation = EVALUATIONS.get(
+        args.eval_algorithm, EVALUATIONS["move-distance"]  # type: ignore
+    )()
     teams, _ = load_fen_notation(args.fen)  # type: ignore
     hash_values = hashing.get_hash_values(
         [x for team in teams.values() for x in team.pieces]
@@ -70,7 +103,7 @@ def run_game(
     moves: Optional[int] = 50,
 ):
     """Chess game function"""
-    logger.info(f"Depth: {params.depth}")
+    logger.info("Depth: %s", params.depth)
     iterable = range(moves) if isinstance(moves, int) else itertools.count()
     for i in iterable:
         if i > 15:
@@ -81,17 +114,34 @@ def run_game(
                 team.sort_pieces(LATE_VALUES)
 
         initial_time = time.time()
-        if game.side_to_move == game.player:
-            player_move_source(game, params)
-        else:
+        side = game.side_to_move
+        engine_move = side != game.player
+        if engine_move:
             game.run_team(params)
+        else:
+            player_move_source(game, params)
 
         if game.rating > params.mating_threshold:
             game.minimax.evaluation_function = mating_strategy
         for message in game.consume_messages():
             logger.info(message)
 
-        logger.info(f"Time taken for turn: {round(time.time() - initial_time, 1)}s")
+        elapsed = time.time() - initial_time
+        if len(game.moves) > i:
+            logger.info(
+                "Turn %s: %s",
+                i // 2 + 1,
+                game.moves[-1],
+                extra={
+                    "turn": i // 2 + 1,
+                    "side": side,
+                    "move": game.moves[-1],
+                    "score": game.rating if engine_move else None,
+                    "nodes": game.minimax.nodes if engine_move else None,
+                    "time": round(elapsed, 3),
+                },
+            )
+        logger.info("Time taken for turn: %ss", round(elapsed, 1))
         renderer(game.board)
         if game.is_over:
             break
@@ -103,24 +153,52 @@ def main():
     """Main function"""
     parser = create_parser()
     args = parser.parse_args()
+    configure_nnue(parser, args)
+    if args.command is not None:
+        # subcommand modules are imported on demand, so that short-lived processes
+        # do not pay for the imports (e.g. NumPy or asyncio) of the other commands
+        importlib.import_module(COMMANDS[args.command]).run_command(args)
+        return
+
     random.seed(args.seed)
     _output_logger = (
         output.NoLogger()
-        if args.disable_logs
-        else output.Logger(folder=args.log_folder, filename=args.log_filename_suffix)
+        if args.disable_logs or args.silent
+        else output.Logger(
+            folder=args.log_folder,
+            filename=args.log_filename_suffix,
+            # printed messages would break the redraw of the changed squares
+            console=args.renderer != "diff",
+        )
     )
+    game = init_game(args)
     with _output_logger as logger:
         logger.info("Seed: %s", args.seed)
         run_game(
-            init_game(args),
-            GameParams(depth=args.depth, resign_threshold=args.resign_threshold),
+            game,
+            GameParams(
+                depth=args.depth,
+                resign_threshold=args.resign_threshold,
+                multipv=args.multipv,
+            ),
             player_move_source=(
-                move_player_by_cli if args.mode == "cli" else move_player_automatically
+                functools.partial(
+                    move_player_by_cli, ponderer=Ponderer() if args.ponder else None
+                )
+                if args.mode == "cli"
+                else move_player_automatically
+            ),
+            renderer=(
+                (lambda _: None)
+                if args.silent
+                else TerminalRenderer(diff=args.renderer == "diff")
             ),
-            renderer=print,
             logger=logger,
             moves=args.max_moves,
         )
+    if args.pgn is not None:
+        with open(args.pgn, "w", encoding="utf-8") as file:
+            file.write(pgn.format_game(game, {"Event": "chess_ng game"}))
 
 
 if __name__ == "__main__":
@@ -4,21 +4,42 @@ Created on Fri Jan  7 14:33:33 2022
 
 @author: richa
 """
-import logging
+import contextlib
+import itertools
 import math
+import threading
+import time
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Protocol, Tuple, Union
-
-try:
-    import numpy as np
-except ImportError:
-    logging.warning("Failed to import numpy")
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+)
 
 from chess_ng.board import BitBoard, Board
 from chess_ng.hashing import compute_hash
 from chess_ng.interfaces import Piece
 from chess_ng.move import Move
 from chess_ng.piece import King
+from chess_ng.tables import (
+    EXACT,
+    LOWER_BOUND,
+    UPPER_BOUND,
+    HistoryTable,
+    KillerTable,
+    MoveKey,
+    TranspositionTable,
+)
+
+if TYPE_CHECKING:
+    import numpy as np  # imported where needed, as it is slow to import
 
 Number = Union[int, float]
 
@@ -27,6 +48,7 @@ class _TeamInterface(Protocol):
 
     king: King
     pieces: List[Piece]
+    representation: str
 
     def compute_all_moves(  # pylint: disable=missing-function-docstring
         self, board: Board
@@ -131,57 +153,206 @@ def mating_strategy(board: Board, team: _TeamInterface, enemy: _TeamInterface):
     )
 
 
+@lru_cache(maxsize=None)
+def inverse_distances(
+    size: int = 8,
+) -> Dict[Tuple[int, int], Dict[Tuple[int, int], float]]:
+    """Returns a table of the inverse euclidean distances between all squares,
+    looked up by both squares. The inverse distance of a square to itself is 1.
+    """
+    squares = list(itertools.product(range(size), repeat=2))
+    table: Dict[Tuple[int, int], Dict[Tuple[int, int], float]] = {}
+    for x1, y1 in squares:  # pylint: disable=invalid-name
+        row = table[x1, y1] = {}
+        for x2, y2 in squares:  # pylint: disable=invalid-name
+            value = math.sqrt((x1 - x2) ** 2 + abs(y1 - y2) ** 2)
+            row[x2, y2] = 1 / value if value else 1
+    return table
+
+
 def evaluate_distance(board: Board, team: _TeamInterface, enemy: _TeamInterface):
     """Evaluates board state based on the closeness to the enemy king"""
-
     # HACK: using compute_all_moves instead of compute_valid_moves to save computation time
-    # pylint: disable=invalid-name
-    def inverse_distance(point1: Tuple[int, int], point2: Tuple[int, int]):
-        x1, y1 = point1
-        x2, y2 = point2
-        value = math.sqrt((x1 - x2) ** 2 + abs(y1 - y2) ** 2)
-        if value == 0:
-            return 1
-        return 1 / value
-
+    table = inverse_distances(board.size)
+    enemy_king_distances = table[enemy.king.position]
+    king_distances = table[team.king.position]
     sum_ally = sum(
-        inverse_distance(enemy.king.position, move.position)
-        for _, move in team.compute_all_moves(board)
+        enemy_king_distances[move.position] for _, move in team.compute_all_moves(board)
     )
     sum_enemy = sum(
-        inverse_distance(team.king.position, move.position)
-        for _, move in enemy.compute_all_moves(board)
+        king_distances[move.position] for _, move in enemy.compute_all_moves(board)
     )
     return sum_ally - sum_enemy
 
 
+@lru_cache(maxsize=None)
+def inverse_distance_array(size: int = 8) -> "np.ndarray":
+    """Returns the inverse_distances table as an array indexed by y * size + x"""
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    table = inverse_distances(size)
+    squares = sorted(table, key=lambda square: (square[1], square[0]))
+    return np.array([[table[square][other] for other in squares] for square in squares])
+
+
+def inverse_distance_sums(
+    origins: "np.ndarray", targets: "np.ndarray", batch: "np.ndarray", size: int = 8
+) -> "np.ndarray":
+    """Sums the inverse distances of batches of target squares to the origin square
+    of their batch. Squares are indexed by y * size + x. The batch array contains
+    the batch index of each target square.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    values = inverse_distance_array(size)[origins[batch], targets]
+    return np.bincount(batch, weights=values, minlength=len(origins))
+
+
 def evaluate_distance_np(
     board: Board, team: _TeamInterface, enemy: _TeamInterface
 ) -> float:
-    """Evaluates board state based on the closeness to the enemy king"""
-    # seems to lead to very wonky games...
-    ally_moves = np.array([move.position for _, move in team.compute_all_moves(board)])  # type: ignore #pylint: disable=line-too-long
-    enemy_moves = np.array(  # type: ignore
-        [move.position for _, move in enemy.compute_all_moves(board)]
+    """Evaluates board state based on the closeness to the enemy king, like
+    evaluate_distance (up to floating point rounding), using a table gather.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    ally_moves = [move.position for _, move in team.compute_all_moves(board)]
+    enemy_moves = [move.position for _, move in enemy.compute_all_moves(board)]
+    squares = np.array(ally_moves + enemy_moves, dtype=int).reshape(-1, 2)  # type: ignore
+    targets = squares[:, 1] * board.size + squares[:, 0]
+    batch = np.repeat([0, 1], [len(ally_moves), len(enemy_moves)])  # type: ignore
+    kings = np.array(  # type: ignore
+        [
+            enemy.king.position[1] * board.size + enemy.king.position[0],
+            team.king.position[1] * board.size + team.king.position[0],
+        ]
     )
-    king_position = np.array([team.king.position])  # type: ignore
-    enemy_king_position = np.array([enemy.king.position])  # type: ignore
-    ally_distances: float = np.linalg.norm(enemy_king_position - ally_moves)  # type: ignore
-    enemy_distances: float = np.linalg.norm(king_position - enemy_moves)  # type: ignore
-    return enemy_distances - ally_distances
+    sum_ally, sum_enemy = inverse_distance_sums(kings, targets, batch, board.size)
+    return float(sum_ally - sum_enemy)
+
+
+class BatchEvaluation(Protocol):
+    """Protocol of evaluation functions which can also score batches of positions
+    encoded as arrays. Minimax scores all children of nodes at depth 1 in a single
+    evaluate_batch call instead of evaluating them one by one.
+    """
+
+    def __call__(  # pylint: disable=missing-function-docstring
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number: ...
+
+    def encode(self, board: Board) -> Any:
+        """Encodes the board as a one-dimensional array"""
+
+    def encode_move(
+        self, position: Any, piece: Piece, destination: Tuple[int, int], size: int
+    ) -> None:
+        """Updates the encoded position in place to the position after the move"""
+
+    def evaluate_batch(
+        self, positions: Any, team: _TeamInterface, enemy: _TeamInterface
+    ) -> List[Number]:
+        """Scores the encoded positions, stacked along the first axis"""
+
+
+class _SearchCancelled(Exception):
+    """Raised inside the search to unwind it once it has been cancelled"""
+
+
+class Event(Protocol):
+    """Protocol of a threading.Event, e.g. also implemented by multiprocessing events"""
+
+    def set(self) -> None: ...  # pylint: disable=missing-function-docstring
+
+    def is_set(self) -> bool: ...  # pylint: disable=missing-function-docstring
+
+
+class CancellationToken:
+    """Thread-safe stop flag for a running search. The token can either be
+    cancelled explicitly (e.g. from another thread) or expire automatically
+    once the optional timeout in seconds has elapsed. To cancel a search running
+    in another process, a multiprocessing (manager) event can be passed in.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, event: Optional[Event] = None):
+        self._event: Event = threading.Event() if event is None else event
+        self.deadline: Optional[float] = (
+            None if timeout is None else time.monotonic() + timeout
+        )
+
+    def cancel(self) -> None:
+        """Requests the search using this token to stop"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Returns True if the token was cancelled or its deadline has passed"""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self._event.set()
+        return self._event.is_set()
 
 
 @dataclass
-class Minimax:
-    """Minimax algorithm class with alpha-beta pruning and customizable evaluation"""
+class Minimax:  # pylint: disable=too-many-instance-attributes
+    """Minimax algorithm class with alpha-beta pruning and customizable evaluation.
+
+    The search checks the optional cancellation token every check_interval nodes
+    and stops once more than max_nodes nodes have been searched.
+
+    The transposition table, killer moves and history heuristic are kept between
+    searches, so that consecutive searches in a game reuse each others work.
+    Call new_search before searching the next position of a game to age them.
+
+    If the evaluation function is a BatchEvaluation, the children of nodes at
+    depth 1 are scored in a single vectorized call. These leaves are neither
+    looked up in nor stored to the transposition table.
+    """
 
     evaluation_function: Callable[[Board, _TeamInterface, _TeamInterface], float]
     hash_values: Dict[str, int]
+    cancellation_token: Optional[CancellationToken] = None
+    check_interval: int = 256
+    max_nodes: Optional[int] = None
 
     def __post_init__(self):
-        self.board_hashes: Dict[int, Number] = {}
-
-    # pylint: disable=too-many-arguments,too-many-locals,too-many-branches #for now...
+        self.transposition_table = TranspositionTable()
+        self.killers = KillerTable()
+        self.history = HistoryTable()
+        self.nodes: int = 0
+        self.stopped: bool = False
+        self.best_so_far: Optional[Tuple[Number, Tuple[Piece, Move]]] = None
+        self.principal_variation: List[Tuple[Piece, Move]] = []
+        self._pv_table: Dict[int, List[Tuple[Piece, Move]]] = {}
+        self._seeds: Dict[int, List[MoveKey]] = {}
+        self._seed: List[MoveKey] = []
+        self._history_length: int = 0
+        self._saved_result: Optional[
+            Tuple[int, int, Tuple[Number, Optional[Tuple[Piece, Move]]]]
+        ] = None
+
+    def new_search(self, board: Board) -> None:
+        """Ages the tables kept between searches: starts a new transposition table
+        generation, decays the history scores and moves the killer moves closer to
+        the root by the amount of plies played since the last search.
+        """
+        plies = len(board.move_history) - self._history_length
+        self._history_length = len(board.move_history)
+        self.transposition_table.new_generation()
+        self.history.decay()
+        self.killers.shift(max(plies, 0))
+
+    def clear(self) -> None:
+        """Drops the tables kept between searches, so that the next search does not
+        depend on the previous ones, e.g. when searching unrelated positions.
+        """
+        self.transposition_table.clear()
+        self.killers.clear()
+        self.history.clear()
+        self._seeds = {}
+        self._saved_result = None
+        self._history_length = 0
+
+    # pylint: disable=too-many-arguments
     def run(
         self,
         board: Board,
@@ -191,51 +362,348 @@ class Minimax:
         maximizing_player: bool,
         alpha: Number = -math.inf,
         beta: Number = math.inf,
+        root_moves: Optional[List[Tuple[Piece, Move]]] = None,
     ) -> Tuple[Number, Optional[Tuple[Piece, Move]]]:
         """Minimax algorithm with alpha-beta pruning.
         At depth=3, computation speed is still relatively fast.
         At depth=4, it slows down considerably, but does make much better moves.
+
+        The valid root moves can be passed in if they have already been computed.
+        If the position was expected by the principal variation of the previous
+        search, the rest of that variation is searched first.
+
+        If the cancellation token is cancelled during the search, the search stops
+        and the best root move found so far is returned instead. This move is also
+        available as best_so_far while the search is still running.
         """
+        saved_result = self._pop_saved_result(board, depth)
+        if saved_result is not None and maximizing_player:
+            return saved_result
+
+        self.nodes = 0
+        self.stopped = False
+        self.best_so_far = None
+        self.principal_variation = []
+        self._seed = self._seeds.get(compute_hash(board, self.hash_values), [])
+        try:
+            result = self._search(
+                board,
+                team,
+                enemy,
+                depth,
+                maximizing_player,
+                alpha,
+                beta,
+                root_moves=root_moves,
+                on_seed=bool(self._seed),
+            )
+        except _SearchCancelled:
+            self.stopped = True
+            if self.best_so_far is not None:
+                return self.best_so_far
+            return self._fallback(board, team, enemy, maximizing_player)
+        self._seeds = self._compute_seeds(board, team, enemy)
+        return result
+
+    # pylint: disable=too-many-arguments
+    def run_multipv(
+        self,
+        board: Board,
+        team: _TeamInterface,
+        enemy: _TeamInterface,
+        depth: int,
+        lines: int,
+        root_moves: Optional[List[Tuple[Piece, Move]]] = None,
+    ) -> List[Tuple[Number, List[Tuple[Piece, Move]]]]:
+        """Searches the best lines for the team. Returns up to the specified amount
+        of lines as scores and principal variations, best line first.
+
+        All root moves are searched in a single pass, sharing the transposition table.
+        Each root move is searched with a window starting at the score of the worst
+        line found so far, so only moves making it into the lines get exact scores.
+        If the search is cancelled, the lines found so far are returned.
+        """
+        self.nodes = 0
+        self.stopped = False
+        self.best_so_far = None
+        self.principal_variation = []
+        self._seed = []
+        found: List[Tuple[Number, List[Tuple[Piece, Move]]]] = []
+        if board.is_draw():
+            return found
 
+        if root_moves is None:
+            root_moves = team.compute_valid_moves(board, enemy.pieces)
+        entry = self.transposition_table.get(self._table_key(board, True, team))
+        moves = self._order_moves(
+            root_moves, 0, None if entry is None else entry.move, None
+        )
+        try:
+            for piece, move in moves:
+                alpha = found[-1][0] if len(found) >= lines else -math.inf
+                with ReversibleMove(board, piece, move.position, enemy.pieces):
+                    score = self._search(
+                        board, team, enemy, depth - 1, False, alpha, math.inf, ply=1
+                    )[0]
+                if len(found) < lines or score > alpha:
+                    found.append((score, [(piece, move)] + self._pv_table.get(1, [])))
+                    found.sort(key=lambda line: line[0], reverse=True)
+                    del found[lines:]
+                    self.best_so_far = (found[0][0], found[0][1][0])
+                    self.principal_variation = found[0][1]
+        except _SearchCancelled:
+            self.stopped = True
+            return found
+        self._seeds = self._compute_seeds(board, team, enemy)
+        return found
+
+    def save_result(
+        self,
+        hash_: int,
+        depth: int,
+        result: Tuple[Number, Optional[Tuple[Piece, Move]]],
+    ) -> None:
+        """Saves a search result computed ahead of time (e.g. while pondering) for
+        the position with the specified hash. The next run on that position with
+        the same depth returns the saved result instead of searching again.
+        """
+        self._saved_result = (hash_, depth, result)
+
+    def _pop_saved_result(
+        self, board: Board, depth: int
+    ) -> Optional[Tuple[Number, Optional[Tuple[Piece, Move]]]]:
+        if self._saved_result is None:
+            return None
+        hash_, saved_depth, result = self._saved_result
+        self._saved_result = None
+        if saved_depth != depth or hash_ != compute_hash(board, self.hash_values):
+            return None
+        return result
+
+    def _fallback(
+        self,
+        board: Board,
+        team: _TeamInterface,
+        enemy: _TeamInterface,
+        maximizing_player: bool,
+    ) -> Tuple[Number, Optional[Tuple[Piece, Move]]]:
+        """Returns the first valid move with a static evaluation of the position,
+        used when the search was cancelled before any root move was searched.
+        """
+        moves = (
+            team.compute_valid_moves(board, enemy.pieces)
+            if maximizing_player
+            else enemy.compute_valid_moves(board, team.pieces)
+        )
+        evaluation = self.evaluation_function(board, team, enemy)
+        return evaluation, (moves[0] if moves else None)
+
+    def _check_cancelled(self) -> None:
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _SearchCancelled
+        if (
+            self.cancellation_token is not None
+            and not self.nodes % self.check_interval
+            and self.cancellation_token.cancelled
+        ):
+            raise _SearchCancelled
+
+    def _compute_seeds(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Dict[int, List[MoveKey]]:
+        """Replays the principal variation, returning the hashes of the positions
+        after the first and second move, mapped to the rest of the variation.
+        """
+        keys: List[MoveKey] = []
+        hashes: List[int] = []
+        with contextlib.ExitStack() as stack:
+            for piece, move in self.principal_variation:
+                if piece.captured:
+                    break
+                keys.append((piece.position, move.position))
+                others = enemy if piece.team == team.representation else team
+                stack.enter_context(
+                    ReversibleMove(board, piece, move.position, others.pieces)
+                )
+                hashes.append(compute_hash(board, self.hash_values))
+        return {hash_: keys[i:] for i, hash_ in enumerate(hashes[:2], 1)}
+
+    # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+    def _search(
+        self,
+        board: Board,
+        team: _TeamInterface,
+        enemy: _TeamInterface,
+        depth: int,
+        maximizing_player: bool,
+        alpha: Number,
+        beta: Number,
+        ply: int = 0,
+        root_moves: Optional[List[Tuple[Piece, Move]]] = None,
+        on_seed: bool = False,
+    ) -> Tuple[Number, Optional[Tuple[Piece, Move]]]:
+        self._check_cancelled()
+        self._pv_table[ply] = []
         if board.is_draw():
             return 0, None
 
+        root = ply == 0
+        key = self._table_key(board, maximizing_player, team)
+        entry = self.transposition_table.get(key)
+        if entry is not None and not root and entry.depth >= depth:
+            if (
+                entry.flag == EXACT
+                or (entry.flag == LOWER_BOUND and entry.score >= beta)
+                or (entry.flag == UPPER_BOUND and entry.score <= alpha)
+            ):
+                if entry.flag == EXACT and entry.move is not None:
+                    self._pv_table[ply] = [self._to_piece_move(board, entry.move)]
+                return entry.score, None
+
         if depth == 0:  # or game over
             evaluation = self.evaluation_function(board, team, enemy)
-            hash_ = compute_hash(board, self.hash_values)
-            self.board_hashes[hash_] = evaluation
+            self.transposition_table.store(key, evaluation, 0, EXACT)
             return evaluation, None
 
-        if maximizing_player:
-            best_move = None
-            for piece, move in team.compute_valid_moves(board, enemy.pieces):
-                with ReversibleMove(board, piece, move.position, enemy.pieces):
-                    hash_ = compute_hash(board, self.hash_values)
-                    eval_position = self.board_hashes.get(
-                        hash_,
-                        self.run(board, team, enemy, depth - 1, False, alpha, beta)[0],
-                    )
-
-                if eval_position > alpha:
-                    best_move = (piece, move)
-                alpha = max(alpha, eval_position)
-                if eval_position >= beta or beta <= alpha:
-                    break
-            return alpha, best_move
-
-        min_move = None
-        for piece, move in enemy.compute_valid_moves(board, team.pieces):
-            with ReversibleMove(board, piece, move.position, team.pieces):
-                hash_ = compute_hash(board, self.hash_values)
-                eval_position = self.board_hashes.get(
-                    hash_,
-                    self.run(board, team, enemy, depth - 1, True, alpha, beta)[0],
-                )
+        side, other = (team, enemy) if maximizing_player else (enemy, team)
+        if root_moves is None:
+            root_moves = side.compute_valid_moves(board, other.pieces)
+        seed_move = self._seed[ply] if on_seed and ply < len(self._seed) else None
+        moves = self._order_moves(
+            root_moves, ply, None if entry is None else entry.move, seed_move
+        )
 
-            if eval_position < beta:
-                min_move = (piece, move)
-            beta = min(beta, eval_position)
-            if eval_position <= alpha or beta <= alpha:
+        scores: Optional[List[Number]] = None
+        if depth == 1 and self._can_evaluate_batch(board):
+            scores = self._evaluate_children(board, team, enemy, moves)
+            self._pv_table[ply + 1] = []
+
+        alpha_, beta_ = alpha, beta
+        best_move: Optional[Tuple[Piece, Move]] = None
+        best_key: Optional[MoveKey] = None
+        for index, (piece, move) in enumerate(moves):
+            move_key = (piece.position, move.position)
+            if scores is not None:
+                eval_position = scores[index]
+            else:
+                with ReversibleMove(board, piece, move.position, other.pieces):
+                    eval_position = self._search(
+                        board,
+                        team,
+                        enemy,
+                        depth - 1,
+                        not maximizing_player,
+                        alpha,
+                        beta,
+                        ply=ply + 1,
+                        on_seed=move_key == seed_move,
+                    )[0]
+
+            if maximizing_player and eval_position > alpha:
+                alpha = eval_position
+                best_move, best_key = (piece, move), move_key
+                self._update_pv(ply, best_move, root)
+            elif not maximizing_player and eval_position < beta:
+                beta = eval_position
+                best_move, best_key = (piece, move), move_key
+                self._update_pv(ply, best_move, root)
+            elif root and best_move is None:
+                # keeps a legal move if all moves fail low, e.g. as they lose to mates
+                best_move = piece, move
+                self._update_pv(ply, best_move, root)
+
+            if root and best_move is not None:
+                self.best_so_far = (alpha if maximizing_player else beta, best_move)
+            if beta <= alpha:
+                if not move.can_capture:
+                    self.killers.add(ply, move_key)
+                    self.history.add((piece.representation, move.position), depth)
                 break
 
-        return beta, min_move
+        value = alpha if maximizing_player else beta
+        if value <= alpha_:
+            flag = UPPER_BOUND
+        elif value >= beta_:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, value, depth, flag, best_key)
+        return value, best_move
+
+    def _can_evaluate_batch(self, board: Board) -> bool:
+        return isinstance(board, Board) and hasattr(
+            self.evaluation_function, "evaluate_batch"
+        )
+
+    def _evaluate_children(
+        self,
+        board: Board,
+        team: _TeamInterface,
+        enemy: _TeamInterface,
+        moves: List[Tuple[Piece, Move]],
+    ) -> List[Number]:
+        """Scores the positions after all moves in a single batch evaluation call.
+        The positions are encoded from the encoded parent, without making the moves.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        evaluation: BatchEvaluation = self.evaluation_function  # type: ignore
+        parent = evaluation.encode(board)
+        positions = np.repeat(parent[np.newaxis], len(moves), axis=0)
+        draws: List[bool] = []
+        for position, (piece, move) in zip(positions, moves):
+            self._check_cancelled()
+            draws.append(board.is_draw_after(piece, move.position))
+            evaluation.encode_move(position, piece, move.position, board.size)
+        scores = evaluation.evaluate_batch(positions, team, enemy)
+        return [0 if draw else score for draw, score in zip(draws, scores)]
+
+    def _table_key(
+        self, board: Board, maximizing_player: bool, team: _TeamInterface
+    ) -> Tuple[int, bool, str]:
+        """Returns the transposition table key. The scores depend on the side to move
+        and the team from whose perspective the position is evaluated.
+        """
+        return (
+            compute_hash(board, self.hash_values),
+            maximizing_player,
+            team.representation,
+        )
+
+    def _order_moves(
+        self,
+        moves: List[Tuple[Piece, Move]],
+        ply: int,
+        hash_move: Optional[MoveKey],
+        seed_move: Optional[MoveKey],
+    ) -> List[Tuple[Piece, Move]]:
+        """Orders the moves by: principal variation of the previous search,
+        transposition table move, captures, killer moves and history score.
+        """
+        killers = self.killers[ply]
+
+        def priority(piece_move: Tuple[Piece, Move]):
+            piece, move = piece_move
+            key = (piece.position, move.position)
+            return (
+                key == seed_move,
+                key == hash_move,
+                move.can_capture,
+                key in killers,
+                self.history[(piece.representation, move.position)],
+            )
+
+        return sorted(moves, key=priority, reverse=True)
+
+    @staticmethod
+    def _to_piece_move(board: Board, key: MoveKey) -> Tuple[Piece, Move]:
+        source, destination = key
+        piece: Piece = board[source]  # type: ignore
+        return piece, Move(destination, can_capture=not board.is_empty_at(destination))
+
+    def _update_pv(self, ply: int, piece_move: Tuple[Piece, Move], root: bool):
+        """Prepends the new best move to the principal variation of the child node"""
+        self._pv_table[ply] = [piece_move] + self._pv_table.get(ply + 1, [])
+        if root:
+            self.principal_variation = self._pv_table[ply]
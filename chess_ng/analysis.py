@@ -0,0 +1,201 @@
+"""Module containing the batch analysis of positions read from FEN or EPD lines"""
+
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import json
+import math
+import sys
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    TextIO,
+    TypeVar,
+)
+
+from chess_ng.algorithm import Minimax
+from chess_ng.engine import SearchLimits, analyse, create_minimax
+from chess_ng.epd import EpdError, parse_epd
+from chess_ng.fen import FenNotationError
+
+Record = Dict[str, Any]
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+_MINIMAX: Optional[Minimax] = None  # reused by all searches of a worker process
+
+
+def init_worker(evaluation: str) -> None:
+    """Creates the minimax instance reused by the worker for all its positions"""
+    global _MINIMAX  # pylint: disable=global-statement
+    _MINIMAX = create_minimax(evaluation)
+
+
+def worker_minimax() -> Optional[Minimax]:
+    """Returns the minimax instance of the worker created by init_worker"""
+    return _MINIMAX
+
+
+def create_executor(
+    workers: int, evaluation: Optional[str] = None
+) -> concurrent.futures.Executor:
+    """Creates a process pool with workers initialised by init_worker, if an
+    evaluation is specified. If at most one worker is requested, work is run
+    synchronously in the current process.
+    """
+    if workers <= 1:
+        if evaluation is not None:
+            init_worker(evaluation)
+        return _InlineExecutor()
+    if evaluation is None:
+        return concurrent.futures.ProcessPoolExecutor(workers)
+    return concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(evaluation,)
+    )
+
+
+def analyse_line(line: str, limits: SearchLimits) -> Record:
+    """Analyses the FEN or EPD line, returning the result as a JSON serializable dict.
+    Needs to be run in a process initialised with init_worker.
+    """
+    try:
+        record = parse_epd(line)
+        result = analyse(record.fen, limits, minimax=_MINIMAX)
+    except (EpdError, FenNotationError) as exc:
+        return {"line": line, "error": exc.message}
+
+    output: Record = {"fen": record.fen}
+    if record.id is not None:
+        output["id"] = record.id
+    output.update(dataclasses.asdict(result))
+    return _replace_non_finite(output)
+
+
+def _replace_non_finite(value: Any) -> Any:
+    """Replaces infinite scores (e.g. mated positions) by None, as they are not valid JSON"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+
+def imap_bounded(
+    executor: concurrent.futures.Executor,
+    function: Callable[[Item], Result],
+    items: Iterable[Item],
+    max_pending: int,
+    ordered: bool = True,
+) -> Iterator[Result]:
+    """Maps the function over the items using the executor, keeping at most
+    max_pending items in flight, so that memory usage does not depend on the
+    amount of items. Yields results in input order or in completion order.
+    Items which have not started yet are cancelled if the iterator is closed early.
+    """
+    pending: Deque[concurrent.futures.Future] = collections.deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) < max_pending:
+                continue
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, not_done = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                pending = collections.deque(not_done)
+                yield from (future.result() for future in done)
+
+        if ordered:
+            while pending:
+                yield pending.popleft().result()
+        else:
+            for future in concurrent.futures.as_completed(list(pending)):
+                pending.remove(future)
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class _InlineExecutor(concurrent.futures.Executor):
+    """Executor running functions synchronously in the current process"""
+
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+# pylint: disable=too-many-arguments
+def run_analysis(
+    lines: Iterable[str],
+    output: TextIO,
+    limits: SearchLimits,
+    evaluation: str = "moves",
+    workers: int = 1,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+) -> int:
+    """Analyses all FEN or EPD lines, streaming one JSON record per line to the
+    output. Returns the amount of positions analysed.
+    """
+    executor = create_executor(workers, evaluation)
+    positions = (
+        line for line in lines if line.strip() and not line.lstrip().startswith("#")
+    )
+    function = _AnalyseLine(limits)
+    count = 0
+    with executor:
+        for record in imap_bounded(
+            executor, function, positions, max_pending or 4 * workers, ordered
+        ):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            count += 1
+    return count
+
+
+@dataclasses.dataclass
+class _AnalyseLine:
+    """Picklable callable analysing a line with fixed search limits"""
+
+    limits: SearchLimits
+
+    def __call__(self, line: str) -> Record:
+        return analyse_line(line.strip(), self.limits)
+
+
+def run_command(args: Any) -> None:
+    """Runs the analyse subcommand with the parsed CLI args"""
+    limits = SearchLimits(
+        depth=args.depth, movetime=args.movetime, nodes=args.nodes, multipv=args.multipv
+    )
+    with contextlib.ExitStack() as stack:
+        input_ = (
+            sys.stdin
+            if args.input == "-"
+            else stack.enter_context(open(args.input, encoding="utf-8"))
+        )
+        output = (
+            sys.stdout
+            if args.output == "-"
+            else stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        )
+        run_analysis(
+            input_,
+            output,
+            limits,
+            evaluation=args.eval_algorithm,
+            workers=args.workers,
+            ordered=args.order == "input",
+        )
@@ -0,0 +1,207 @@
+"""Module containing a compact binary archive of games. Games are read through mmap
+and a separate index of offsets gives constant time access to any game
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from chess_ng.consts import STARTING_FEN
+from chess_ng.pgn import RESULTS
+from chess_ng.util import convert, convert_str
+
+MAGIC = b"CNGA"
+VERSION = 1
+INDEX_SUFFIX = ".idx"
+PROMOTIONS = "nbrq"
+SIZE = 8
+
+# magic, version
+_FILE_HEADER = struct.Struct("<4sH")
+# result, length of the FEN (0 for the starting position), plies
+_GAME_HEADER = struct.Struct("<BBH")
+_MOVE = struct.Struct("<H")
+_OFFSET = struct.Struct("<Q")
+
+
+class ArchiveError(ValueError):
+    """Can be thrown when an archive file is invalid."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class ArchivedGame(NamedTuple):
+    """Game of an archive. Moves are in long algebraic notation"""
+
+    moves: List[str]
+    result: str = "*"
+    fen: str = STARTING_FEN
+
+
+def _square(name: str) -> int:
+    x, y = convert_str(name)
+    return y * SIZE + x
+
+
+def _name(square: int) -> str:
+    return convert((square % SIZE, square // SIZE))
+
+
+def encode_move(move: str) -> int:
+    """Encodes the move in long algebraic notation in 16 bits: the square it starts
+    from in bits 0-5, its destination square in bits 6-11 and the promotion piece
+    in bits 12-14 (0 if none, else the index in PROMOTIONS plus one).
+    """
+    start, destination = _square(move[:2]), _square(move[2:4])
+    promotion = PROMOTIONS.index(move[4]) + 1 if len(move) > 4 else 0
+    return start | destination << 6 | promotion << 12
+
+
+def decode_move(code: int) -> str:
+    """Decodes a move encoded by encode_move"""
+    move = _name(code & 63) + _name(code >> 6 & 63)
+    promotion = code >> 12 & 7
+    return move + PROMOTIONS[promotion - 1] if promotion else move
+
+
+def encode_game(
+    moves: Iterable[str], result: str = "*", fen: str = STARTING_FEN
+) -> bytes:
+    """Encodes the game: its header, the FEN of its initial position if it is not the
+    starting position, then two bytes per move
+    """
+    if result not in RESULTS:
+        raise ArchiveError(f"Invalid result {result}.")
+    encoded_fen = b"" if fen == STARTING_FEN else fen.encode("ascii")
+    encoded_moves = b"".join(_MOVE.pack(encode_move(move)) for move in moves)
+    return (
+        _GAME_HEADER.pack(
+            RESULTS.index(result), len(encoded_fen), len(encoded_moves) // _MOVE.size
+        )
+        + encoded_fen
+        + encoded_moves
+    )
+
+
+class ArchiveWriter:
+    """Appends games to an archive. Games are buffered and written in bulk every
+    buffer_size games and when the writer is closed. The data is written before
+    the index, so that an interrupted write never indexes a partial game.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 4096):
+        # pylint: disable=consider-using-with
+        self.buffer_size = buffer_size
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _check_header(_read_header(path))
+        self.data = open(path, "ab")
+        if self.data.tell() == 0:
+            self.data.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self.index = open(path + INDEX_SUFFIX, "ab")
+        self.offset = self.data.tell()
+        self.games = bytearray()
+        self.offsets = bytearray()
+
+    def append(
+        self, moves: Iterable[str], result: str = "*", fen: str = STARTING_FEN
+    ) -> None:
+        """Appends the game to the archive"""
+        game = encode_game(moves, result, fen)
+        self.offsets += _OFFSET.pack(self.offset + len(self.games))
+        self.games += game
+        if len(self.offsets) >= self.buffer_size * _OFFSET.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered games to the archive"""
+        self.data.write(self.games)
+        self.data.flush()
+        self.index.write(self.offsets)
+        self.index.flush()
+        self.offset += len(self.games)
+        self.games.clear()
+        self.offsets.clear()
+
+    def close(self) -> None:
+        """Writes the buffered games and closes the archive"""
+        self.flush()
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def _read_header(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read(_FILE_HEADER.size)
+
+
+def _check_header(header: bytes) -> None:
+    if len(header) < _FILE_HEADER.size:
+        raise ArchiveError("The archive is truncated.")
+    magic, version = _FILE_HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ArchiveError("The file is not a chess_ng archive.")
+    if version != VERSION:
+        raise ArchiveError(f"Unsupported archive version {version}.")
+
+
+def _map(path: str) -> Optional[mmap.mmap]:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None  # empty files cannot be mapped
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Archive:
+    """Archive read through mmap. Games are decoded on access, archive[n] reads
+    game n in constant time.
+    """
+
+    def __init__(self, path: str):
+        self.data = _map(path)
+        _check_header(self.data[: _FILE_HEADER.size] if self.data is not None else b"")
+        self.index = _map(path + INDEX_SUFFIX)
+
+    def __len__(self) -> int:
+        return len(self.index) // _OFFSET.size if self.index is not None else 0
+
+    def __getitem__(self, number: int) -> ArchivedGame:
+        length = len(self)
+        if number < 0:
+            number += length
+        if not 0 <= number < length:
+            raise IndexError(f"Game {number} is not in the archive.")
+        (offset,) = _OFFSET.unpack_from(self.index, number * _OFFSET.size)  # type: ignore
+        data = self.data
+        result, fen_length, plies = _GAME_HEADER.unpack_from(data, offset)  # type: ignore
+        offset += _GAME_HEADER.size
+        fen = bytes(data[offset : offset + fen_length]).decode("ascii")  # type: ignore
+        offset += fen_length
+        moves = struct.unpack_from(f"<{plies}H", data, offset)  # type: ignore
+        return ArchivedGame(
+            [decode_move(code) for code in moves], RESULTS[result], fen or STARTING_FEN
+        )
+
+    def __iter__(self) -> Iterator[ArchivedGame]:
+        for number in range(len(self)):
+            yield self[number]
+
+    def close(self) -> None:
+        """Unmaps the archive"""
+        for mapped in (self.data, self.index):
+            if mapped is not None:
+                mapped.close()
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -0,0 +1,118 @@
+"""Module containing an asyncio facade of the engine, running searches in a process pool"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import multiprocessing.managers
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from chess_ng import engine
+from chess_ng.engine import PlayResult, SearchLimits, SearchResult
+
+T = TypeVar("T")
+
+
+class AsyncEngine:
+    """Runs engine searches in a managed process pool without blocking the event loop.
+
+    Concurrent requests are queued until a worker becomes available. Each request
+    can be given a timeout, after which its search is stopped and an
+    asyncio.TimeoutError is raised. Cancelling a request also stops its search.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, evaluation: str = "moves"):
+        self.max_workers = max_workers
+        self.evaluation = evaluation
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._manager: Optional[multiprocessing.managers.SyncManager] = None
+        self._pending: Dict[concurrent.futures.Future, Any] = {}  # future: event
+
+    async def __aenter__(self) -> AsyncEngine:
+        self.start()
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.aclose()
+
+    def start(self) -> None:
+        """Starts the process pool and the manager used to stop running searches"""
+        if self._pool is not None:
+            return
+        self._manager = multiprocessing.Manager()
+        self._pool = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+
+    def close(self) -> None:
+        """Shuts down the process pool. Searches still queued are cancelled and
+        running searches are stopped.
+        """
+        self._shutdown(*self._detach())
+
+    async def aclose(self) -> None:
+        """Shuts down the process pool like close, but waits for the running
+        searches to stop in a thread, without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown, *self._detach())
+
+    async def analyse(
+        self, fen: str, limits: SearchLimits, timeout: Optional[float] = None
+    ) -> SearchResult:
+        """Searches the position specified in FEN notation within the limits"""
+        return await self._submit(engine.analyse, fen, limits, timeout)
+
+    async def play(
+        self, fen: str, limits: SearchLimits, timeout: Optional[float] = None
+    ) -> PlayResult:
+        """Searches the position specified in FEN notation and plays the best move"""
+        return await self._submit(engine.play, fen, limits, timeout)
+
+    def _detach(
+        self,
+    ) -> Tuple[
+        Optional[concurrent.futures.ProcessPoolExecutor],
+        Optional[multiprocessing.managers.SyncManager],
+    ]:
+        """Cancels the queued searches, stops the running ones and returns the
+        process pool and the manager, which are no longer used by the engine
+        """
+        for future, event in list(self._pending.items()):
+            if not future.cancel():
+                event.set()
+        self._pending.clear()
+        pool, manager = self._pool, self._manager
+        self._pool, self._manager = None, None
+        return pool, manager
+
+    @staticmethod
+    def _shutdown(
+        pool: Optional[concurrent.futures.ProcessPoolExecutor],
+        manager: Optional[multiprocessing.managers.SyncManager],
+    ) -> None:
+        if pool is not None:
+            pool.shutdown(wait=True)  # waits for the stopped searches to return
+        if manager is not None:
+            manager.shutdown()
+
+    async def _submit(
+        self,
+        function: Callable[..., T],
+        fen: str,
+        limits: SearchLimits,
+        timeout: Optional[float],
+    ) -> T:
+        self.start()
+        event = self._manager.Event()  # type: ignore
+        future = self._pool.submit(  # type: ignore
+            functools.partial(function, fen, limits, self.evaluation, event)
+        )
+        self._pending[future] = event
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            event.set()  # stops the search if it is already running in a worker
+            raise
+        finally:
+            self._pending.pop(future, None)
@@ -5,16 +5,32 @@ Created on Mon Feb  8 15:19:32 2021
 @author: Korean_Crimson
 """
 import itertools
+import logging
 import re
 from functools import lru_cache
-from typing import Dict, List, Optional, Tuple
-
-from colorama import Back, Fore, Style  # type: ignore
+from typing import Dict, List, Optional, Set, Tuple
 
 from chess_ng.consts import WHITE
 from chess_ng.interfaces import Piece
 from chess_ng.piece import Pawn
 
+_LOGGER = logging.getLogger("game.log")
+
+
+@lru_cache(maxsize=None)
+def square_string(dark: bool, representation: Optional[str]) -> str:
+    """Returns the square with the piece of the representation (None if the square is
+    empty), coloured with ANSI escape codes for the terminal
+    """
+    from colorama import Back, Fore, Style  # pylint: disable=import-outside-toplevel
+
+    background = Back.BLACK if dark else Back.WHITE
+    if representation is None:
+        return background + Fore.LIGHTBLACK_EX + "  " + Style.RESET_ALL
+    foreground = Fore.GREEN if WHITE in representation else Fore.RED
+    square = re.sub("[12]", " ", representation)
+    return background + foreground + square + Style.RESET_ALL
+
 
 class Board:
     """Board class. Contains all the pieces on the chess board"""
@@ -31,31 +47,17 @@ class Board:
         self.size = size
         self.move_history: List[Tuple[Piece, Tuple[int, int], bool]] = []
         self._positions = set(self._squares)  # for optimization
+        self._change_sets: List[Set[Tuple[int, int]]] = []
 
     def __repr__(self):
-        # pylint: disable=invalid-name
-        repr_ = ""
-        for y in range(self.size):
-            for x in range(self.size):
-                if y % 2:
-                    background = Back.BLACK if x % 2 else Back.WHITE
-                else:
-                    background = Back.WHITE if x % 2 else Back.BLACK
-
-                piece = self[x, y]
-                if piece is not None:
-                    foreground = (
-                        Fore.GREEN if WHITE in piece.representation else Fore.RED
-                    )
-                    representation = piece.representation
-                else:
-                    foreground = Fore.LIGHTBLACK_EX
-                    representation = "  "
-
-                square = re.sub("[12]", " ", representation)
-                repr_ += background + foreground + square + Style.RESET_ALL
-            repr_ += "\n"
-        return repr_
+        return "".join(
+            "".join(
+                square_string((x + y) % 2 == 0, piece.representation if piece else None)
+                for x, piece in enumerate(row)
+            )
+            + "\n"
+            for y, row in enumerate(self)
+        )
 
     def __iter__(self):
         # pylint: disable=invalid-name
@@ -69,12 +71,28 @@ class Board:
         if value is not None:
             self._pieces[key] = value
         self._squares[key] = value
+        for changes in self._change_sets:
+            changes.add(key)
 
     def _pop(self, position: Tuple[int, int]) -> Piece:
         """Removes the piece at the specified position and returns it"""
         self._squares[position] = None
+        for changes in self._change_sets:
+            changes.add(position)
         return self._pieces.pop(position)
 
+    def track_changes(self) -> Set[Tuple[int, int]]:
+        """Returns a set to which all squares whose occupant changes are added from
+        now on, e.g. for incremental evaluations. Clearing the set is up to the caller.
+        """
+        changes: Set[Tuple[int, int]] = set()
+        self._change_sets.append(changes)
+        return changes
+
+    def untrack_changes(self, changes: Set[Tuple[int, int]]) -> None:
+        """Stops adding changed squares to the set returned by track_changes"""
+        self._change_sets = [x for x in self._change_sets if x is not changes]
+
     def move_piece_and_capture(
         self,
         position: Tuple[int, int],
@@ -114,8 +132,8 @@ class Board:
             return None
         piece = self._pop(position)
         piece.captured = True
-        if log:
-            print(f"Captured {piece}")
+        if log and _LOGGER.isEnabledFor(logging.INFO):
+            _LOGGER.info("Captured %s", str(piece))
         return piece
 
     def is_empty_at(self, position: Tuple[int, int]) -> bool:
@@ -156,6 +174,49 @@ class Board:
         """Returns True if draw by repetition or draw by 50 moves rule"""
         return self.is_draw_by_repetition() or self.is_draw_by_fifty_moves()
 
+    def is_draw_after(self, piece: Piece, position: Tuple[int, int]) -> bool:
+        """Returns True if moving the piece to the position would result in a draw.
+        Faster than making the move and calling is_draw, as only the move history
+        is needed.
+        """
+        capture = self.is_enemy(position, piece.team)
+        self.move_history.append((piece, position, capture))
+        try:
+            return self.is_draw()
+        finally:
+            self.move_history.pop()
+
+
+class ChangeTracker:
+    """Follows the squares whose occupant changed on one board at a time, for the
+    incremental evaluations. The squares are collected in changes, which is
+    cleared by the caller once it has handled them.
+    """
+
+    def __init__(self):
+        self.board: Optional[Board] = None
+        self.changes: Set[Tuple[int, int]] = set()
+
+    def follow(self, board: Board) -> bool:
+        """Tracks the changes of the board instead of those of the previous board.
+        Returns True if the board was not tracked yet, all its squares are then
+        marked as changed.
+        """
+        if board is self.board:
+            return False
+        self.reset()
+        self.board = board
+        self.changes = board.track_changes()
+        self.changes.update(itertools.product(range(board.size), repeat=2))
+        return True
+
+    def reset(self) -> None:
+        """Stops tracking the board"""
+        if self.board is not None:
+            self.board.untrack_changes(self.changes)
+        self.board = None
+        self.changes = set()
+
 
 class BitBoard:
     """Board implemented with bitfields"""
@@ -187,27 +248,19 @@ class BitBoard:
         team_bitmask = self._TEAM_BITMASK
         team_bitshift = self._BITSIZE - 1
 
+        rows = []
         for y in range(self.size):
+            squares = []
             for x in range(self.size):
-                if y % 2:
-                    background = Back.BLACK if x % 2 else Back.WHITE
-                else:
-                    background = Back.WHITE if x % 2 else Back.BLACK
-
                 piece = self[x, y]
+                representation = None
                 if piece is not None:
                     piece_repr = reverse_dict[piece & piece_bitmask]
                     team_repr = (piece & team_bitmask) >> team_bitshift
                     representation = f"{piece_repr}{team_repr + 1}"
-                    foreground = Fore.GREEN if WHITE in representation else Fore.RED
-                else:
-                    foreground = Fore.LIGHTBLACK_EX
-                    representation = "  "
-
-                square = re.sub("[12]", " ", representation)
-                print(background + foreground + square, end="" + Style.RESET_ALL)
-            print()
-        return ""
+                squares.append(square_string((x + y) % 2 == 0, representation))
+            rows.append("".join(squares) + "\n")
+        return "".join(rows)
 
     def __hash__(self):
         return self.bit_representation
@@ -282,8 +335,8 @@ class BitBoard:
 
     def capture_at(self, position: Tuple[int, int], log: bool = True) -> Optional[int]:
         """Removes the piece at the passed position and marks it as captured"""
-        if log:
-            print(f"Captured piece at {position}")
+        if log and _LOGGER.isEnabledFor(logging.INFO):
+            _LOGGER.info("Captured piece at %s", position)
         return self._pop(position)
 
     def is_empty_at(self, position: Tuple[int, int]) -> bool:
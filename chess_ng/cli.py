@@ -1,9 +1,13 @@
 """Cli module"""
 
 import argparse
+import os
+from typing import Any
 
 from chess_ng.consts import BLACK, STARTING_FEN, WHITE
 
+EVAL_ALGORITHMS = ["moves", "move-distance", "material", "pst", "nnue"]
+
 
 def create_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser("chess_ng", description="A Python chess engine")
@@ -20,6 +24,11 @@ def create_parser() -> argparse.ArgumentParser:
         default=WHITE,
         help="The player colour",
     )
+    parser.add_argument(
+        "--ponder",
+        action="store_true",
+        help="Searches the expected player reply while waiting for input in cli mode",
+    )
     parser.add_argument(
         "--fen",
         "-f",
@@ -29,9 +38,22 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--eval-algorithm",
         "-e",
-        choices=["moves", "move-distance"],
+        choices=EVAL_ALGORITHMS,
         help="The evaluation algorithm to use in minimax",
     )
+    parser.add_argument(
+        "--nnue",
+        default=None,
+        metavar="PATH",
+        help="The weights file of the nnue evaluation, also used by the commands "
+        "(default: the file named by CHESS_NG_NNUE, else nnue.npz)",
+    )
+    parser.add_argument(
+        "--multipv",
+        type=int,
+        default=1,
+        help="The number of best lines to search and report for each engine move",
+    )
     parser.add_argument(
         "--resign-threshold",
         "-r",
@@ -60,4 +82,370 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Disables log files from being written",
     )
+    parser.add_argument(
+        "--renderer",
+        choices=["terminal", "diff"],
+        default="terminal",
+        help="How the board is rendered after each move: the whole board, or only "
+        "the changed squares of a board drawn at the top of the cleared terminal, "
+        "in which case logs are only written to the log file",
+    )
+    parser.add_argument(
+        "--silent",
+        action="store_true",
+        help="Disables all output of the game, i.e. logs and the rendered board",
+    )
+    parser.add_argument(
+        "--pgn", default=None, help="The PGN file to write the game to when it ends"
+    )
+
+    subparsers = parser.add_subparsers(
+        dest="command", title="commands", help="Runs a command instead of a game"
+    )
+    _add_analyse_parser(subparsers)
+    _add_epdtest_parser(subparsers)
+    _add_tune_parser(subparsers)
+    _add_tournament_parser(subparsers)
+    _add_uci_parser(subparsers)
+    _add_serve_parser(subparsers)
+    _add_datagen_parser(subparsers)
     return parser
+
+
+def _add_search_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--depth", "-d", type=int, default=3, help="The maximum minimax depth to use"
+    )
+    parser.add_argument(
+        "--movetime",
+        type=float,
+        default=None,
+        help="The maximum time in seconds to search each position",
+    )
+    parser.add_argument(
+        "--nodes",
+        type=int,
+        default=None,
+        help="The maximum amount of nodes to search for each position",
+    )
+    parser.add_argument(
+        "--eval-algorithm",
+        "-e",
+        choices=EVAL_ALGORITHMS,
+        default="moves",
+        help="The evaluation algorithm to use in minimax",
+    )
+
+
+def _add_analyse_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "analyse",
+        help="Analyses positions read from FEN or EPD lines",
+        description="Analyses positions read from FEN or EPD lines in a process pool, "
+        "writing one JSON line with the search result per position",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="The file to read FEN or EPD lines from. Reads from stdin by default",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="-",
+        help="The JSONL file to write results to. Writes to stdout by default",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="The amount of worker processes to analyse positions in",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Whether to write results in input order or as soon as they complete",
+    )
+    parser.add_argument(
+        "--multipv",
+        type=int,
+        default=1,
+        help="The number of best lines to search and report for each position",
+    )
+    _add_search_arguments(parser)
+
+
+def _add_epdtest_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "epdtest",
+        help="Runs EPD test suites with bm or am operations",
+        description="Searches each position of the EPD test suites within the limits "
+        "and reports the solved positions, with the time and nodes to solution",
+    )
+    parser.add_argument("input", nargs="+", help="The EPD files to test")
+    parser.add_argument(
+        "--summary",
+        default=None,
+        help="The JSON file to write the summary and all position results to",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="The amount of worker processes to test positions in",
+    )
+    _add_search_arguments(parser)
+
+
+def _add_tune_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "tune",
+        help="Tunes the pst evaluation tables on positions labelled with results",
+        description="Fits the middlegame and endgame tables of the pst evaluation to "
+        "game results by gradient descent on the sigmoid-scaled error (Texel tuning)",
+    )
+    parser.add_argument(
+        "input",
+        nargs="*",
+        help="The files of FEN or EPD lines labelled with game results to build the "
+        'dataset from, e.g. with a c9 "1-0" operation or a trailing [0.5]. '
+        "Reuses the existing dataset if no files are specified",
+    )
+    parser.add_argument(
+        "--data",
+        default="tuning-data",
+        help="The folder to which the memory-mapped dataset is written",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="pst.json",
+        help="The JSON file to write the tuned tables to",
+    )
+    parser.add_argument(
+        "--epochs", type=int, default=10, help="The amount of passes over the dataset"
+    )
+    parser.add_argument(
+        "--learning-rate",
+        type=float,
+        default=1.0,
+        help="The learning rate of the Adam optimizer in centipawns",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=16384,
+        help="The amount of positions per gradient step",
+    )
+    parser.add_argument(
+        "--k",
+        type=float,
+        default=None,
+        help="The scaling constant of the sigmoid. Fitted to the dataset by default",
+    )
+    parser.add_argument(
+        "--seed", "-s", default=None, type=int, help="The random seed to be used"
+    )
+
+
+def _add_tournament_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "tournament",
+        help="Plays a self-play tournament between engine configurations",
+        description="Plays a round robin between the engines in a process pool, each "
+        "pair playing each opening with both colours, and reports a crosstable and "
+        "the Elo differences",
+    )
+    parser.add_argument(
+        "--engine",
+        action="append",
+        required=True,
+        help="An engine configuration of comma separated options, e.g. "
+        "name=pst,depth=4,eval=pst,movetime=0.5,nodes=20000. Specify at least twice",
+    )
+    parser.add_argument(
+        "--openings",
+        default=None,
+        help="The file of FEN or EPD lines to start games from. "
+        "Games start from the starting position by default",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="The amount of times each pair of engines plays all openings",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="The amount of worker processes to play games in",
+    )
+    parser.add_argument(
+        "--max-plies",
+        type=int,
+        default=300,
+        help="The amount of plies after which games are adjudicated as draws",
+    )
+    parser.add_argument(
+        "--pgn", default=None, help="The PGN file to write all games to"
+    )
+    parser.add_argument(
+        "--jsonl", default=None, help="The JSONL file to write all game records to"
+    )
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help="The binary game archive to append all games to",
+    )
+    parser.add_argument(
+        "--sprt",
+        nargs=2,
+        type=float,
+        metavar=("ELO0", "ELO1"),
+        default=None,
+        help="Runs a sequential probability ratio test of the first engine against "
+        "the second one, stopping once H0 (elo0) or H1 (elo1) is accepted. "
+        "Rounds are the maximum amount of rounds",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="The SPRT probability of accepting H1 if H0 holds",
+    )
+    parser.add_argument(
+        "--beta",
+        type=float,
+        default=0.05,
+        help="The SPRT probability of accepting H0 if H1 holds",
+    )
+    parser.add_argument(
+        "--progress",
+        default=None,
+        help="The JSON file to write the SPRT progress to after each game",
+    )
+
+
+def _add_uci_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "uci",
+        help="Runs the engine with the UCI protocol on stdin and stdout",
+        description="Speaks the universal chess interface protocol, so that the "
+        "engine can be used from chess GUIs and tournament managers",
+    )
+    parser.add_argument(
+        "--eval-algorithm",
+        "-e",
+        choices=EVAL_ALGORITHMS,
+        default="moves",
+        help="The initial evaluation algorithm, changeable with the Evaluation option",
+    )
+
+
+def _add_serve_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "serve",
+        help="Hosts many games in one process behind a local HTTP/JSON server",
+        description="Serves games over HTTP/JSON, searching the engine moves of all "
+        "games in a shared pool of worker processes which serves the games round robin",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="The port to listen on")
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="The amount of worker processes to search moves in",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=10.0,
+        help="The default time in seconds within which an engine move is answered",
+    )
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=1024,
+        help="The amount of queued searches above which requests are rejected",
+    )
+    _add_search_arguments(parser)
+
+
+def _add_datagen_parser(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "datagen",
+        help="Generates training data from self-play games",
+        description="Plays self-play games in a process pool at fixed nodes per move "
+        "and writes sampled positions, deduplicated by Zobrist key, with their search "
+        "score and the game result to NumPy shards. Resumes an interrupted generation",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default="datagen",
+        help="The folder to which the shards and the progress are written",
+    )
+    parser.add_argument(
+        "--positions",
+        type=int,
+        default=1_000_000,
+        help="The amount of positions to generate",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=65536,
+        help="The amount of positions per shard",
+    )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The amount of worker processes to play games in",
+    )
+    parser.add_argument(
+        "--nodes",
+        type=int,
+        default=5000,
+        help="The amount of nodes to search for each move",
+    )
+    parser.add_argument(
+        "--depth", "-d", type=int, default=64, help="The maximum minimax depth to use"
+    )
+    parser.add_argument(
+        "--random-plies",
+        type=int,
+        default=8,
+        help="The amount of random plies at the start of each game",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=0.25,
+        help="The probability with which each searched position is sampled",
+    )
+    parser.add_argument(
+        "--max-plies",
+        type=int,
+        default=300,
+        help="The amount of plies after which games are adjudicated as draws",
+    )
+    parser.add_argument(
+        "--seed", "-s", type=int, default=0, help="The random seed of the games"
+    )
+    parser.add_argument(
+        "--eval-algorithm",
+        "-e",
+        choices=EVAL_ALGORITHMS,
+        default="moves",
+        help="The evaluation algorithm to use in minimax",
+    )
@@ -34,6 +34,8 @@ BOARD = [
     [piece + WHITE for piece in BACKROW],
 ]
 
+NNUE_PATH_VARIABLE = "CHESS_NG_NNUE"  # names the weights file of the nnue evaluation
+
 DIRECTIONS: Dict[str, Direction] = {WHITE: -1, BLACK: 1}
 EARLY_VALUES = {PAWN: 4, KNIGHT: 5, BISHOP: 4, ROOK: 1, QUEEN: 3, KING: 2}
 MID_VALUES = {PAWN: 2, KNIGHT: 3, BISHOP: 3, ROOK: 4, QUEEN: 6, KING: 10}
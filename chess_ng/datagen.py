@@ -0,0 +1,307 @@
+"""Module containing the generation of training data from self-play: positions
+sampled from games played in a process pool, labelled with their search score and
+the game result, and streamed to fixed-size NumPy shards
+"""
+
+import dataclasses
+import glob
+import json
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+import numpy as np
+
+from chess_ng.analysis import create_executor, imap_bounded, worker_minimax
+from chess_ng.board import Board
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.engine import SearchLimits, adjudicate, find_move, opponent, search
+from chess_ng.fen import load_board
+from chess_ng.hashing import zobrist_key
+from chess_ng.tuning import RESULTS
+from chess_ng.vectorized import encode_board
+
+MAX_SCORE = 32000  # centipawns, mate scores are clipped to it
+PROGRESS_FILE = "progress.json"
+SHARD_PATTERN = "shard-{:05d}.npy"
+
+# board: two piece codes (see vectorized.PIECE_CODES) per byte, square 2i in the
+# low nibble. side: 0 for white, 1 for black. score: centipawns, and result: 1, 0.5
+# or 0, from the perspective of white. key: the Zobrist key of the position
+RECORD = np.dtype(
+    [
+        ("board", np.uint8, (32,)),
+        ("side", np.uint8),
+        ("score", np.int16),
+        ("result", np.float32),
+        ("key", np.uint64),
+    ]
+)
+
+
+def pack_board(board: Board) -> np.ndarray:
+    """Packs the piece codes of the board (see vectorized.encode_board) in 32 bytes"""
+    codes = encode_board(board).astype(np.uint8)
+    return codes[0::2] | codes[1::2] << 4
+
+
+def unpack_board(packed: np.ndarray) -> np.ndarray:
+    """Unpacks boards packed by pack_board into their piece codes. Works on a single
+    board or on an array of them.
+    """
+    codes = np.empty(packed.shape[:-1] + (64,), dtype=np.int8)
+    codes[..., 0::2] = packed & 15
+    codes[..., 1::2] = packed >> 4
+    return codes
+
+
+@dataclass
+class DatagenConfig:
+    """Self-play settings. The first random_plies plies of each game are random to
+    diversify the games, later positions are sampled with the sample rate.
+    Positions in check and with mate scores are never sampled.
+    """
+
+    nodes: int = 5000
+    depth: int = 64
+    random_plies: int = 8
+    sample_rate: float = 0.25
+    max_plies: int = 300
+    seed: int = 0
+
+
+# pylint: disable=too-many-locals
+def play_game(number: int, config: DatagenConfig) -> np.ndarray:
+    """Plays the self-play game with the number, which seeds its random moves, and
+    returns its sampled positions. Needs to be run in a process initialised with
+    analysis.init_worker.
+    """
+    rng = random.Random(config.seed * 1_000_003 + number)
+    limits = SearchLimits(depth=config.depth, nodes=config.nodes)
+    board, teams, side = load_board(STARTING_FEN)
+    records = []
+    plies = 0
+    while True:
+        outcome = adjudicate(board, teams, side)
+        if outcome is None and plies >= config.max_plies:
+            outcome = "1/2-1/2", "max plies"
+        if outcome is not None:
+            break
+
+        team, enemy = teams[side], teams[opponent(side)]
+        moves = team.compute_valid_moves(board, enemy.pieces)
+        if plies < config.random_plies:
+            piece, move = rng.choice(moves)
+        else:
+            result = search(worker_minimax(), board, teams, side, limits)  # type: ignore
+            piece, move = find_move(moves, result.bestmove, board.size)
+            if (
+                np.isfinite(result.score)
+                and rng.random() < config.sample_rate
+                and not team.in_check(board, enemy.pieces)
+            ):
+                score = result.score if side == WHITE else -result.score
+                records.append(
+                    (
+                        pack_board(board),
+                        side == BLACK,
+                        np.clip(round(score * 100), -MAX_SCORE, MAX_SCORE),
+                        0.0,
+                        zobrist_key(board, side),
+                    )
+                )
+        board.move_piece_and_capture(move.position, piece, enemy.pieces, log=False)
+        side = enemy.representation
+        plies += 1
+
+    positions = np.array(records, dtype=RECORD)
+    positions["result"] = RESULTS[outcome[0]]
+    return positions
+
+
+@dataclass
+class _PlayGame:
+    """Picklable callable playing a game with fixed settings"""
+
+    config: DatagenConfig
+
+    def __call__(self, number: int) -> np.ndarray:
+        return play_game(number, self.config)
+
+
+class KeySet:
+    """Set of Zobrist keys, stored in a sorted array (8 bytes per key) merged with
+    the keys added since the last merge
+    """
+
+    def __init__(self, keys: Optional[np.ndarray] = None):
+        self.keys = np.unique(keys) if keys is not None else np.zeros(0, np.uint64)
+        self.recent: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.recent)
+
+    def __contains__(self, key: int) -> bool:
+        if key in self.recent:
+            return True
+        index = np.searchsorted(self.keys, np.uint64(key))
+        return bool(index < len(self.keys) and self.keys[index] == np.uint64(key))
+
+    def add(self, key: int) -> None:
+        """Adds the key"""
+        self.recent.add(key)
+
+    def merge(self) -> None:
+        """Merges the keys added since the last merge into the sorted array"""
+        recent = np.fromiter(self.recent, dtype=np.uint64, count=len(self.recent))
+        self.keys = np.union1d(self.keys, recent)
+        self.recent.clear()
+
+
+@dataclass
+class Progress:
+    """Progress of the generation, written after every shard. Games before
+    next_game have been started, positions of games since the last shard are lost
+    if the generation is interrupted.
+    """
+
+    shards: int = 0
+    positions: int = 0
+    duplicates: int = 0
+    next_game: int = 0
+    config: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+def load_progress(directory: str) -> Progress:
+    """Reads the progress of the generation in the directory"""
+    path = os.path.join(directory, PROGRESS_FILE)
+    if not os.path.exists(path):
+        return Progress()
+    with open(path, encoding="utf-8") as file:
+        return Progress(**json.load(file))
+
+
+def _write_progress(directory: str, progress: Progress) -> None:
+    path = os.path.join(directory, PROGRESS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(dataclasses.asdict(progress), file)
+    os.replace(path + ".tmp", path)
+
+
+def _write_shard(directory: str, number: int, positions: np.ndarray) -> None:
+    path = os.path.join(directory, SHARD_PATTERN.format(number))
+    with open(path + ".tmp", "wb") as file:
+        np.save(file, positions)
+    os.replace(path + ".tmp", path)
+
+
+def read_shards(directory: str) -> Iterator[np.ndarray]:
+    """Memory-maps the shards written to the directory, in order"""
+    for path in sorted(glob.glob(os.path.join(directory, "shard-*.npy"))):
+        yield np.load(path, mmap_mode="r")
+
+
+# pylint: disable=too-many-arguments
+def generate(
+    directory: str,
+    positions: int,
+    config: DatagenConfig,
+    evaluation: str = "moves",
+    workers: int = 1,
+    shard_size: int = 65536,
+    callback: Optional[Callable[[Progress], None]] = None,
+) -> Progress:
+    """Plays self-play games in the workers until the directory holds the amount of
+    positions, deduplicated by Zobrist key, in shards of shard_size positions (the
+    last one may be smaller). Resumes the generation in the directory, if any,
+    reloading the keys of its shards. Only one shard is held in memory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    progress = load_progress(directory)
+    settings = {"evaluation": evaluation, **dataclasses.asdict(config)}
+    if progress.shards and progress.config != settings:
+        raise ValueError(f"Data in {directory} was generated with other settings.")
+    progress.config = settings
+    shards = list(read_shards(directory))[: progress.shards]
+    keys = KeySet(
+        np.concatenate([shard["key"] for shard in shards]) if shards else None
+    )
+    buffer = np.empty(shard_size, dtype=RECORD)
+    filled = 0
+    if shards and len(shards[-1]) < shard_size:
+        # refill the last shard, so that all shards but the last one are full
+        filled = len(shards[-1])
+        buffer[:filled] = shards[-1]
+        progress.shards -= 1
+        progress.positions -= filled
+    del shards
+
+    def flush() -> None:
+        nonlocal filled
+        _write_shard(directory, progress.shards, buffer[:filled])
+        progress.shards += 1
+        progress.positions += filled
+        filled = 0
+        keys.merge()
+        _write_progress(directory, progress)
+        if callback is not None:
+            callback(progress)
+
+    def games() -> Iterator[int]:
+        while progress.positions + filled < positions:
+            yield progress.next_game
+            progress.next_game += 1
+
+    with create_executor(workers, evaluation) as executor:
+        results = imap_bounded(
+            executor, _PlayGame(config), games(), 2 * workers, ordered=False
+        )
+        for game in results:
+            for record in game:
+                if progress.positions + filled >= positions:
+                    break
+                if int(record["key"]) in keys:
+                    progress.duplicates += 1
+                    continue
+                keys.add(int(record["key"]))
+                buffer[filled] = record
+                filled += 1
+                if filled == shard_size:
+                    flush()
+            if progress.positions + filled >= positions:
+                results.close()
+                break
+        if filled:
+            flush()
+    return progress
+
+
+def format_progress(progress: Progress) -> str:
+    """Returns a single line report of the progress"""
+    return (
+        f"Shard {progress.shards}: {progress.positions} positions from "
+        f"{progress.next_game} games, {progress.duplicates} duplicates skipped"
+    )
+
+
+def run_command(args: Any) -> None:
+    """Runs the datagen subcommand with the parsed CLI args"""
+    config = DatagenConfig(
+        nodes=args.nodes,
+        depth=args.depth,
+        random_plies=args.random_plies,
+        sample_rate=args.sample_rate,
+        max_plies=args.max_plies,
+        seed=args.seed,
+    )
+    progress = generate(
+        args.output,
+        args.positions,
+        config,
+        evaluation=args.eval_algorithm,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        callback=lambda progress: print(format_progress(progress), flush=True),
+    )
+    print(f"Positions: {progress.positions} in {progress.shards} shards")
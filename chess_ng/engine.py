@@ -0,0 +1,290 @@
+"""Module containing a FEN based interface to search positions with the engine"""
+
+import contextlib
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from chess_ng import hashing
+from chess_ng.algorithm import (
+    CancellationToken,
+    Event,
+    Minimax,
+    Number,
+    ReversibleMove,
+)
+from chess_ng.board import Board
+from chess_ng.consts import BLACK, WHITE
+from chess_ng.fen import construct_fen_notation, load_board
+from chess_ng.interfaces import Piece
+from chess_ng.mobility import DistanceEvaluation, MobilityEvaluation
+from chess_ng.move import Move
+from chess_ng.piece import Pawn
+from chess_ng.pst import PstEvaluation
+from chess_ng.team import Team
+from chess_ng.util import convert, convert_str
+
+EvaluationFunction = Callable[[Board, Team, Team], Number]
+
+
+# pylint: disable=import-outside-toplevel
+def _material_evaluation() -> EvaluationFunction:
+    from chess_ng.vectorized import MaterialEvaluation  # imports NumPy
+
+    return MaterialEvaluation()
+
+
+def _nnue_evaluation() -> EvaluationFunction:
+    from chess_ng.nnue import NnueEvaluation  # imports NumPy
+
+    return NnueEvaluation()
+
+
+# pylint: enable=import-outside-toplevel
+EVALUATIONS: Dict[str, Callable[[], EvaluationFunction]] = {
+    "moves": MobilityEvaluation,
+    "move-distance": DistanceEvaluation,
+    "material": _material_evaluation,
+    "pst": PstEvaluation,
+    "nnue": _nnue_evaluation,
+}
+
+
+@dataclass
+class SearchLimits:
+    """Limits for a single search. If a movetime (in seconds) or a nodes limit is
+    specified, the search deepens iteratively up to depth until a limit is hit.
+    """
+
+    depth: int = 3
+    movetime: Optional[float] = None
+    nodes: Optional[int] = None
+    multipv: int = 1
+
+    @property
+    def iterative(self) -> bool:
+        """Returns True if the search should be deepened iteratively"""
+        return self.movetime is not None or self.nodes is not None
+
+
+@dataclass
+class SearchLine:
+    """A principal variation with its score, as reported by multi-PV searches"""
+
+    score: Number
+    depth: int
+    pv: List[str]
+
+
+@dataclass
+class SearchResult:
+    """Result of a search. Moves are in long algebraic notation, e.g. e2e4.
+    For multi-PV searches, lines contains the best lines, best line first.
+    """
+
+    bestmove: Optional[str] = None
+    score: Number = 0
+    depth: int = 0
+    nodes: int = 0
+    time: float = 0.0
+    pv: List[str] = field(default_factory=list)
+    lines: List[SearchLine] = field(default_factory=list)
+
+
+@dataclass
+class PlayResult:
+    """Result of playing a move. Contains the FEN of the position after the move"""
+
+    move: Optional[str]
+    fen: str
+    result: SearchResult
+
+
+def opponent(side: str) -> str:
+    """Returns the side opposing the specified side"""
+    return BLACK if side == WHITE else WHITE
+
+
+def adjudicate(
+    board: Board, teams: Dict[str, Team], side_to_move: str
+) -> Optional[Tuple[str, str]]:
+    """Returns the result (e.g. 1-0) and the termination of a finished game, i.e.
+    checkmate, stalemate, repetition or fifty moves, or None if it goes on
+    """
+    team, enemy = teams[side_to_move], teams[opponent(side_to_move)]
+    if not team.compute_valid_moves(board, enemy.pieces):
+        if team.in_check(board, enemy.pieces):
+            return ("0-1" if side_to_move == WHITE else "1-0"), "checkmate"
+        return "1/2-1/2", "stalemate"
+    if board.is_draw_by_repetition():
+        return "1/2-1/2", "repetition"
+    if board.is_draw_by_fifty_moves():
+        return "1/2-1/2", "fifty moves"
+    return None
+
+
+def format_move(piece: Piece, destination: Tuple[int, int], size: int = 8) -> str:
+    """Formats the move of the piece (from its current position) in long algebraic
+    notation. Pawns reaching the last rank are always promoted to queens.
+    """
+    promotion = "q" if is_promotion(piece, destination, size) else ""
+    return f"{convert(piece.position)}{convert(destination)}{promotion}"
+
+
+def is_promotion(piece: Piece, destination: Tuple[int, int], size: int = 8) -> bool:
+    """Returns True if the move of the piece to the destination promotes a pawn"""
+    return isinstance(piece, Pawn) and piece.promotes_at(destination, size)
+
+
+def find_move(
+    moves: Sequence[Tuple[Piece, Move]], bestmove: Optional[str], size: int = 8
+) -> Tuple[Piece, Move]:
+    """Returns the valid move matching the best move in long algebraic notation.
+    Falls back to the first valid move if the search did not return a best move.
+    """
+    if bestmove is None:
+        return moves[0]
+    return next(
+        (piece, move)
+        for piece, move in moves
+        if format_move(piece, move.position, size) == bestmove
+    )
+
+
+def format_variation(
+    board: Board, teams: Dict[str, Team], variation: Sequence[Tuple[Piece, Move]]
+) -> List[str]:
+    """Formats a variation, replaying it on the board to get the source squares of
+    pieces moving more than once. The board is restored afterwards.
+    """
+    moves: List[str] = []
+    with contextlib.ExitStack() as stack:
+        for piece, move in variation:
+            if piece.captured:
+                break
+            moves.append(format_move(piece, move.position, board.size))
+            enemy_pieces = teams[opponent(piece.team)].pieces
+            stack.enter_context(
+                ReversibleMove(board, piece, move.position, enemy_pieces)
+            )
+    return moves
+
+
+def create_minimax(evaluation: str = "moves") -> Minimax:
+    """Creates a Minimax instance for the specified evaluation name. The instance
+    can be reused to search any position.
+    """
+    return Minimax(EVALUATIONS[evaluation](), hashing.get_all_hash_values())
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def search(
+    minimax: Minimax,
+    board: Board,
+    teams: Dict[str, Team],
+    side_to_move: str,
+    limits: SearchLimits,
+    token: Optional[CancellationToken] = None,
+    info_callback: Optional[Callable[[SearchResult], None]] = None,
+) -> SearchResult:
+    """Searches the best move for the side to move within the specified limits.
+    The info callback is called with the result of each completed iteration.
+    """
+    team, enemy = teams[side_to_move], teams[opponent(side_to_move)]
+    root_moves = team.compute_valid_moves(board, enemy.pieces)
+    minimax.new_search(board)
+    minimax.cancellation_token = token
+    start = time.perf_counter()
+    result = SearchResult()
+    depths = range(1, limits.depth + 1) if limits.iterative else [limits.depth]
+    for depth in depths:
+        if limits.nodes is not None:
+            minimax.max_nodes = max(limits.nodes - result.nodes, 0)
+        lines: List[Tuple[Number, List[Tuple[Piece, Move]]]] = []
+        if limits.multipv > 1 and root_moves:
+            lines = minimax.run_multipv(
+                board, team, enemy, depth, limits.multipv, root_moves=root_moves
+            )
+            rating, piece_move = (lines[0][0], lines[0][1][0]) if lines else (0, None)
+        else:
+            rating, piece_move = minimax.run(
+                board, team, enemy, depth, True, root_moves=root_moves
+            )
+        result.nodes += minimax.nodes
+        result.time = time.perf_counter() - start
+        if minimax.stopped and result.bestmove is not None:
+            break  # keep the result of the last completed iteration
+
+        if piece_move is not None:
+            piece, move = piece_move
+            result.bestmove = format_move(piece, move.position, board.size)
+            result.pv = format_variation(board, teams, minimax.principal_variation)
+        result.score = rating
+        result.depth = depth
+        result.lines = [
+            SearchLine(score, depth, format_variation(board, teams, variation))
+            for score, variation in lines
+        ]
+        if info_callback is not None:
+            info_callback(result)
+        if minimax.stopped or piece_move is None or math.isinf(rating):
+            break  # deeper iterations cannot change a forced mate
+    minimax.cancellation_token = None
+    minimax.max_nodes = None
+    return result
+
+
+def analyse(
+    fen: str,
+    limits: SearchLimits,
+    evaluation: str = "moves",
+    event: Optional[Event] = None,
+    minimax: Optional[Minimax] = None,
+) -> SearchResult:
+    """Searches the position specified in FEN notation within the specified limits.
+    The search can be stopped using the event, e.g. from another process.
+    A minimax instance created by create_minimax can be passed in to be reused.
+    """
+    board, teams, side_to_move = load_board(fen)
+    token = CancellationToken(timeout=limits.movetime, event=event)
+    if minimax is None:
+        minimax = create_minimax(evaluation)
+    return search(minimax, board, teams, side_to_move, limits, token)
+
+
+def play(
+    fen: str,
+    limits: SearchLimits,
+    evaluation: str = "moves",
+    event: Optional[Event] = None,
+) -> PlayResult:
+    """Searches the position specified in FEN notation and plays the best move.
+    Returns the move and the FEN notation of the resulting position.
+    """
+    result = analyse(fen, limits, evaluation, event)
+    if result.bestmove is None:
+        return PlayResult(None, fen, result)
+    return PlayResult(result.bestmove, apply_move(fen, result.bestmove), result)
+
+
+def apply_move(fen: str, move: str) -> str:
+    """Plays the move in long algebraic notation (e.g. e2e4) on the position
+    specified in FEN notation and returns the FEN notation of the new position.
+    """
+    board, teams, side_to_move = load_board(fen)
+    source, destination = _parse_move(move)
+    piece = board[source]
+    if piece is None or piece.team != side_to_move:
+        raise ValueError(f"Invalid move {move}: no piece of the side to move.")
+    enemy_pieces = teams[opponent(side_to_move)].pieces
+    board.move_piece_and_capture(destination, piece, enemy_pieces, log=False)
+    return construct_fen_notation(board, opponent(side_to_move))
+
+
+def _parse_move(move: str) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    source, destination = move[:2], move[2:4]
+    try:
+        return convert_str(source), convert_str(destination)
+    except Exception as exc:
+        raise ValueError(f"Invalid move {move}.") from exc
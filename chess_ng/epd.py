@@ -0,0 +1,65 @@
+"""Module introducing EPD (extended position description) support"""
+
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class EpdError(Exception):
+    """Can be thrown when an EPD line is invalid."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+@dataclass
+class EpdRecord:
+    """A position read from an EPD or FEN line, along with its EPD operations"""
+
+    fen: str
+    operations: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def id(self) -> Optional[str]:  # pylint: disable=invalid-name
+        """Returns the id operation of the record, if any"""
+        return self.operations.get("id")
+
+
+def parse_epd(line: str) -> EpdRecord:
+    """Parses an EPD line (e.g. 'rnbqkbnr/8/8/8/8/8/8/RNBQKBNR w KQkq - bm e4;')
+    or a FEN line. Operands of operations are kept as unparsed strings.
+    """
+    fields = line.split(maxsplit=4)
+    if len(fields) < 2:
+        raise EpdError(f"Invalid EPD line, expected at least 2 fields: {line}")
+
+    position = fields[:4]
+    rest = fields[4] if len(fields) > 4 else ""
+    # FEN lines have halfmove and fullmove clocks instead of operations
+    clocks = rest.split(maxsplit=2)
+    if len(clocks) >= 2 and clocks[0].isdigit() and clocks[1].isdigit():
+        position += clocks[:2]
+        rest = clocks[2] if len(clocks) > 2 else ""
+    return EpdRecord(" ".join(position), _parse_operations(rest))
+
+
+def _parse_operations(string: str) -> Dict[str, str]:
+    operations: Dict[str, str] = {}
+    for operation in string.split(";"):
+        try:
+            opcode, *operands = shlex.split(operation)
+        except ValueError:  # empty operation or unbalanced quotes
+            if operation.strip():
+                raise EpdError(f"Invalid EPD operation: {operation}") from None
+            continue
+        operations[opcode] = " ".join(operands)
+    return operations
+
+
+def read_epd(lines: Iterable[str]) -> Iterator[EpdRecord]:
+    """Lazily parses EPD or FEN lines, skipping empty lines and comments (#)"""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield parse_epd(line)
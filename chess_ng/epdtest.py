@@ -0,0 +1,243 @@
+"""Module containing an EPD test-suite runner, measuring the solve rate of the engine"""
+
+import contextlib
+import dataclasses
+import itertools
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO, Tuple
+
+from chess_ng.algorithm import CancellationToken
+from chess_ng.analysis import create_executor, imap_bounded, worker_minimax
+from chess_ng.board import Board
+from chess_ng.engine import (
+    SearchLimits,
+    SearchResult,
+    create_minimax,
+    format_move,
+    search,
+)
+from chess_ng.epd import EpdError, EpdRecord, parse_epd
+from chess_ng.fen import FenNotationError, load_board
+from chess_ng.notation import NotationError, format_san, parse_move
+from chess_ng.team import Team
+
+
+@dataclass
+class PositionResult:  # pylint: disable=too-many-instance-attributes
+    """Result of a test position. The solution fields contain the search effort
+    until the engine first chose a correct move and kept choosing correct moves
+    in all following iterations, or None if the position was not solved.
+    Moves are in SAN.
+    """
+
+    fen: str
+    id: Optional[str] = None  # pylint: disable=invalid-name
+    best_moves: List[str] = field(default_factory=list)
+    avoid_moves: List[str] = field(default_factory=list)
+    bestmove: Optional[str] = None
+    solved: bool = False
+    depth: int = 0
+    nodes: int = 0
+    time: float = 0.0
+    solution_depth: Optional[int] = None
+    solution_nodes: Optional[int] = None
+    solution_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class SuiteSummary:
+    """Summary of a test-suite run. Time is summed over all positions, so that
+    the solve rate per second is a measure of strength per CPU second,
+    independently of the amount of workers used.
+    """
+
+    limits: SearchLimits
+    evaluation: str
+    results: List[PositionResult] = field(default_factory=list)
+
+    @property
+    def positions(self) -> int:
+        """Returns the amount of positions tested, excluding invalid positions"""
+        return sum(1 for result in self.results if result.error is None)
+
+    @property
+    def solved(self) -> int:
+        """Returns the amount of solved positions"""
+        return sum(1 for result in self.results if result.solved)
+
+    @property
+    def time(self) -> float:
+        """Returns the search time summed over all positions"""
+        return sum(result.time for result in self.results)
+
+    @property
+    def nodes(self) -> int:
+        """Returns the amount of nodes searched over all positions"""
+        return sum(result.nodes for result in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the summary as a JSON serializable dict"""
+        return {
+            "limits": dataclasses.asdict(self.limits),
+            "evaluation": self.evaluation,
+            "positions": self.positions,
+            "solved": self.solved,
+            "solve_rate": self.solved / self.positions if self.positions else 0.0,
+            "time": self.time,
+            "nodes": self.nodes,
+            "nodes_per_second": self.nodes / self.time if self.time else 0.0,
+            "solved_per_second": self.solved / self.time if self.time else 0.0,
+            "results": [dataclasses.asdict(result) for result in self.results],
+        }
+
+    def format(self) -> str:
+        """Returns a single line summary"""
+        summary = self.to_dict()
+        return (
+            f"Solved {self.solved}/{self.positions} ({summary['solve_rate']:.1%}) "
+            f"in {self.time:.2f}s, {self.nodes} nodes "
+            f"({summary['nodes_per_second']:.0f} nps, "
+            f"{summary['solved_per_second']:.3f} solved per second)"
+        )
+
+
+def run_position(record: EpdRecord, limits: SearchLimits) -> PositionResult:
+    """Searches the position of the record within the limits and checks the best
+    move against the bm (best moves) and am (avoid moves) operations of the record.
+    """
+    result = PositionResult(record.fen, record.id)
+    try:
+        board, teams, side_to_move = load_board(record.fen)
+        result.best_moves, best = _parse_moves(
+            board, teams, side_to_move, record.operations.get("bm", "")
+        )
+        result.avoid_moves, avoid = _parse_moves(
+            board, teams, side_to_move, record.operations.get("am", "")
+        )
+    except (FenNotationError, NotationError) as exc:
+        result.error = exc.message
+        return result
+    if not best and not avoid:
+        result.error = "Position has neither a bm nor an am operation."
+        return result
+
+    def on_iteration(iteration: SearchResult) -> None:
+        if iteration.bestmove in best or (not best and iteration.bestmove not in avoid):
+            if result.solution_depth is None:
+                result.solution_depth = iteration.depth
+                result.solution_nodes = iteration.nodes
+                result.solution_time = iteration.time
+        else:
+            result.solution_depth = None
+            result.solution_nodes = None
+            result.solution_time = None
+
+    minimax = worker_minimax() or create_minimax()
+    minimax.clear()  # the results must not depend on the previous positions
+    token = CancellationToken(timeout=limits.movetime)
+    search_result = search(
+        minimax, board, teams, side_to_move, limits, token, on_iteration
+    )
+    result.depth = search_result.depth
+    result.nodes = search_result.nodes
+    result.time = search_result.time
+    result.solved = result.solution_depth is not None
+    if search_result.bestmove is not None:
+        piece, move = parse_move(board, teams, side_to_move, search_result.bestmove)
+        result.bestmove = format_san(board, teams, piece, move.position)
+    return result
+
+
+def _parse_moves(
+    board: Board, teams: Dict[str, Team], side_to_move: str, operand: str
+) -> Tuple[List[str], Set[str]]:
+    """Parses the moves of an operand, e.g. 'Nf3 e4', returning them as specified
+    and the set of the moves in long algebraic notation, as reported by searches.
+    """
+    moves = operand.split()
+    parsed = set()
+    for move in moves:
+        piece, piece_move = parse_move(board, teams, side_to_move, move)
+        parsed.add(format_move(piece, piece_move.position, board.size))
+    return moves, parsed
+
+
+@dataclass
+class _RunLine:
+    """Picklable callable testing a line with fixed search limits"""
+
+    limits: SearchLimits
+
+    def __call__(self, line: str) -> PositionResult:
+        try:
+            record = parse_epd(line.strip())
+        except EpdError as exc:
+            return PositionResult(line.strip(), error=exc.message)
+        return run_position(record, self.limits)
+
+
+def format_result(result: PositionResult) -> str:
+    """Returns a single line report of the position result"""
+    name = result.id or result.fen
+    if result.error is not None:
+        return f"{name}: error: {result.error}"
+    expected = " ".join(
+        [f"bm {move}" for move in result.best_moves]
+        + [f"am {move}" for move in result.avoid_moves]
+    )
+    outcome = (
+        f"solved at depth {result.solution_depth} in {result.solution_time:.2f}s, "
+        f"{result.solution_nodes} nodes"
+        if result.solved
+        else "failed"
+    )
+    return (
+        f"{name}: {result.bestmove} ({expected}): {outcome} "
+        f"[depth {result.depth}, {result.time:.2f}s, {result.nodes} nodes]"
+    )
+
+
+def run_suite(
+    lines: Iterable[str],
+    limits: SearchLimits,
+    evaluation: str = "moves",
+    workers: int = 1,
+    report: Optional[TextIO] = None,
+) -> SuiteSummary:
+    """Runs all EPD test positions, writing a line per position to the report"""
+    summary = SuiteSummary(limits, evaluation)
+    positions = (
+        line for line in lines if line.strip() and not line.lstrip().startswith("#")
+    )
+    with create_executor(workers, evaluation) as executor:
+        for result in imap_bounded(
+            executor, _RunLine(limits), positions, 4 * workers, ordered=True
+        ):
+            summary.results.append(result)
+            if report is not None:
+                report.write(format_result(result) + "\n")
+                report.flush()
+    return summary
+
+
+def run_command(args: Any) -> None:
+    """Runs the epdtest subcommand with the parsed CLI args"""
+    limits = SearchLimits(depth=args.depth, movetime=args.movetime, nodes=args.nodes)
+    with contextlib.ExitStack() as stack:
+        files = [
+            stack.enter_context(open(path, encoding="utf-8")) for path in args.input
+        ]
+        summary = run_suite(
+            itertools.chain.from_iterable(files),
+            limits,
+            evaluation=args.eval_algorithm,
+            workers=args.workers,
+            report=sys.stdout,
+        )
+    print(summary.format())
+    if args.summary is not None:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary.to_dict(), file, indent=4)
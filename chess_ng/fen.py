@@ -72,12 +72,25 @@ def load_fen_notation(  # pylint: disable=dangerous-default-value
             pieces[team].append(new_piece)
             x += 1
 
+    for team, name in ((WHITE, "white"), (BLACK, "black")):
+        if not any(isinstance(x, piece.King) for x in pieces[team]):
+            raise FenNotationError(f"Invalid position, missing {name} king.")
+
     return {
         WHITE: Team(pieces[WHITE], WHITE),
         BLACK: Team(pieces[BLACK], BLACK),
     }, side_to_move
 
 
+def load_board(board_state: str) -> Tuple[Board, Dict[str, Team], str]:
+    """Loads the board state from FEN notation string. Returns the board with the
+    pieces of both teams, the teams dict and the side to move.
+    """
+    teams, side_to_move = load_fen_notation(board_state)
+    board = Board([x for team in teams.values() for x in team.pieces])
+    return board, teams, side_to_move
+
+
 def construct_fen_notation(board: Board, side_to_move: str) -> str:
     """Takes a board object and the side to move (WHITE or BLACK) and
     constructs a FEN notation string from it, which is returned.
@@ -7,12 +7,16 @@ from dataclasses import dataclass
 from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from chess_ng import hashing
-from chess_ng.algorithm import Minimax, evaluate_length
+from chess_ng.algorithm import Minimax
 from chess_ng.board import Board
 from chess_ng.consts import BLACK, STARTING_FEN, WHITE
-from chess_ng.fen import load_fen_notation
+from chess_ng.engine import format_move, format_variation
+from chess_ng.fen import construct_fen_notation, load_fen_notation
 from chess_ng.interfaces import Piece
+from chess_ng.mobility import MobilityEvaluation
+from chess_ng.move import Move
 from chess_ng.piece import King, Position, Rook
+from chess_ng.snapshot import GameSnapshot, restore_position, snapshot_position
 from chess_ng.team import Team
 from chess_ng.util import convert, convert_str
 
@@ -32,6 +36,7 @@ class GameParams:
     depth: int = 2
     resign_threshold: int = -50
     mating_threshold: int = 10
+    multipv: int = 1
 
 
 @dataclass
@@ -52,6 +57,8 @@ class Game:
         self.is_draw = False
         self.previously_moved = BLACK
         self._messages: List[str] = []
+        self.initial_fen = construct_fen_notation(self.board, WHITE)
+        self.moves: List[str] = []  # in long algebraic notation, e.g. e2e4
 
     @classmethod
     def create_default(cls) -> Game:
@@ -63,10 +70,54 @@ class Game:
         return cls(
             teams=teams,
             minimax=Minimax(
-                evaluation_function=evaluate_length, hash_values=hash_values
+                evaluation_function=MobilityEvaluation(), hash_values=hash_values
             ),
         )
 
+    @classmethod
+    def restore(
+        cls,
+        snapshot: GameSnapshot,
+        minimax: Minimax,
+        board_factory: Callable[[List[Piece]], Board] = Board,
+    ) -> Game:
+        """Creates a Game from the snapshot, searching with the minimax instance"""
+        board, teams = restore_position(snapshot.position, board_factory)
+        game = cls(teams, minimax, board_factory, snapshot.player)
+        game.board = board
+        game.previously_moved = snapshot.previously_moved
+        game.rating = snapshot.rating
+        game.winner = snapshot.winner
+        game.is_draw = snapshot.is_draw
+        game.initial_fen = construct_fen_notation(board, game.side_to_move)
+        return game
+
+    def snapshot(self) -> GameSnapshot:
+        """Returns a compact snapshot of the position, its recent history (for the
+        fifty move rule and repetitions) and the state of the game. The minimax
+        instance, pending messages and the moves played are not part of it, so the
+        moves of a restored game start from the snapshot.
+        """
+        return GameSnapshot(
+            snapshot_position(self.board, self.teams),
+            self.player,
+            self.previously_moved,
+            self.rating,
+            self.winner,
+            self.is_draw,
+        )
+
+    def __reduce__(self):
+        # pickles the snapshot instead of the object graphs of the pieces. The
+        # search tables of the minimax instance and the incremental state of the
+        # evaluation (see e.g. MoveCache) are caches and are not pickled
+        return _restore_game, (
+            self.snapshot(),
+            self.minimax.evaluation_function,
+            self.minimax.hash_values,
+            self.board_factory,
+        )
+
     def consume_messages(self) -> Iterable[str]:
         for message in self._messages:
             yield message
@@ -108,15 +159,20 @@ class Game:
         if is_in_check:
             self.message("Moving out of check...")
 
-        self.rating, piece_move = self.minimax.run(
-            self.board,
-            team,
-            enemy,
-            depth=params.depth,
-            alpha=-math.inf,
-            beta=math.inf,
-            maximizing_player=True,
-        )
+        self.minimax.new_search(self.board)
+        if params.multipv > 1:
+            self.rating, piece_move = self._run_multipv(params, moves)
+        else:
+            self.rating, piece_move = self.minimax.run(
+                self.board,
+                team,
+                enemy,
+                depth=params.depth,
+                alpha=-math.inf,
+                beta=math.inf,
+                maximizing_player=True,
+                root_moves=moves,
+            )
         if piece_move is None:
             self.message("Error: a move could not be found...")
             self.winner = self.player
@@ -129,6 +185,7 @@ class Game:
             return None
 
         source_pos = piece_.position
+        self.moves.append(format_move(piece_, move.position, self.board.size))
         self.board.move_piece_and_capture(move.position, piece_, enemy.pieces)
         self.previously_moved = team.representation
 
@@ -141,6 +198,28 @@ class Game:
             self.message("Checking player king.")
         return piece_, source_pos, piece_.position
 
+    def _run_multipv(
+        self, params: GameParams, moves: List[Tuple[Piece, Move]]
+    ) -> Tuple[float, Optional[Tuple[Piece, Move]]]:
+        """Searches the best lines, emitting a message for each line.
+        Returns the rating and move of the best line.
+        """
+        lines = self.minimax.run_multipv(
+            self.board,
+            self.team,
+            self.player_team,
+            params.depth,
+            params.multipv,
+            root_moves=moves,
+        )
+        for i, (score, variation) in enumerate(lines, 1):
+            moves_ = " ".join(format_variation(self.board, self.teams, variation))
+            self.message(f"Line {i}: score {score}, depth {params.depth}: {moves_}")
+        if not lines:
+            return 0, None
+        score, variation = lines[0]
+        return score, variation[0]
+
     def run_player(self, source_square: str, dest_square: str) -> Piece:
         """Takes a source and destination square e.g. a2 a4 moves the piece
         that is currently on a2 to a4 if it is a valid move. Raises a ChessPositionError
@@ -164,12 +243,14 @@ class Game:
                 f"Player is in check! {piece_} cannot move to {dest_square}."
             )
 
+        move_ = format_move(piece_, destination_pos, self.board.size)
         if castling_moves:
             result = self._handle_castling(piece_, source_pos, destination_pos)
             if result is not None:
                 piece_, destination_pos = result
         self.board.move_piece_and_capture(destination_pos, piece_, self.team.pieces)
         self.previously_moved = self.player
+        self.moves.append(move_)
         return piece_
 
     def _compute_castling_moves(
@@ -314,3 +395,14 @@ class Game:
     def is_over(self) -> bool:
         """Returns True if there is a winner or game is a draw"""
         return bool(self.winner or self.is_draw)
+
+
+def _restore_game(
+    snapshot: GameSnapshot,
+    evaluation_function: Callable,
+    hash_values: Dict[str, int],
+    board_factory: Callable[[List[Piece]], Board],
+) -> Game:
+    return Game.restore(
+        snapshot, Minimax(evaluation_function, hash_values), board_factory
+    )
@@ -5,9 +5,11 @@ Created on Sat Jan 22 14:53:45 2022
 @author: richa
 """
 import math
+import random
 from typing import Dict, Iterable, List, Tuple
 
 from chess_ng.board import BitBoard, Board
+from chess_ng.consts import BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE
 from chess_ng.interfaces import Piece
 
 
@@ -19,6 +21,18 @@ def get_hash_values(pieces: List[Piece]) -> Dict[str, int]:
     return {representation: i for i, representation in enumerate(representations, 1)}
 
 
+def get_all_hash_values() -> Dict[str, int]:
+    """Returns a hash value dict covering the representations of all pieces of
+    both teams, so that the same lookup table can be used for any position.
+    """
+    representations = sorted(
+        symbol + team
+        for symbol in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)
+        for team in (WHITE, BLACK)
+    )
+    return {representation: i for i, representation in enumerate(representations, 1)}
+
+
 def compute_hash(board: Board, hash_values: Dict[str, int]) -> int:
     """Computes a new hash from the board the specified hash_values lookup table"""
     if isinstance(board, BitBoard):
@@ -67,3 +81,31 @@ def update_hash(
         hash_ &= ~(max_ << counter * exponent)
         hash_ ^= num
     return hash_
+
+
+ZOBRIST_SEED = 20220122
+
+
+def _zobrist_table() -> Dict[str, List[int]]:
+    rng = random.Random(ZOBRIST_SEED)
+    return {
+        representation: [rng.getrandbits(64) for _ in range(64)]
+        for representation in get_all_hash_values()
+    }
+
+
+_ZOBRIST_TABLE = _zobrist_table()
+_ZOBRIST_BLACK = random.Random(ZOBRIST_SEED + 1).getrandbits(64)
+
+
+def zobrist_key(board: Board, side_to_move: str) -> int:
+    """Computes the 64 bit Zobrist key of the position on a board of size 8. Unlike
+    compute_hash, the key has a fixed size and includes the side to move.
+    """
+    key = _ZOBRIST_BLACK if side_to_move == BLACK else 0
+    for y in range(board.size):
+        for x in range(board.size):
+            piece = board[x, y]
+            if piece is not None:
+                key ^= _ZOBRIST_TABLE[piece.representation][y * board.size + x]
+    return key
@@ -0,0 +1,246 @@
+"""Module containing incremental versions of the evaluations based on piece moves"""
+
+import itertools
+import math
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chess_ng.algorithm import (
+    Number,
+    _TeamInterface,
+    evaluate_distance,
+    evaluate_length,
+    evaluate_length_with_captures,
+    inverse_distances,
+)
+from chess_ng.board import Board, ChangeTracker
+from chess_ng.consts import BISHOP, KING, PAWN, QUEEN, ROOK
+from chess_ng.interfaces import Piece
+from chess_ng.move import Move
+from chess_ng.piece import Knight, Pawn
+
+Position = Tuple[int, int]
+
+
+_DIRECTIONS = [
+    (x, y) for x, y in itertools.product((-1, 0, 1), repeat=2) if (x, y) != (0, 0)
+]
+_KNIGHT_JUMPS = [
+    (x, y) for x, y in itertools.product((1, 2, -1, -2), repeat=2) if abs(x) != abs(y)
+]
+
+
+@lru_cache(maxsize=None)
+def rays(
+    position: Position, size: int = 8
+) -> Tuple[Tuple[Position, Tuple[Position, ...]], ...]:
+    """Returns the directions from the position, each with the squares in that
+    direction ordered by distance to the position.
+    """
+    x, y = position  # pylint: disable=invalid-name
+    return tuple(
+        (
+            (x_dir, y_dir),
+            tuple(
+                (x + x_dir * i, y + y_dir * i)
+                for i in range(1, size)
+                if 0 <= x + x_dir * i < size and 0 <= y + y_dir * i < size
+            ),
+        )
+        for x_dir, y_dir in _DIRECTIONS
+    )
+
+
+@lru_cache(maxsize=None)
+def knight_jumps(position: Position, size: int = 8) -> Tuple[Position, ...]:
+    """Returns the squares a knight jump away from the position"""
+    x, y = position  # pylint: disable=invalid-name
+    return tuple(
+        (x + x_dir, y + y_dir)
+        for x_dir, y_dir in _KNIGHT_JUMPS
+        if 0 <= x + x_dir < size and 0 <= y + y_dir < size
+    )
+
+
+def observers(board: Board, position: Position) -> Iterator[Piece]:
+    """Yields the pieces whose moves depend on the occupant of the position:
+    the nearest piece in each direction if it moves along that direction far
+    enough, and the knights a jump away. Pieces behind another piece do not depend
+    on the position, as all pieces other than knights stop at the first occupied square.
+    """
+    for direction, ray in rays(position, board.size):
+        for distance, square in enumerate(ray, 1):
+            piece = board[square]
+            if piece is not None:
+                if _moves_through(piece, direction, distance):
+                    yield piece
+                break
+    for square in knight_jumps(position, board.size):
+        piece = board[square]
+        if isinstance(piece, Knight):
+            yield piece
+
+
+# pylint: disable=too-many-return-statements
+def _moves_through(piece: Piece, direction: Position, distance: int) -> bool:
+    """Returns True if the moves of the piece depend on the square at the distance,
+    in the direction from the square to the piece.
+    """
+    symbol = piece.representation[0]  # promoted pawns are represented as queens
+    straight = 0 in direction
+    if symbol == QUEEN:
+        return True
+    if symbol == ROOK:
+        return straight
+    if symbol == BISHOP:
+        return not straight
+    if symbol == KING:
+        return distance == 1
+    if symbol == PAWN and isinstance(piece, Pawn):
+        x_dir, y_dir = direction
+        if y_dir != -piece.direction:
+            return False
+        return distance <= 2 if x_dir == 0 else distance == 1
+    return False
+
+
+class MoveCache:
+    """Keeps the moves of all pieces on a board between calls of update.
+
+    The board reports the squares whose occupant changed since the previous update.
+    Only the moves of the pieces on these squares and of the pieces observing them
+    (see observers) are recomputed, instead of generating the moves of all pieces.
+    As the search only changes a few squares between consecutive leaves, most
+    moves are reused. Also keeps the amount of moves and captures per team.
+    """
+
+    def __init__(self):
+        self._tracker = ChangeTracker()
+        # occupant of each square and its representation, which changes on promotion
+        self._occupants: Dict[Position, Tuple[Optional[Piece], str]] = {}
+        self._moves: Dict[int, List[Move]] = {}  # id(piece): moves
+        self.move_counts: Dict[str, int] = defaultdict(int)
+        self.capture_counts: Dict[str, int] = defaultdict(int)
+
+    def __reduce__(self):
+        # pickled empty, the moves belong to the tracked board, which is not pickled
+        return MoveCache, ()
+
+    def __getitem__(self, piece: Piece) -> List[Move]:
+        """Returns the moves of the piece, as of the last update"""
+        return self._moves.get(id(piece), [])
+
+    def reset(self) -> None:
+        """Drops all moves, so that the next update recomputes all pieces"""
+        self._tracker.reset()
+        self._occupants = {}
+        self._moves = {}
+        self.move_counts = defaultdict(int)
+        self.capture_counts = defaultdict(int)
+
+    def update(self, board: Board) -> None:
+        """Recomputes the moves of all pieces affected by changes of the board"""
+        if board is not self._tracker.board:
+            self.reset()
+            self._tracker.follow(board)
+        changes = self._tracker.changes
+        if not changes:
+            return
+
+        changed = list(changes)
+        changes.clear()
+        affected: Dict[int, Piece] = {}
+        for position in changed:
+            previous, representation = self._occupants.get(position, (None, ""))
+            piece = board[position]
+            if piece is previous:
+                # e.g. moved and moved back again. The observers are unaffected, but
+                # a pawn may have been promoted and unpromoted in between
+                if piece is not None and piece.representation != representation:
+                    self._occupants[position] = piece, piece.representation
+                    affected[id(piece)] = piece
+                continue
+            if previous is not None and board[previous.position] is not previous:
+                self._remove(previous)  # captured
+            self._occupants[position] = (
+                piece,
+                piece.representation if piece is not None else "",
+            )
+            if piece is not None:
+                affected[id(piece)] = piece
+            for observer in observers(board, position):
+                affected[id(observer)] = observer
+        for piece in affected.values():
+            self._recompute(piece, board)
+
+    def _remove(self, piece: Piece) -> None:
+        moves = self._moves.pop(id(piece), [])
+        self.move_counts[piece.team] -= len(moves)
+        self.capture_counts[piece.team] -= sum(1 for x in moves if x.can_capture)
+
+    def _recompute(self, piece: Piece, board: Board) -> None:
+        self._remove(piece)
+        moves = self._moves[id(piece)] = piece.compute_valid_moves(board)
+        self.move_counts[piece.team] += len(moves)
+        self.capture_counts[piece.team] += sum(1 for x in moves if x.can_capture)
+
+
+class MobilityEvaluation:  # pylint: disable=too-few-public-methods
+    """Evaluates positions exactly like evaluate_length (or evaluate_length_with_captures
+    if captures is True), reading the move counts kept by a MoveCache.
+    Instances should not be shared between threads.
+    """
+
+    def __init__(self, captures: bool = False):
+        self.captures = captures
+        self.cache = MoveCache()
+
+    def __call__(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number:
+        if not isinstance(board, Board):
+            function = (
+                evaluate_length_with_captures if self.captures else evaluate_length
+            )
+            return function(board, team, enemy)
+
+        self.cache.update(board)
+        moves, captures = self.cache.move_counts, self.cache.capture_counts
+        ally, other = team.representation, enemy.representation
+        if not self.captures:
+            return moves[ally] - moves[other]
+        ally_moves = moves[ally] + captures[ally]
+        enemy_moves = moves[other] + 2 * captures[other]
+        return (ally_moves - 1) / enemy_moves if enemy_moves else math.inf
+
+
+class DistanceEvaluation:  # pylint: disable=too-few-public-methods
+    """Evaluates positions exactly like evaluate_distance, summing the inverse
+    distances of the moves kept by a MoveCache to the enemy king, looked up in the
+    inverse_distances table. Instances should not be shared between threads.
+    """
+
+    def __init__(self):
+        self.cache = MoveCache()
+
+    def __call__(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number:
+        if not isinstance(board, Board):
+            return evaluate_distance(board, team, enemy)
+
+        self.cache.update(board)
+        table = inverse_distances(board.size)
+        return self._sum(table[enemy.king.position], team) - self._sum(
+            table[team.king.position], enemy
+        )
+
+    def _sum(self, distances: Dict[Position, float], team: _TeamInterface) -> Number:
+        """Sums the inverse distances of the moves in the same order as
+        compute_all_moves, to get exactly the same floating point result.
+        """
+        cache = self.cache
+        return sum(
+            distances[move.position] for piece in team.pieces for move in cache[piece]
+        )
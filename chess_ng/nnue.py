@@ -0,0 +1,268 @@
+"""Module containing an NNUE-style neural network evaluation with an incrementally
+updated accumulator, and the loader of its weight files
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from chess_ng.algorithm import Number, _TeamInterface
+from chess_ng.board import Board, ChangeTracker
+from chess_ng.consts import NNUE_PATH_VARIABLE as PATH_VARIABLE
+from chess_ng.consts import WHITE
+from chess_ng.interfaces import Piece
+from chess_ng.vectorized import PIECE_CODES, ArrayEvaluation, square_index
+
+Position = Tuple[int, int]
+
+FORMAT = "chess_ng-nnue"
+VERSION = 1
+SQUARES = 64
+FEATURES = len(PIECE_CODES) * SQUARES
+DEFAULT_PATH = "nnue.npz"
+
+
+class NetworkFormatError(ValueError):
+    """Can be thrown when a network weight file is invalid."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+def feature_index(piece: Piece) -> int:
+    """Returns the index of the (piece, square) input feature of the piece"""
+    code = PIECE_CODES[piece.representation]
+    return (code - 1) * SQUARES + square_index(piece.position)
+
+
+@dataclass
+class Network:
+    """Weights of the network. The feature transformer maps the 768 sparse
+    (piece, square) features to the accumulator, divided by scale before the clipped
+    ReLU activation. It is followed by dense layers, the last one with a single
+    output: the score in pawns from the perspective of white.
+
+    Feature weights may be quantized to int16, the accumulator is then summed in
+    int32. Dense layers are computed in float32.
+    """
+
+    feature_weights: np.ndarray
+    feature_bias: np.ndarray
+    layers: List[Tuple[np.ndarray, np.ndarray]]
+    scale: float = 1.0
+
+    def __post_init__(self):
+        hidden = self.feature_weights.shape[1] if self.feature_weights.ndim == 2 else 0
+        if self.feature_weights.shape != (FEATURES, hidden) or not hidden:
+            raise NetworkFormatError(
+                f"Feature weights must have shape ({FEATURES}, hidden), "
+                f"got {self.feature_weights.shape}."
+            )
+        if self.feature_bias.shape != (hidden,):
+            raise NetworkFormatError(
+                f"Feature bias must have shape ({hidden},), "
+                f"got {self.feature_bias.shape}."
+            )
+        if not self.layers:
+            raise NetworkFormatError("The network must have at least one dense layer.")
+        inputs = hidden
+        for i, (weights, bias) in enumerate(self.layers):
+            if weights.ndim != 2 or weights.shape[0] != inputs:
+                raise NetworkFormatError(
+                    f"Weights of layer {i} must have {inputs} rows, got {weights.shape}."
+                )
+            if bias.shape != weights.shape[1:]:
+                raise NetworkFormatError(
+                    f"Bias of layer {i} must have shape {weights.shape[1:]}, "
+                    f"got {bias.shape}."
+                )
+            inputs = weights.shape[1]
+        if inputs != 1:
+            raise NetworkFormatError("The last layer must have a single output.")
+
+    @property
+    def accumulator_dtype(self) -> np.dtype:
+        """Returns the dtype of the accumulator: int32 for integer feature weights"""
+        if np.issubdtype(self.feature_weights.dtype, np.integer):
+            return np.dtype(np.int32)
+        return np.dtype(np.float32)
+
+    def forward(self, accumulators: np.ndarray) -> np.ndarray:
+        """Computes the scores of a batch of accumulators (stacked along the first
+        axis) from the perspective of white.
+        """
+        values = np.clip(accumulators.astype(np.float32) / self.scale, 0, 1)
+        for weights, bias in self.layers[:-1]:
+            values = np.clip(values @ weights + bias, 0, 1)
+        weights, bias = self.layers[-1]
+        return (values @ weights + bias)[:, 0]
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Saves the network in the .npz weight file format read by load_network"""
+        arrays = {
+            f"{name}_{i}": array
+            for i, layer in enumerate(self.layers)
+            for name, array in zip(("weights", "bias"), layer)
+        }
+        np.savez(
+            path,
+            format=np.array(FORMAT),
+            version=np.array(VERSION),
+            feature_weights=self.feature_weights,
+            feature_bias=self.feature_bias,
+            scale=np.array(self.scale),
+            **arrays,
+        )
+
+
+def load_network(path: Union[str, os.PathLike]) -> Network:
+    """Loads a network from an .npz weight file. Besides the format name and version,
+    the file contains the arrays feature_weights (768 x hidden, int16 or float32),
+    feature_bias and scale, followed by the dense layers weights_0, bias_0,
+    weights_1, bias_1 and so on. Feature indices are given by feature_index.
+    """
+    try:
+        with np.load(path, allow_pickle=False) as file:
+            arrays: Dict[str, np.ndarray] = dict(file.items())
+    except (OSError, ValueError) as exc:
+        raise NetworkFormatError(f"Could not read network file {path}: {exc}") from exc
+
+    if str(arrays.get("format")) != FORMAT:
+        raise NetworkFormatError(f"{path} is not a {FORMAT} weight file.")
+    if int(arrays.get("version", -1)) != VERSION:
+        raise NetworkFormatError(
+            f"Unsupported version {arrays.get('version')} of {path}, expected {VERSION}."
+        )
+    try:
+        layers = []
+        while f"weights_{len(layers)}" in arrays:
+            i = len(layers)
+            layers.append(
+                (
+                    arrays[f"weights_{i}"].astype(np.float32),
+                    arrays[f"bias_{i}"].astype(np.float32),
+                )
+            )
+        feature_weights = arrays["feature_weights"]
+        integer = np.issubdtype(feature_weights.dtype, np.integer)
+        dtype = np.int16 if integer else np.float32
+        return Network(
+            feature_weights.astype(dtype),
+            arrays["feature_bias"].astype(dtype),
+            layers,
+            float(arrays["scale"]),
+        )
+    except KeyError as exc:
+        raise NetworkFormatError(f"Missing array {exc} in {path}.") from exc
+
+
+def random_network(
+    hidden: Sequence[int] = (64, 16),
+    quantized: bool = True,
+    seed: Optional[int] = None,
+) -> Network:
+    """Creates a network with random weights, e.g. as a starting point for training.
+    The first size is the size of the accumulator, the others of the dense layers.
+    """
+    rng = np.random.default_rng(seed)
+    scale = 64.0 if quantized else 1.0
+    dtype = np.int16 if quantized else np.float32
+    feature_weights = rng.normal(0, 0.1 * scale, (FEATURES, hidden[0]))
+    feature_bias = rng.normal(0, 0.1 * scale, hidden[0])
+    if quantized:
+        feature_weights = np.round(feature_weights)
+        feature_bias = np.round(feature_bias)
+    sizes = [*hidden, 1]
+    layers = [
+        (
+            rng.normal(0, 1 / np.sqrt(inputs), (inputs, outputs)).astype(np.float32),
+            np.zeros(outputs, dtype=np.float32),
+        )
+        for inputs, outputs in zip(sizes, sizes[1:])
+    ]
+    return Network(
+        feature_weights.astype(dtype), feature_bias.astype(dtype), layers, scale
+    )
+
+
+class NnueEvaluation(ArrayEvaluation):
+    """Evaluates positions with a Network, loaded from the path or, by default, from
+    the file named by the CHESS_NG_NNUE environment variable (nnue.npz if unset).
+
+    Single positions are evaluated incrementally: the board reports the squares
+    whose occupant changed since the previous call, and only the feature rows of
+    these squares are subtracted from and added to the accumulator, so that only
+    the small dense layers are computed for every position. Batches of encoded
+    positions (see ArrayEvaluation) are transformed with a single gather.
+    Instances should not be shared between threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, os.PathLike]] = None,
+        network: Optional[Network] = None,
+    ):
+        if network is None:
+            network = load_network(path or os.environ.get(PATH_VARIABLE, DEFAULT_PATH))
+        self.network = network
+        dtype = network.accumulator_dtype
+        self._bias = network.feature_bias.astype(dtype)
+        # rows indexed by piece code * 64 + square, i.e. by feature_index + 64,
+        # the rows of code 0 (empty squares) are zero
+        self._table = np.concatenate(
+            [
+                np.zeros((SQUARES, len(self._bias)), dtype=dtype),
+                network.feature_weights.astype(dtype),
+            ]
+        )
+        self._tracker = ChangeTracker()
+        self._features: Dict[Position, int] = {}
+        self._accumulator = self._bias.copy()
+
+    def __getstate__(self):
+        # the accumulator is kept for the tracked board, which is not pickled
+        state = self.__dict__.copy()
+        state.update(
+            _tracker=ChangeTracker(), _features={}, _accumulator=self._bias.copy()
+        )
+        return state
+
+    def __call__(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number:
+        if not isinstance(board, Board):
+            return super().__call__(board, team, enemy)
+
+        self._update(board)
+        score = float(self.network.forward(self._accumulator[np.newaxis])[0])
+        return score if team.representation == WHITE else -score
+
+    def evaluate_batch(
+        self, positions: np.ndarray, team: _TeamInterface, enemy: _TeamInterface
+    ) -> List[Number]:
+        indices = positions.astype(np.intp) * SQUARES + np.arange(SQUARES)
+        accumulators = self._table[indices].sum(axis=1) + self._bias
+        scores = self.network.forward(accumulators)
+        if team.representation != WHITE:
+            scores = -scores
+        return scores.tolist()
+
+    def _update(self, board: Board) -> None:
+        if self._tracker.follow(board):
+            self._features = {}
+            self._accumulator = self._bias.copy()
+
+        accumulator, table = self._accumulator, self._table
+        changes = self._tracker.changes
+        for position in changes:
+            old = self._features.pop(position, None)
+            if old is not None:
+                accumulator -= table[old]
+            piece = board[position]
+            if piece is not None:
+                new = self._features[position] = feature_index(piece) + SQUARES
+                accumulator += table[new]
+        changes.clear()
@@ -0,0 +1,201 @@
+"""Module introducing SAN (standard algebraic notation) support, e.g. Nf3, exd5, e8=Q+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from chess_ng.algorithm import ReversibleMove
+from chess_ng.board import Board
+from chess_ng.consts import BLACK, PAWN, QUEEN, WHITE
+from chess_ng.engine import format_move, is_promotion, opponent
+from chess_ng.interfaces import Piece
+from chess_ng.move import Move
+from chess_ng.piece import King, Pawn
+from chess_ng.team import Team
+from chess_ng.util import convert, convert_str
+
+_ANNOTATIONS = "+#!?"
+_SAN = re.compile(r"([NBRQK])?([a-h])?([1-8])?(x)?([a-h][1-8])(?:=?([NBRQ]))?")
+_CASTLING = {"O-O": 2, "0-0": 2, "O-O-O": -2, "0-0-0": -2}
+
+
+class NotationError(ValueError):
+    """Can be thrown when a move in SAN or long algebraic notation is invalid."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+def format_san(
+    board: Board,
+    teams: Dict[str, Team],
+    piece: Piece,
+    destination: Tuple[int, int],
+    suffix: bool = True,
+) -> str:
+    """Formats the legal move of the piece (from its current position) in SAN.
+    Pawns reaching the last rank are always promoted to queens. If suffix is True,
+    checks and checkmates are marked with + and #, which needs a move generation
+    for the opponent.
+    """
+    team, enemy = teams[piece.team], teams[opponent(piece.team)]
+    san = _format_san(
+        board, piece, destination, team.compute_valid_moves(board, enemy.pieces)
+    )
+    if suffix:
+        with ReversibleMove(board, piece, destination, enemy.pieces):
+            if enemy.in_check(board, team.pieces):
+                mate = not enemy.compute_valid_moves(board, team.pieces)
+                san += "#" if mate else "+"
+    return san
+
+
+def _format_san(
+    board: Board,
+    piece: Piece,
+    destination: Tuple[int, int],
+    legal_moves: List[Tuple[Piece, Move]],
+) -> str:
+    capture = board.is_enemy(destination, piece.team)
+    symbol = piece.representation[0]
+    target = convert(destination)
+    if isinstance(piece, King) and abs(destination[0] - piece.position[0]) == 2:
+        return "O-O" if destination[0] > piece.position[0] else "O-O-O"
+    if symbol == PAWN:
+        capture = destination[0] != piece.position[0]  # including en passant
+        san = f"{convert(piece.position)[0]}x{target}" if capture else target
+        if is_promotion(piece, destination, board.size):
+            san += f"={QUEEN}"
+    else:
+        others = [
+            other.position
+            for other, move in legal_moves
+            if other is not piece
+            and other.representation == piece.representation
+            and move.position == destination
+        ]
+        san = f"{symbol}{_disambiguate(piece.position, others)}"
+        san += f"{'x' if capture else ''}{target}"
+    return san
+
+
+def _disambiguate(position: Tuple[int, int], others: List[Tuple[int, int]]) -> str:
+    """Returns the file, rank or square needed to tell the move apart from moves
+    of other pieces of the same kind to the same destination.
+    """
+    if not others:
+        return ""
+    square = convert(position)
+    if all(other[0] != position[0] for other in others):
+        return square[0]
+    if all(other[1] != position[1] for other in others):
+        return square[1]
+    return square
+
+
+def normalize_san(san: str) -> str:
+    """Strips check, checkmate and annotation symbols, e.g. Qxf7+! -> Qxf7"""
+    return san.strip().rstrip(_ANNOTATIONS).replace("e.p.", "").strip()
+
+
+def parse_move(
+    board: Board, teams: Dict[str, Team], side_to_move: str, text: str
+) -> Tuple[Piece, Move]:
+    """Parses a legal move of the side to move, given in SAN (e.g. Nf3) or in
+    long algebraic notation (e.g. g1f3), where the promotion suffix is optional.
+    Raises a NotationError for illegal moves.
+    """
+    team, enemy = teams[side_to_move], teams[opponent(side_to_move)]
+    san = normalize_san(text)
+    legal_moves = team.compute_valid_moves(board, enemy.pieces)
+    for piece, move in legal_moves:
+        long_algebraic = format_move(piece, move.position, board.size)
+        if san in (
+            long_algebraic,
+            long_algebraic[:4],
+            _format_san(board, piece, move.position, legal_moves),
+        ):
+            return piece, move
+    colour = {WHITE: "white", BLACK: "black"}[side_to_move]
+    raise NotationError(f"Illegal move {text} for {colour}.")
+
+
+# pylint: disable=too-many-locals
+def parse_san(
+    board: Board, teams: Dict[str, Team], side_to_move: str, text: str
+) -> Tuple[Piece, Tuple[int, int]]:
+    """Parses a move of the side to move in SAN, returning the moving piece and its
+    destination, to be played with make_move. Castling is returned as the two square
+    king move. Unlike parse_move, only the pieces of the moving kind are generated,
+    and the legality of the move is only checked to tell apart several candidates,
+    which makes replaying games of trusted sources fast. Raises a NotationError for
+    unparsable or impossible moves.
+    """
+    team, enemy = teams[side_to_move], teams[opponent(side_to_move)]
+    san = normalize_san(text)
+    if san in _CASTLING:
+        x, y = team.king.position  # pylint: disable=invalid-name
+        return team.king, (x + _CASTLING[san], y)
+    match = _SAN.fullmatch(san)
+    if match is None:
+        raise NotationError(f"Invalid move {text}.")
+    symbol, file, rank, capture, target, _ = match.groups()
+    destination = convert_str(target)
+    candidates = [
+        piece
+        for piece in team.pieces
+        if piece.representation[0] == (symbol or PAWN)
+        and (file is None or convert(piece.position)[0] == file)
+        and (rank is None or convert(piece.position)[1] == rank)
+        and any(
+            move.position == destination for move in piece.compute_valid_moves(board)
+        )
+    ]
+    if len(candidates) > 1:
+        candidates = [
+            piece
+            for piece in candidates
+            if not _leaves_king_in_check(board, team, enemy, piece, destination)
+        ]
+    if not candidates and symbol is None and capture and file is not None:
+        # en passant: the pawn captures the pawn which passed its capture square
+        rank_behind = int(target[1]) - (1 if side_to_move == WHITE else -1)
+        pawn = board[convert_str(f"{file}{rank_behind}")]
+        if isinstance(pawn, Pawn) and pawn.team == side_to_move:
+            candidates = [pawn]
+    if len(candidates) != 1:
+        colour = {WHITE: "white", BLACK: "black"}[side_to_move]
+        problem = "Ambiguous" if candidates else "Illegal"
+        raise NotationError(f"{problem} move {text} for {colour}.")
+    return candidates[0], destination
+
+
+def make_move(
+    board: Board, teams: Dict[str, Team], piece: Piece, destination: Tuple[int, int]
+) -> Optional[Piece]:
+    """Plays the move of the piece without logging, also moving the rook of castling
+    king moves and capturing the passed pawn of en passant captures. Returns the
+    captured piece, if any. Pawns are always promoted to queens.
+    """
+    enemy = teams[opponent(piece.team)]
+    (x, y), x2 = piece.position, destination[0]  # pylint: disable=invalid-name
+    if isinstance(piece, King) and abs(x2 - x) == 2:
+        rook = board[0 if x2 < x else board.size - 1, y]
+        board.move_piece(piece, destination, log=False)
+        if rook is not None and rook.team == piece.team:
+            board.move_piece(rook, ((x + x2) // 2, y), log=False)
+        return None
+    if isinstance(piece, Pawn) and x2 != x and board[destination] is None:
+        passed_pawn = board.capture_at((x2, y), log=False)
+        if passed_pawn is not None:
+            enemy.pieces.remove(passed_pawn)
+        board.move_piece(piece, destination, passed_pawn is not None, log=False)
+        return passed_pawn
+    return board.move_piece_and_capture(destination, piece, enemy.pieces, log=False)
+
+
+def _leaves_king_in_check(
+    board: Board, team: Team, enemy: Team, piece: Piece, destination: Tuple[int, int]
+) -> bool:
+    with ReversibleMove(board, piece, destination, enemy.pieces):
+        return team.in_check(board, enemy.pieces)
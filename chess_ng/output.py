@@ -5,40 +5,86 @@ Created on Sat Jan  8 16:40:18 2022
 @author: richa
 """
 import datetime
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from typing import Any, Protocol
+from typing import Any, List, Optional, Protocol
+
+GAME_LOG = "game.log"
+# attributes which structured records pass with extra, written as JSON fields
+FIELDS = ("turn", "side", "move", "score", "nodes", "time")
 
 
 class LoggerProtocol(Protocol):
-    """Protocol of a simple info logger"""
+    """Protocol of a simple info logger. Structured fields (see FIELDS) are passed
+    as a dict with the extra keyword argument.
+    """
 
-    def info(
-        self, msg: str, *args: Any
-    ) -> None: ...  # pylint: disable=missing-function-docstring
+    def info(  # pylint: disable=missing-function-docstring
+        self, msg: str, *args: Any, **kwargs: Any
+    ) -> None: ...
 
 
 class NoLogger:
-    """No-op logger"""
+    """No-op logger. As the game log has no handlers, moves and captures are not
+    formatted either, so that the game is fully silent.
+    """
+
+    def __init__(self):
+        self.level = logging.NOTSET  # level of the game log before entering
 
     def __enter__(self) -> LoggerProtocol:
+        logger = logging.getLogger(GAME_LOG)
+        self.level = logger.level
+        logger.setLevel(logging.WARNING)
         return self
 
     def __exit__(self, *_):
-        pass
+        logging.getLogger(GAME_LOG).setLevel(self.level)
 
-    def info(self, msg: str, *args: Any) -> None:  # pylint: disable=unused-argument
+    def info(  # pylint: disable=unused-argument
+        self, msg: str, *args: Any, **kwargs: Any
+    ) -> None:
         """Does nothing"""
 
 
+class JsonFormatter(logging.Formatter):
+    """Formats records as JSON lines with the timestamp, the message and the
+    structured fields of the record
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {"timestamp": record.created, "message": record.getMessage()}
+        data.update(
+            (name, getattr(record, name)) for name in FIELDS if hasattr(record, name)
+        )
+        return json.dumps(data)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler which leaves the formatting of messages to the listener thread.
+    Arguments of records must not be changed after they are logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class Logger:
-    """Logger context manager"""
+    """Logger context manager. Records are put on a queue and written by a
+    background listener thread: as JSON lines to the log file and as plain
+    messages to stdout, unless console is False.
+    """
 
-    def __init__(self, folder: str, filename: str):
+    def __init__(self, folder: str, filename: str, console: bool = True):
         self.folder = folder
         self.filename = filename
+        self.console = console
         self.logger: logging.Logger = None  # type: ignore
+        self.listener: Optional[logging.handlers.QueueListener] = None
 
     def __enter__(self) -> LoggerProtocol:
         self._init_folder()
@@ -46,21 +92,29 @@ class Logger:
         return self.logger
 
     def __exit__(self, *_):
+        if self.listener is not None:
+            self.listener.stop()  # writes the queued records
         self.logger.handlers.clear()
         logging.shutdown()
 
     def _init_logger(self):
-        self.logger = logging.getLogger("game.log")
+        self.logger = logging.getLogger(GAME_LOG)
         self.logger.handlers.clear()
+        self.logger.setLevel(logging.INFO)
 
         now = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
         filepath = os.path.join(self.folder, f"{now}_{self.filename}")
         file_handler = logging.FileHandler(filepath, mode="w")
-        file_handler.setLevel(logging.DEBUG)
-        self.logger.addHandler(file_handler)
+        file_handler.setFormatter(JsonFormatter())
+        handlers: List[logging.Handler] = [file_handler]
+        if self.console:
+            handlers.append(logging.StreamHandler(sys.stdout))
 
-        self.logger.addHandler(logging.StreamHandler(sys.stdout))
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self.logger.addHandler(_QueueHandler(records))
         self.logger.propagate = False
+        self.listener = logging.handlers.QueueListener(records, *handlers)
+        self.listener.start()
 
     def _init_folder(self):
         if not os.path.isdir(self.folder):
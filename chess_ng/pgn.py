@@ -0,0 +1,215 @@
+"""Module introducing PGN (portable game notation) support"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from chess_ng.board import Board
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.engine import opponent
+from chess_ng.fen import load_board
+from chess_ng.notation import format_san, make_move, parse_san
+from chess_ng.team import Team
+from chess_ng.util import convert_str
+
+if TYPE_CHECKING:
+    from chess_ng.game import Game
+
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+_TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TOKEN = re.compile(r"\s*(?:(\{)|(;)|(\()|(\))|(\$\d+)|([^\s{}();]+))")
+_MOVE_NUMBER = re.compile(r"\d+\.+")
+
+
+@dataclass
+class PgnGame:
+    """A game read from PGN: its tags, its moves in SAN and its result"""
+
+    headers: Dict[str, str] = field(default_factory=dict)
+    moves: List[str] = field(default_factory=list)
+    result: str = "*"
+
+    @property
+    def fen(self) -> str:
+        """Returns the FEN of the initial position, from the FEN tag if present"""
+        return self.headers.get("FEN", STARTING_FEN)
+
+
+def format_pgn(
+    headers: Dict[str, str],
+    moves: Sequence[str],
+    result: str = "*",
+    fen: Optional[str] = None,
+    line_length: int = 79,
+) -> str:
+    """Formats a game in PGN, with the moves in SAN. The seven tag roster is
+    completed with unknown values, and games not starting from the starting position
+    get SetUp and FEN tags. Returns the game followed by an empty line.
+    """
+    if result not in RESULTS:
+        raise ValueError(f"Invalid PGN result {result}.")
+    headers = {**{tag: "?" for tag in SEVEN_TAG_ROSTER}, **headers, "Result": result}
+    if fen is not None and not is_starting_position(fen):
+        headers.update({"SetUp": "1", "FEN": fen})
+    tags = "".join(f'[{tag} "{_escape(value)}"]\n' for tag, value in headers.items())
+    return f"{tags}\n{format_movetext(moves, result, fen, line_length)}\n\n"
+
+
+def format_movetext(
+    moves: Sequence[str],
+    result: str = "*",
+    fen: Optional[str] = None,
+    line_length: int = 79,
+) -> str:
+    """Formats the moves with move numbers, followed by the result. The move number
+    and side to move of the first move are taken from the FEN, if any.
+    """
+    fields = fen.split() if fen is not None else []
+    black_to_move = len(fields) > 1 and fields[1] == "b"
+    number = int(fields[5]) if len(fields) > 5 and fields[5].isdigit() else 1
+    tokens = []
+    for ply, move in enumerate(moves, int(black_to_move)):
+        if ply % 2 == 0:
+            tokens.append(f"{number + ply // 2}.")
+        elif not tokens:
+            tokens.append(f"{number}...")
+        tokens.append(move)
+    tokens.append(result)
+
+    lines = []
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > line_length:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines)
+
+
+def is_starting_position(fen: str) -> bool:
+    """Returns True if the FEN has the pieces and side to move of the starting position"""
+    placement, *fields = fen.split()[:2]
+    start, *start_fields = STARTING_FEN.split()[:2]
+    return placement.rstrip("/") == start.rstrip("/") and fields == start_fields
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def read_pgn(lines: Iterable[str]) -> Iterator[PgnGame]:
+    """Yields the games of the PGN lines one by one, so that files of any size are
+    read with constant memory. Comments, variations and numeric annotation glyphs
+    are skipped.
+    """
+    game = PgnGame()
+    tokenizer = _Tokenizer()
+    for line in lines:
+        if line.startswith("%"):  # escaped line
+            continue
+        tag = _TAG.match(line.strip()) if tokenizer.in_mainline else None
+        if tag is not None:
+            if game.moves:  # a game without a result
+                yield game
+                game = PgnGame()
+            game.headers[tag.group(1)] = re.sub(r"\\(.)", r"\1", tag.group(2))
+            continue
+        for token in tokenizer.tokens(line):
+            if token in RESULTS:
+                game.result = token
+                yield game
+                game = PgnGame()
+            else:
+                game.moves.append(token)
+    if game.moves or game.headers:
+        yield game
+
+
+class _Tokenizer:
+    """Splits movetext into moves and results, keeping track of comments and
+    variations spanning several lines
+    """
+
+    def __init__(self):
+        self.in_comment = False
+        self.variations = 0
+
+    @property
+    def in_mainline(self) -> bool:
+        """Returns True if outside of comments and variations"""
+        return not self.in_comment and not self.variations
+
+    def tokens(self, line: str) -> Iterator[str]:
+        """Yields the moves (without move numbers) and results of the mainline"""
+        position = 0
+        while position < len(line):
+            if self.in_comment:
+                end = line.find("}", position)
+                if end < 0:
+                    return
+                self.in_comment, position = False, end + 1
+                continue
+            match = _TOKEN.match(line, position)
+            if match is None:
+                return
+            position = match.end()
+            brace, semicolon, opening, closing, _, token = match.groups()
+            if semicolon:
+                return  # comment until the end of the line
+            self.in_comment = bool(brace)
+            self.variations = max(self.variations + bool(opening) - bool(closing), 0)
+            if token and not self.variations:
+                token = _MOVE_NUMBER.sub("", token, count=1)
+                if token:
+                    yield token
+
+
+def replay(
+    game: PgnGame,
+) -> Iterator[Tuple[Board, Dict[str, Team], str, str]]:
+    """Yields the board, teams and side to move before each move of the game,
+    together with the move in SAN. The moves are played on the same board after
+    each step with the fast make-move path, so copy what is needed before advancing.
+    Raises a NotationError for moves which cannot be played.
+    """
+    board, teams, side_to_move = load_board(game.fen)
+    for move in game.moves:
+        yield board, teams, side_to_move, move
+        piece, destination = parse_san(board, teams, side_to_move, move)
+        make_move(board, teams, piece, destination)
+        side_to_move = opponent(side_to_move)
+
+
+def format_game(game: Game, headers: Optional[Dict[str, str]] = None) -> str:
+    """Formats a game played with Game in PGN, replaying its moves to convert them to
+    SAN. The player plays the colour of game.player.
+    """
+    board, teams, _ = load_board(game.initial_fen)
+    moves = []
+    for move in game.moves:
+        piece = board[convert_str(move[:2])]
+        destination = convert_str(move[2:4])
+        moves.append(format_san(board, teams, piece, destination))  # type: ignore
+        make_move(board, teams, piece, destination)  # type: ignore
+
+    if game.winner is not None:
+        result = "1-0" if game.winner == WHITE else "0-1"
+    else:
+        result = "1/2-1/2" if game.is_draw else "*"
+    names = {game.player: "Player", opponent(game.player): "chess_ng"}
+    tags = {"White": names[WHITE], "Black": names[BLACK], **(headers or {})}
+    return format_pgn(tags, moves, result, game.initial_fen)
@@ -19,6 +19,9 @@ from chess_ng.util import Move, convert, convert_str, is_diagonal, is_straight
 
 Position = Union[str, Tuple[int, int]]
 
+_LOGGER = logging.getLogger("game.log")
+
+
 # pylint: disable=invalid-name
 class Piece:
     """Piece class. Needs to be subclassed by the various chess pieces"""
@@ -64,18 +67,22 @@ class Piece:
         ]
 
     def move_to(self, position: Tuple[int, int], log: bool = True) -> None:
-        """Moves the piece to the specified position and adds it to the position history"""
-        # pylint: disable=logging-fstring-interpolation
-        pos_old = convert(self.position)
-        self.position = position
-        self.position_history.append(position)
+        """Moves the piece to the specified position and adds it to the position history.
+        The move is logged lazily: nothing is formatted if the game log is disabled.
+        """
         if log:
             self.turn_counter += 0.5
-            logger = logging.getLogger("game.log")
-            move_ = f"{self.representation} from {pos_old} to {convert(position)}"
-            logger.info(
-                f"Turn {math.ceil(self.turn_counter)}: Team {self.team}: {move_}"
-            )
+            if _LOGGER.isEnabledFor(logging.INFO):
+                _LOGGER.info(
+                    "Turn %d: Team %s: %s from %s to %s",
+                    math.ceil(self.turn_counter),
+                    self.team,
+                    self.representation,
+                    convert(self.position),
+                    convert(position),
+                )
+        self.position = position
+        self.position_history.append(position)
 
     def can_capture_at(self, board: Board, position: Tuple[int, int]) -> bool:
         """Returns true if this piece can move to the specified position.
@@ -106,6 +113,10 @@ class Pawn(Piece):
         self._update_promotion(board)
         return super().compute_valid_moves(board)
 
+    def promotes_at(self, position: Tuple[int, int], size: int = 8) -> bool:
+        """Returns True if moving to the specified position promotes the pawn"""
+        return not self.promoted and position[1] in (0, size - 1)
+
     def can_capture_at(self, board: Board, position: Tuple[int, int]) -> bool:
         """Returns true if this piece can move to the specified position"""
         # optimization: return False if more than one square away
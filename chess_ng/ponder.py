@@ -0,0 +1,106 @@
+"""Module containing pondering support, i.e. searching during the player's turn"""
+
+import threading
+from typing import Optional, Tuple
+
+from chess_ng.algorithm import CancellationToken, Number, ReversibleMove
+from chess_ng.game import Game, GameParams
+from chess_ng.hashing import compute_hash
+from chess_ng.interfaces import Piece
+from chess_ng.move import Move
+from chess_ng.util import convert_str
+
+
+class Ponderer:  # pylint: disable=too-many-instance-attributes
+    """Searches the position after the expected player reply in a background thread,
+    while the player is thinking about their move.
+
+    On a ponder hit, the search result is handed to the minimax instance of the game,
+    so that the next engine move does not need to be searched again. On a ponder miss,
+    the search is cancelled and discarded.
+    """
+
+    def __init__(self):
+        self.expected_reply: Optional[Tuple[Tuple[int, int], Tuple[int, int]]] = None
+        self._reply: Optional[Tuple[Piece, Move]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._token: Optional[CancellationToken] = None
+        self._previous_token: Optional[CancellationToken] = None  # of the minimax
+        self._result: Optional[Tuple[Number, Optional[Tuple[Piece, Move]]]] = None
+        self._hash: int = 0
+        self._depth: int = 0
+
+    def start(self, game: Game, params: GameParams) -> bool:
+        """Starts pondering on the reply predicted by the last engine search.
+        Returns False if no reply could be predicted.
+        """
+        self.stop(game)
+        variation = game.minimax.principal_variation
+        if len(variation) < 2:
+            return False
+
+        reply = variation[1]
+        valid_moves = game.player_team.compute_valid_moves(game.board, game.team.pieces)
+        if reply not in valid_moves:
+            return False
+
+        self._reply = reply
+        self.expected_reply = (reply[0].position, reply[1].position)
+        self._result = None
+        self._depth = params.depth
+        self._token = CancellationToken()
+        self._previous_token = game.minimax.cancellation_token
+        self._thread = threading.Thread(target=self._search, args=(game,), daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(
+        self,
+        game: Game,
+        source_square: Optional[str] = None,
+        dest_square: Optional[str] = None,
+    ) -> bool:
+        """Stops pondering once the player has decided on a move, which must happen
+        before the move is played on the board. Returns True on a ponder hit, in which
+        case the search is completed and its result saved for the next engine move.
+        """
+        if self._thread is None:
+            return False
+
+        hit = self._is_hit(source_square, dest_square)
+        if not hit:
+            self._token.cancel()  # type: ignore
+        self._thread.join()
+        self._thread = None
+        game.minimax.cancellation_token = self._previous_token
+        self._previous_token = None
+
+        if hit and self._result is not None:
+            game.minimax.save_result(self._hash, self._depth, self._result)
+        self.expected_reply = None
+        self._reply = None
+        return hit
+
+    def _is_hit(self, source_square: Optional[str], dest_square: Optional[str]):
+        if self.expected_reply is None or source_square is None or dest_square is None:
+            return False
+        try:
+            squares = (
+                convert_str(source_square.lower()),
+                convert_str(dest_square.lower()),
+            )
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return squares == self.expected_reply
+
+    def _search(self, game: Game) -> None:
+        piece, move = self._reply  # type: ignore
+        team, enemy = game.team, game.player_team
+        game.minimax.cancellation_token = self._token
+        with ReversibleMove(game.board, piece, move.position, team.pieces):
+            self._hash = compute_hash(game.board, game.minimax.hash_values)
+            result = game.minimax.run(
+                game.board, team, enemy, depth=self._depth, maximizing_player=True
+            )
+        if not self._token.cancelled:  # type: ignore
+            self._result = result
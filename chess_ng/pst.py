@@ -0,0 +1,321 @@
+"""Module containing a tapered piece-square table evaluation, updated incrementally"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple, Union
+
+from chess_ng.algorithm import Number, _TeamInterface, evaluate_length
+from chess_ng.board import Board, ChangeTracker
+from chess_ng.consts import BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE
+from chess_ng.interfaces import Piece
+from chess_ng.mobility import MoveCache
+
+Position = Tuple[int, int]
+Contribution = Tuple[int, int, int]  # middlegame score, endgame score, phase
+Tables = Dict[str, List[int]]  # 64 scores per piece symbol, indexed by y * 8 + x
+
+# Piece values in centipawns, for the middlegame and the endgame
+MIDDLEGAME_VALUES = {
+    PAWN: 82,
+    KNIGHT: 337,
+    BISHOP: 365,
+    ROOK: 477,
+    QUEEN: 1025,
+    KING: 0,
+}
+ENDGAME_VALUES = {PAWN: 94, KNIGHT: 281, BISHOP: 297, ROOK: 512, QUEEN: 936, KING: 0}
+PHASE_WEIGHTS = {PAWN: 0, KNIGHT: 1, BISHOP: 1, ROOK: 2, QUEEN: 4, KING: 0}
+MAX_PHASE = 24  # phase of the starting position, i.e. the pure middlegame
+PATH_VARIABLE = "CHESS_NG_PST"
+
+# Square bonuses in centipawns from the perspective of white, rank 8 first,
+# based on the Simplified Evaluation Function by Tomasz Michniewski
+PAWN_TABLE = [
+    0,   0,   0,   0,   0,   0,   0,   0,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    10,  10,  20,  30,  30,  20,  10,  10,
+    5,   5,   10,  25,  25,  10,  5,   5,
+    0,   0,   0,   20,  20,  0,   0,   0,
+    5,   -5,  -10, 0,   0,   -10, -5,  5,
+    5,   10,  10,  -20, -20, 10,  10,  5,
+    0,   0,   0,   0,   0,   0,   0,   0,
+]  # fmt: skip
+PAWN_ENDGAME_TABLE = [
+    0,   0,   0,   0,   0,   0,   0,   0,
+    80,  80,  80,  80,  80,  80,  80,  80,
+    50,  50,  50,  50,  50,  50,  50,  50,
+    30,  30,  30,  30,  30,  30,  30,  30,
+    20,  20,  20,  20,  20,  20,  20,  20,
+    10,  10,  10,  10,  10,  10,  10,  10,
+    0,   0,   0,   0,   0,   0,   0,   0,
+    0,   0,   0,   0,   0,   0,   0,   0,
+]  # fmt: skip
+KNIGHT_TABLE = [
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0,   0,   0,   0,   -20, -40,
+    -30, 0,   10,  15,  15,  10,  0,   -30,
+    -30, 5,   15,  20,  20,  15,  5,   -30,
+    -30, 0,   15,  20,  20,  15,  0,   -30,
+    -30, 5,   10,  15,  15,  10,  5,   -30,
+    -40, -20, 0,   5,   5,   0,   -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+]  # fmt: skip
+BISHOP_TABLE = [
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0,   0,   0,   0,   0,   0,   -10,
+    -10, 0,   5,   10,  10,  5,   0,   -10,
+    -10, 5,   5,   10,  10,  5,   5,   -10,
+    -10, 0,   10,  10,  10,  10,  0,   -10,
+    -10, 10,  10,  10,  10,  10,  10,  -10,
+    -10, 5,   0,   0,   0,   0,   5,   -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+]  # fmt: skip
+ROOK_TABLE = [
+    0,   0,   0,   0,   0,   0,   0,   0,
+    5,   10,  10,  10,  10,  10,  10,  5,
+    -5,  0,   0,   0,   0,   0,   0,   -5,
+    -5,  0,   0,   0,   0,   0,   0,   -5,
+    -5,  0,   0,   0,   0,   0,   0,   -5,
+    -5,  0,   0,   0,   0,   0,   0,   -5,
+    -5,  0,   0,   0,   0,   0,   0,   -5,
+    0,   0,   0,   5,   5,   0,   0,   0,
+]  # fmt: skip
+QUEEN_TABLE = [
+    -20, -10, -10, -5,  -5,  -10, -10, -20,
+    -10, 0,   0,   0,   0,   0,   0,   -10,
+    -10, 0,   5,   5,   5,   5,   0,   -10,
+    -5,  0,   5,   5,   5,   5,   0,   -5,
+    0,   0,   5,   5,   5,   5,   0,   -5,
+    -10, 5,   5,   5,   5,   5,   0,   -10,
+    -10, 0,   5,   0,   0,   0,   0,   -10,
+    -20, -10, -10, -5,  -5,  -10, -10, -20,
+]  # fmt: skip
+KING_TABLE = [
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20,  20,  0,   0,   0,   0,   20,  20,
+    20,  30,  10,  0,   0,   10,  30,  20,
+]  # fmt: skip
+KING_ENDGAME_TABLE = [
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0,   0,   -10, -20, -30,
+    -30, -10, 20,  30,  30,  20,  -10, -30,
+    -30, -10, 30,  40,  40,  30,  -10, -30,
+    -30, -10, 30,  40,  40,  30,  -10, -30,
+    -30, -10, 20,  30,  30,  20,  -10, -30,
+    -30, -30, 0,   0,   0,   0,   -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50,
+]  # fmt: skip
+
+MIDDLEGAME_TABLES = {
+    PAWN: PAWN_TABLE,
+    KNIGHT: KNIGHT_TABLE,
+    BISHOP: BISHOP_TABLE,
+    ROOK: ROOK_TABLE,
+    QUEEN: QUEEN_TABLE,
+    KING: KING_TABLE,
+}
+ENDGAME_TABLES = {
+    **MIDDLEGAME_TABLES,
+    PAWN: PAWN_ENDGAME_TABLE,
+    KING: KING_ENDGAME_TABLE,
+}
+
+
+def default_tables() -> Tuple[Tables, Tables]:
+    """Returns the middlegame and endgame tables of the piece values plus the square
+    bonuses, in centipawns from the perspective of white, rank 8 first.
+    """
+    middlegame = {
+        symbol: [MIDDLEGAME_VALUES[symbol] + bonus for bonus in table]
+        for symbol, table in MIDDLEGAME_TABLES.items()
+    }
+    endgame = {
+        symbol: [ENDGAME_VALUES[symbol] + bonus for bonus in table]
+        for symbol, table in ENDGAME_TABLES.items()
+    }
+    return middlegame, endgame
+
+
+def load_tables(path: Union[str, os.PathLike]) -> Tuple[Tables, Tables]:
+    """Loads middlegame and endgame tables from a JSON file of the form
+    {"middlegame": {symbol: [64 scores]}, "endgame": {...}}, e.g. written by the
+    tune command. Symbols missing from the file keep their default tables.
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    tables = default_tables()
+    for phase_tables, name in zip(tables, ("middlegame", "endgame")):
+        for symbol, table in data.get(name, {}).items():
+            if symbol not in phase_tables or len(table) != 64:
+                raise ValueError(f"Invalid {name} table {symbol} in {path}.")
+            phase_tables[symbol] = [int(round(score)) for score in table]
+    return tables
+
+
+def save_tables(
+    path: Union[str, os.PathLike], middlegame: Tables, endgame: Tables
+) -> None:
+    """Saves the tables in the JSON format read by load_tables"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"middlegame": middlegame, "endgame": endgame}, file, indent=4)
+
+
+def build_contributions(
+    middlegame: Tables, endgame: Tables
+) -> Dict[str, List[Contribution]]:
+    """Returns the contribution of each piece representation on each square,
+    indexed by y * 8 + x. Black pieces use the mirrored tables and negative scores.
+    """
+    contributions: Dict[str, List[Contribution]] = {}
+    for symbol, phase in PHASE_WEIGHTS.items():
+        for team, sign in ((WHITE, 1), (BLACK, -1)):
+            contributions[symbol + team] = [
+                (sign * middlegame[symbol][i], sign * endgame[symbol][i], phase)
+                for i in (
+                    range(64)
+                    if team == WHITE
+                    else [(7 - y) * 8 + x for y in range(8) for x in range(8)]
+                )
+            ]
+    return contributions
+
+
+CONTRIBUTIONS = build_contributions(*default_tables())
+
+
+def contribution(  # pylint: disable=dangerous-default-value
+    piece: Piece, contributions: Dict[str, List[Contribution]] = CONTRIBUTIONS
+) -> Contribution:
+    """Returns the middlegame score, endgame score and phase of the piece on its
+    square, from the perspective of white. Promoted pawns count as queens.
+    """
+    x, y = piece.position  # pylint: disable=invalid-name
+    return contributions[piece.representation][y * 8 + x]
+
+
+def taper(middlegame: int, endgame: int, phase: int) -> float:
+    """Interpolates between the middlegame and endgame score (in centipawns) by
+    the game phase, returning the score in pawns.
+    """
+    phase = min(phase, MAX_PHASE)
+    return (middlegame * phase + endgame * (MAX_PHASE - phase)) / MAX_PHASE / 100
+
+
+def evaluate_pst(  # pylint: disable=dangerous-default-value
+    board: Board,
+    team: _TeamInterface,
+    enemy: _TeamInterface,
+    contributions: Dict[str, List[Contribution]] = CONTRIBUTIONS,
+) -> float:
+    """Evaluates the material and piece squares of all pieces, tapered by the
+    game phase. Computed from scratch, see PstEvaluation for the incremental version.
+    """
+    # pylint: disable=unused-argument
+    middlegame = endgame = phase = 0
+    for piece in team.pieces + enemy.pieces:
+        piece_middlegame, piece_endgame, piece_phase = contribution(
+            piece, contributions
+        )
+        middlegame += piece_middlegame
+        endgame += piece_endgame
+        phase += piece_phase
+    score = taper(middlegame, endgame, phase)
+    return score if team.representation == WHITE else -score
+
+
+class PstEvaluation:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """Evaluates positions like evaluate_pst, plus an optional mobility term of
+    mobility_weight pawns per pseudo-legal move more than the enemy. The tables are
+    loaded by load_tables from the path or, by default, from the file named by the
+    CHESS_NG_PST environment variable. The default tables are used if neither is set.
+
+    The scores are updated incrementally: the board reports the squares whose
+    occupant changed since the previous call, and only the contributions of these
+    squares are replaced, so that evaluating a leaf costs O(1) without the mobility
+    term. The mobility term reads the move counts kept by a MoveCache, which only
+    recomputes the pieces affected by the changed squares.
+    Instances should not be shared between threads.
+    """
+
+    def __init__(
+        self,
+        mobility_weight: float = 0.04,
+        path: Optional[Union[str, os.PathLike]] = None,
+    ):
+        self.mobility_weight = mobility_weight
+        path = path or os.environ.get(PATH_VARIABLE)
+        self.contributions = (
+            CONTRIBUTIONS if not path else build_contributions(*load_tables(path))
+        )
+        self.cache = MoveCache()
+        self._tracker = ChangeTracker()
+        self._contributions: Dict[Position, Contribution] = {}
+        self._middlegame = self._endgame = self._phase = 0
+
+    def __getstate__(self):
+        # the scores are kept for the tracked board, which is not pickled, and
+        # the default tables are not copied
+        state = self.__dict__.copy()
+        state.update(
+            _tracker=ChangeTracker(),
+            _contributions={},
+            _middlegame=0,
+            _endgame=0,
+            _phase=0,
+        )
+        if self.contributions is CONTRIBUTIONS:
+            state["contributions"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.contributions is None:
+            self.contributions = CONTRIBUTIONS
+
+    def __call__(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number:
+        if not isinstance(board, Board):
+            score = evaluate_pst(board, team, enemy, self.contributions)
+            if self.mobility_weight:
+                score += self.mobility_weight * evaluate_length(board, team, enemy)
+            return score
+
+        self._update(board)
+        score = taper(self._middlegame, self._endgame, self._phase)
+        if team.representation != WHITE:
+            score = -score
+        if not self.mobility_weight:
+            return score
+
+        self.cache.update(board)
+        moves = self.cache.move_counts
+        mobility = moves[team.representation] - moves[enemy.representation]
+        return score + self.mobility_weight * mobility
+
+    def _update(self, board: Board) -> None:
+        if self._tracker.follow(board):
+            self._contributions = {}
+            self._middlegame = self._endgame = self._phase = 0
+
+        changes = self._tracker.changes
+        for position in changes:
+            old = self._contributions.pop(position, None)
+            if old is not None:
+                self._middlegame -= old[0]
+                self._endgame -= old[1]
+                self._phase -= old[2]
+            piece = board[position]
+            if piece is not None:
+                new = self._contributions[position] = contribution(
+                    piece, self.contributions
+                )
+                self._middlegame += new[0]
+                self._endgame += new[1]
+                self._phase += new[2]
+        changes.clear()
@@ -1,21 +1,25 @@
 # -*- coding: utf-8 -*-
-"""Module containing Board renderers"""
+"""Module containing Board renderers. PIL is imported when images are rendered"""
+
+from __future__ import annotations
 
 import glob
 import itertools
 import os
 import string
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Protocol, Tuple, Union
-
-from PIL import Image, ImageDraw, ImageFont
+from typing import TYPE_CHECKING, Dict, List, Optional, Protocol, TextIO, Tuple, Union
 
 from chess_ng import consts
-from chess_ng.board import Board
+from chess_ng.board import Board, square_string
 from chess_ng.interfaces import Piece
 
-ImageDict = Dict[str, Dict[str, Image.Image]]
-Font = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
+
+    ImageDict = Dict[str, Dict[str, Image.Image]]
+    Font = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
 
 
 class PieceReader(
@@ -41,6 +45,8 @@ class DefaultPieceReader:
 
     @classmethod
     def _read_images(cls, path: str):
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+
         for i in glob.glob(path, recursive=True):
             yield cls._name(i), Image.open(i)
 
@@ -53,6 +59,8 @@ class DefaultPieceReader:
 
 def load_default_font() -> Font:
     """Loads the default font for the text on a chess board"""
+    from PIL import ImageFont  # pylint: disable=import-outside-toplevel
+
     try:
         return ImageFont.truetype("arial.ttf", 20)
     except OSError:
@@ -60,8 +68,12 @@ def load_default_font() -> Font:
 
 
 @dataclass
-class ImageRenderer:
-    """Renders the chess board as a PIL.Image.Image"""
+class ImageRenderer:  # pylint: disable=too-many-instance-attributes
+    """Renders the chess board as a PIL.Image.Image. The piece images are read once
+    into an atlas of tiles, pieces composited on light and on dark squares, and the
+    empty board with its sides is drawn once per board size. Each frame is then a
+    copy of the empty board with a paste per occupied square.
+    """
 
     light: str = "#CCCCCC"
     dark: str = "#666666"
@@ -70,55 +82,88 @@ class ImageRenderer:
     square_size: int = 60
     board_offset: int = 23
     piece_reader: PieceReader = field(default_factory=DefaultPieceReader)
+    _tiles: Dict[Tuple[str, str, bool], Image.Image] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _backgrounds: Dict[int, Image.Image] = field(
+        default_factory=dict, init=False, repr=False
+    )
 
     def render(self, board: Board) -> Image.Image:
         """Renders the board as an image and returns it"""
-        pieces = self.piece_reader.read_pieces()
-        full_size = self.square_size * board.size + self.board_offset
-        new_im = Image.new("RGBA", (full_size, full_size))
-        for pos in itertools.product(range(board.size), repeat=2):
-            pixel_position = (
-                pos[0] * self.square_size + self.board_offset,
-                pos[1] * self.square_size,
-            )
-            new_im.paste(self._render_background(pos), pixel_position)
-            piece = board[pos]
-            if piece is None:
-                continue
-            image = self._render_piece(piece, pieces)
-            new_im.paste(image, pixel_position, image)
-        self._render_sides(new_im, board)
-        return new_im
+        image = self._render_board(board.size).copy()
+        for y, row in enumerate(board):  # pylint: disable=invalid-name
+            for x, piece in enumerate(row):  # pylint: disable=invalid-name
+                if piece is not None:
+                    image.paste(
+                        self._render_tile(piece, (x + y) % 2 == 1),
+                        (
+                            x * self.square_size + self.board_offset,
+                            y * self.square_size,
+                        ),
+                    )
+        return image
+
+    def _render_board(self, size: int) -> Image.Image:
+        """Returns the cached image of the empty board with its row and column names"""
+        if size not in self._backgrounds:
+            from PIL import Image  # pylint: disable=import-outside-toplevel
+
+            full_size = self.square_size * size + self.board_offset
+            image = Image.new("RGBA", (full_size, full_size))
+            for pos in itertools.product(range(size), repeat=2):
+                pixel_position = (
+                    pos[0] * self.square_size + self.board_offset,
+                    pos[1] * self.square_size,
+                )
+                image.paste(self._render_background(pos), pixel_position)
+            self._render_sides(image, size)
+            self._backgrounds[size] = image
+        return self._backgrounds[size]
+
+    def _render_tile(self, piece: Piece, dark: bool) -> Image.Image:
+        """Returns the cached tile of the piece on a light or dark square"""
+        if not self._tiles:
+            for team, images in self.piece_reader.read_pieces().items():
+                for name, image in images.items():
+                    for is_dark in (False, True):
+                        tile = self._render_background((int(is_dark), 0))
+                        tile.paste(image, (0, 0), image)
+                        self._tiles[team, name, is_dark] = tile
+        return self._tiles[piece.team, self._piece_name(piece), dark]
 
     def _render_background(self, position: Tuple[int, int]) -> Image.Image:
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+
         x, y = position  # pylint: disable=invalid-name
         colour = self.light if (x + y) % 2 == 0 else self.dark
         return Image.new("RGBA", (self.square_size, self.square_size), color=colour)
 
     @staticmethod
-    def _render_piece(piece: Piece, pieces: ImageDict):
-        name = (
+    def _piece_name(piece: Piece) -> str:
+        return (
             "queen"
             if piece.representation.upper().startswith(consts.QUEEN)
             else piece.__class__.__name__.lower()
         )
-        return pieces[piece.team][name]
 
-    def _render_sides(self, image: Image.Image, board: Board):
+    def _render_sides(self, image: Image.Image, size: int):
+        from PIL import ImageDraw  # pylint: disable=import-outside-toplevel
+
         draw = ImageDraw.Draw(image)
 
         # pylint: disable=invalid-name
         # render row numbers next to board
-        for y in range(board.size):
+        for y in range(size):
             draw.text(  # type: ignore
                 xy=(0, y * self.square_size + self.board_offset),
-                text=str(board.size - y),
+                text=str(size - y),
                 fill=self.text_colour,
                 font=self.font,
             )
 
         # render column letters under board
-        for x, letter in zip(range(board.size), string.ascii_lowercase):
+        for x, letter in zip(range(size), string.ascii_lowercase):
             draw.text(  # type: ignore
                 xy=(
                     self.board_offset + x * self.square_size,
@@ -128,3 +173,51 @@ class ImageRenderer:
                 fill=self.text_colour,
                 font=self.font,
             )
+
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+@dataclass
+class TerminalRenderer:
+    """Renders the chess board in the terminal with ANSI colours, like printing the
+    board, in a single write per frame. If diff is True, the first frame clears the
+    screen and later frames only redraw the squares which changed, using cursor
+    addressing. Other output should then be disabled, as it would scroll the board.
+    """
+
+    output: TextIO = field(default_factory=lambda: sys.stdout)
+    diff: bool = False
+    _squares: Optional[List[str]] = field(default=None, init=False, repr=False)
+
+    def __call__(self, board: Board) -> None:
+        self.render(board)
+
+    def render(self, board: Board) -> None:
+        """Writes the frame of the board to the output"""
+        squares = [
+            square_string((x + y) % 2 == 0, piece.representation if piece else None)
+            for y, row in enumerate(board)
+            for x, piece in enumerate(row)
+        ]
+        if not self.diff:
+            frame = self._frame(squares, board.size) + "\n"
+        elif self._squares is None or len(self._squares) != len(squares):
+            frame = CLEAR_SCREEN + self._frame(squares, board.size)
+        else:
+            # rows and columns of the cursor start at 1, squares are 2 columns wide
+            frame = "".join(
+                f"\x1b[{i // board.size + 1};{i % board.size * 2 + 1}H{square}"
+                for i, (square, previous) in enumerate(zip(squares, self._squares))
+                if square != previous
+            )
+            frame += f"\x1b[{board.size + 1};1H"
+        self._squares = squares
+        self.output.write(frame)
+        self.output.flush()
+
+    @staticmethod
+    def _frame(squares: List[str], size: int) -> str:
+        return "".join(
+            "".join(squares[i : i + size]) + "\n" for i in range(0, len(squares), size)
+        )
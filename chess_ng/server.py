@@ -0,0 +1,557 @@
+"""Module containing a local HTTP/JSON server hosting many games in one process,
+with the engine searches of all games dispatched to a shared worker pool
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import dataclasses
+import functools
+import itertools
+import json
+import math
+import statistics
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from chess_ng import analysis
+from chess_ng.algorithm import CancellationToken
+from chess_ng.board import Board
+from chess_ng.consts import STARTING_FEN
+from chess_ng.engine import (
+    SearchLimits,
+    SearchResult,
+    adjudicate,
+    create_minimax,
+    opponent,
+    search,
+)
+from chess_ng.fen import FenNotationError, construct_fen_notation, load_board
+from chess_ng.notation import NotationError
+from chess_ng.team import Team
+from chess_ng.uci import apply_move
+
+Record = Dict[str, Any]
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+MAX_BODY = 64 * 1024
+# types of the search limits accepted when creating a game
+LIMIT_TYPES: Dict[str, Tuple[type, ...]] = {
+    "depth": (int,),
+    "movetime": (int, float),
+    "nodes": (int,),
+}
+LATENCY_SAMPLES = 1000  # amount of recent requests the latency metrics are taken from
+
+
+class ServerError(Exception):
+    """Error answered with the HTTP status and a JSON error message"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class DeadlineExceeded(ServerError):
+    """Raised when a search request expires before a worker becomes available"""
+
+    def __init__(self):
+        super().__init__(504, "The deadline expired before the search could start.")
+
+
+def replay(fen: str, moves: List[str]) -> Tuple[Board, Dict[str, Team], str]:
+    """Returns the board, teams and side to move after playing the moves in long
+    algebraic notation from the position, keeping the history for repetitions
+    """
+    board, teams, side_to_move = load_board(fen)
+    for move in moves:
+        apply_move(board, teams, side_to_move, move)
+        side_to_move = opponent(side_to_move)
+    return board, teams, side_to_move
+
+
+def search_game(fen: str, moves: List[str], limits: SearchLimits) -> SearchResult:
+    """Searches the position after the moves within the limits. Meant to be run in a
+    worker process initialised by analysis.init_worker, whose minimax instance
+    is shared by all games searched in the worker.
+    """
+    board, teams, side_to_move = replay(fen, moves)
+    minimax = analysis.worker_minimax() or create_minimax()
+    token = CancellationToken(timeout=limits.movetime)
+    return search(minimax, board, teams, side_to_move, limits, token)
+
+
+@dataclass
+class Session:
+    """A game hosted by the server: its initial position, the moves played since
+    in long algebraic notation and the search limits of the engine
+    """
+
+    id: str  # pylint: disable=invalid-name
+    fen: str = STARTING_FEN
+    limits: SearchLimits = field(default_factory=SearchLimits)
+    moves: List[str] = field(default_factory=list)
+
+    def play(self, move: str) -> None:
+        """Plays the move, raising a NotationError if it is illegal"""
+        board, teams, side_to_move = replay(self.fen, self.moves)
+        if adjudicate(board, teams, side_to_move) is not None:
+            raise ServerError(409, "The game is over.")
+        apply_move(board, teams, side_to_move, move)
+        self.moves.append(move)
+
+    def state(self) -> Record:
+        """Returns the position and the result of the game as a JSON serializable dict"""
+        board, teams, side_to_move = replay(self.fen, self.moves)
+        outcome = adjudicate(board, teams, side_to_move)
+        result, termination = outcome if outcome is not None else ("*", None)
+        return {
+            "id": self.id,
+            "fen": construct_fen_notation(board, side_to_move),
+            "moves": list(self.moves),
+            "result": result,
+            "termination": termination,
+        }
+
+
+@dataclass
+class _Job:
+    session: Session
+    expires: float
+    submitted: float
+    future: asyncio.Future
+
+
+def _latency_stats(samples: Deque[float]) -> Record:
+    if not samples:
+        return {"count": 0}
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 1),
+        "p50_ms": round(values[len(values) // 2] * 1000, 1),
+        "p95_ms": round(
+            values[min(int(len(values) * 0.95), len(values) - 1)] * 1000, 1
+        ),
+        "max_ms": round(values[-1] * 1000, 1),
+    }
+
+
+class SearchScheduler:  # pylint: disable=too-many-instance-attributes
+    """Runs the searches of many games on a bounded amount of workers.
+
+    Each game has its own queue of search requests, and workers serve the games
+    round robin, one search per game at a time, so that a game with many requests
+    cannot starve the others. Requests not started before their deadline fail with
+    DeadlineExceeded, and running searches are limited to the time left until the
+    deadline, so that the best move found so far is returned in time.
+    """
+
+    def __init__(
+        self,
+        executor: concurrent.futures.Executor,
+        workers: int,
+        max_queued: int = 1024,
+    ):
+        self.executor = executor
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queues: Dict[str, Deque[_Job]] = collections.OrderedDict()
+        self._running: Dict[str, _Job] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self.counters = collections.Counter(
+            submitted=0, completed=0, expired=0, failed=0, rejected=0
+        )
+        self.wait_times: Deque[float] = collections.deque(maxlen=LATENCY_SAMPLES)
+        self.latencies: Deque[float] = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def busy(self, session_id: str) -> bool:
+        """Returns True if a search of the game is queued or running"""
+        return session_id in self._running or session_id in self._queues
+
+    @property
+    def queued(self) -> int:
+        """Returns the amount of search requests waiting for a worker"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        """Starts the worker tasks on the running event loop. Called by submit"""
+        if self._tasks:
+            return
+        self._changed = asyncio.Condition()
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stops the worker tasks and fails all queued requests"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+
+    async def submit(self, session: Session, deadline: float) -> SearchResult:
+        """Queues a search of the current position of the game, returning its result
+        once a worker has searched it, at the latest after deadline seconds
+        """
+        if self.queued >= self.max_queued:
+            self.counters["rejected"] += 1
+            raise ServerError(503, "Too many queued searches.")
+        self.start()
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        job = _Job(session, now + deadline, now, loop.create_future())
+        self._queues.setdefault(session.id, collections.deque()).append(job)
+        self.counters["submitted"] += 1
+        async with self._changed:  # type: ignore
+            self._changed.notify()  # type: ignore
+        return await job.future
+
+    def metrics(self) -> Record:
+        """Returns the queue depth, the request counters and the latencies of recent
+        requests, i.e. the time waited for a worker and the total time
+        """
+        return {
+            "workers": self.workers,
+            "queued": self.queued,
+            "running": len(self._running),
+            **self.counters,
+            "wait": _latency_stats(self.wait_times),
+            "latency": _latency_stats(self.latencies),
+        }
+
+    def _next_job(self) -> Optional[_Job]:
+        for key, queue in self._queues.items():
+            if key in self._running:
+                continue
+            job = queue.popleft()
+            del self._queues[key]
+            if queue:
+                self._queues[key] = queue  # served again after all other games
+            if job.future.done():  # cancelled by the client
+                return self._next_job()
+            return job
+        return None
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            async with self._changed:  # type: ignore
+                job = self._next_job()
+                while job is None:
+                    await self._changed.wait()  # type: ignore
+                    job = self._next_job()
+                self._running[job.session.id] = job
+            try:
+                await self._run(loop, job)
+            finally:
+                del self._running[job.session.id]
+                async with self._changed:  # type: ignore
+                    self._changed.notify()  # type: ignore
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, job: _Job) -> None:
+        started = loop.time()
+        remaining = job.expires - started
+        if remaining <= 0:
+            self.counters["expired"] += 1
+            job.future.set_exception(DeadlineExceeded())
+            return
+        self.wait_times.append(started - job.submitted)
+        session = job.session
+        movetime = session.limits.movetime
+        limits = dataclasses.replace(
+            session.limits,
+            movetime=remaining if movetime is None else min(movetime, remaining),
+        )
+        try:
+            result = await loop.run_in_executor(
+                self.executor,
+                functools.partial(
+                    search_game, session.fen, list(session.moves), limits
+                ),
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            self.counters["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(exc)
+            return
+        if result.bestmove is not None:
+            session.moves.append(result.bestmove)
+        self.counters["completed"] += 1
+        self.latencies.append(loop.time() - job.submitted)
+        if not job.future.done():
+            job.future.set_result(result)
+
+
+Handler = Callable[[Dict[str, str], Record], Awaitable[Tuple[int, Any]]]
+
+
+class GameServer:
+    """HTTP/JSON server hosting games, with the routes
+
+    - POST /games: starts a game from the optional fen, with the optional depth,
+      movetime (in seconds) and nodes search limits of the engine
+    - GET /games/<id>: returns the position, moves and result of the game
+    - DELETE /games/<id>: ends the game
+    - POST /games/<id>/moves: plays the move, e.g. {"move": "e2e4"}
+    - POST /games/<id>/play: lets the engine play a move within the optional deadline
+    - GET /metrics: returns the queue depth, request counters and latencies
+    """
+
+    def __init__(
+        self,
+        scheduler: SearchScheduler,
+        limits: Optional[SearchLimits] = None,
+        deadline: float = 10.0,
+    ):
+        self.scheduler = scheduler
+        self.limits = limits or SearchLimits()
+        self.deadline = deadline
+        self.sessions: Dict[str, Session] = {}
+        self._ids = itertools.count(1)
+        self._routes: List[Tuple[str, Tuple[str, ...], Handler]] = [
+            ("POST", ("games",), self._create),
+            ("GET", ("games", "*"), self._get),
+            ("DELETE", ("games", "*"), self._delete),
+            ("POST", ("games", "*", "moves"), self._move),
+            ("POST", ("games", "*", "play"), self._play),
+            ("GET", ("metrics",), self._metrics),
+        ]
+
+    async def dispatch(self, method: str, path: str, body: Record) -> Tuple[int, Any]:
+        """Handles a request, returning the HTTP status and the JSON response"""
+        parts = tuple(part for part in path.split("?")[0].split("/") if part)
+        methods = []
+        for route_method, pattern, handler in self._routes:
+            if len(pattern) != len(parts) or any(
+                x not in ("*", y) for x, y in zip(pattern, parts)
+            ):
+                continue
+            if route_method != method:
+                methods.append(route_method)
+                continue
+            params = {"id": parts[1]} if len(parts) > 1 else {}
+            try:
+                return await handler(params, body)
+            except ServerError as exc:
+                return exc.status, {"error": exc.message}
+            except (NotationError, FenNotationError) as exc:
+                return 400, {"error": exc.message}
+            except (ValueError, TypeError) as exc:
+                return 400, {"error": str(exc)}
+        if methods:
+            return 405, {"error": f"Allowed methods: {', '.join(methods)}."}
+        return 404, {"error": f"Unknown path {path}."}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serves the HTTP/1.1 requests of a connection until it is closed"""
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ServerError as exc:
+                    # the rest of the request cannot be skipped reliably
+                    error = {"error": exc.message}
+                    writer.write(_format_response(exc.status, error, False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, response = await self.dispatch(method, path, body)
+                except ServerError as exc:
+                    status, response = exc.status, {"error": exc.message}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_format_response(status, response, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _session(self, params: Dict[str, str]) -> Session:
+        session = self.sessions.get(params["id"])
+        if session is None:
+            raise ServerError(404, f"Unknown game {params['id']}.")
+        return session
+
+    async def _create(self, _: Dict[str, str], body: Record) -> Tuple[int, Any]:
+        fen = body.get("fen", STARTING_FEN)
+        if not isinstance(fen, str):
+            raise ServerError(400, "The fen must be a string.")
+        limits = _parse_limits(self.limits, body)
+        session = Session(str(next(self._ids)), fen, limits)
+        state = session.state()  # validates the FEN
+        self.sessions[session.id] = session
+        return 201, state
+
+    async def _get(self, params: Dict[str, str], _: Record) -> Tuple[int, Any]:
+        return 200, self._session(params).state()
+
+    async def _delete(self, params: Dict[str, str], _: Record) -> Tuple[int, Any]:
+        session = self._session(params)
+        del self.sessions[session.id]
+        return 200, {"id": session.id}
+
+    async def _move(self, params: Dict[str, str], body: Record) -> Tuple[int, Any]:
+        session = self._session(params)
+        if self.scheduler.busy(session.id):
+            raise ServerError(409, "The engine is searching a move in this game.")
+        session.play(str(body.get("move", "")))
+        return 200, session.state()
+
+    async def _play(self, params: Dict[str, str], body: Record) -> Tuple[int, Any]:
+        session = self._session(params)
+        deadline = float(body.get("deadline", self.deadline))
+        state = session.state()
+        if state["result"] != "*":
+            raise ServerError(409, "The game is over.")
+        result = await self.scheduler.submit(session, deadline)
+        return 200, {
+            **session.state(),
+            "move": result.bestmove,
+            "score": result.score if math.isfinite(result.score) else None,
+            "depth": result.depth,
+            "nodes": result.nodes,
+            "pv": result.pv,
+        }
+
+    async def _metrics(self, _: Dict[str, str], __: Record) -> Tuple[int, Any]:
+        return 200, {"sessions": len(self.sessions), **self.scheduler.metrics()}
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], Record]]:
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise ServerError(400, "Invalid request line.") from None
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    content_length = headers.get("content-length", "0")
+    if not content_length.isdecimal():
+        raise ServerError(400, "Invalid Content-Length header.")
+    length = int(content_length)
+    if length > MAX_BODY:
+        raise ServerError(413, "The request body is too large.")
+    body: Record = {}
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except ValueError:  # invalid JSON or encoding
+            raise ServerError(400, "The request body is not valid JSON.") from None
+        if not isinstance(body, dict):
+            raise ServerError(400, "The request body must be a JSON object.")
+    return method.upper(), path, headers, body
+
+
+def _parse_limits(limits: SearchLimits, body: Record) -> SearchLimits:
+    """Returns the limits with the depth, movetime and nodes of the body, if any,
+    which must be positive numbers (integers for the depth and nodes)
+    """
+    values: Dict[str, Any] = {}
+    for key, types in LIMIT_TYPES.items():
+        if key not in body:
+            continue
+        value = body[key]
+        if isinstance(value, bool) or not isinstance(value, types) or value <= 0:
+            raise ServerError(400, f"Invalid {key} {value!r}, should be positive.")
+        values[key] = value
+    return dataclasses.replace(limits, **values)
+
+
+def _format_response(status: int, response: Any, keep_alive: bool = True) -> bytes:
+    body = json.dumps(response).encode()
+    headers = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return headers.encode() + body
+
+
+# pylint: disable=too-many-arguments
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    workers: int = 1,
+    evaluation: str = "moves",
+    limits: Optional[SearchLimits] = None,
+    deadline: float = 10.0,
+    max_queued: int = 1024,
+    ready: Optional[Callable[[asyncio.AbstractServer], None]] = None,
+) -> None:
+    """Serves games on the host and port until cancelled, searching in a pool of
+    worker processes initialised with the evaluation
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=analysis.init_worker, initargs=(evaluation,)
+    ) as executor:
+        scheduler = SearchScheduler(executor, workers, max_queued)
+        scheduler.start()
+        game_server = GameServer(scheduler, limits, deadline)
+        server = await asyncio.start_server(game_server.handle_connection, host, port)
+        try:
+            async with server:
+                if ready is not None:
+                    ready(server)
+                await server.serve_forever()
+        finally:
+            await scheduler.close()
+
+
+def run_command(args: Any) -> None:
+    """Runs the serve subcommand with the parsed CLI args"""
+    limits = SearchLimits(depth=args.depth, movetime=args.movetime, nodes=args.nodes)
+
+    def ready(server: asyncio.AbstractServer) -> None:
+        for socket in server.sockets:
+            host, port = socket.getsockname()[:2]
+            print(f"Serving games on http://{host}:{port} with {args.workers} workers")
+
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                args.workers,
+                args.eval_algorithm,
+                limits,
+                args.deadline,
+                args.max_queued,
+                ready,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,143 @@
+"""Module containing a compact binary snapshot of a position and its recent history,
+used to pickle games cheaply, e.g. to send them to worker processes
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from chess_ng.board import Board
+from chess_ng.consts import BLACK, DIRECTIONS, QUEEN, WHITE
+from chess_ng.interfaces import Piece
+from chess_ng.piece import PIECES, Bishop, King, Knight, Pawn, Queen, Rook
+from chess_ng.team import Team
+
+HISTORY_PLIES = 100  # enough for the fifty move rule and repetitions
+SIZE = 8
+
+KINDS: Tuple[Type[Piece], ...] = (Pawn, Knight, Bishop, Rook, Queen, King)
+_BLACK_FLAG = 8
+_MOVED_FLAG = 16
+_PROMOTED_FLAG = 32
+_EXTENSIONS_SHIFT = 6
+
+
+def encode_piece(piece: Piece) -> int:
+    """Encodes the piece in a byte: its kind (the index in KINDS plus 1) in bits 0-2,
+    flags for black, moved and promoted pieces in bits 3-5 and the search extensions
+    left of queens in bits 6-7. The position history is reduced to the moved flag.
+    """
+    code = KINDS.index(type(piece)) + 1
+    if piece.team == BLACK:
+        code |= _BLACK_FLAG
+    if piece.position_history:
+        code |= _MOVED_FLAG
+    if isinstance(piece, Pawn) and piece.promoted:
+        code |= _PROMOTED_FLAG
+    if isinstance(piece, Queen):
+        code |= min(max(piece.depth_counter, 0), 3) << _EXTENSIONS_SHIFT
+    return code
+
+
+def decode_piece(code: int, position: Tuple[int, int], captured: bool = False) -> Piece:
+    """Creates the piece encoded by encode_piece at the position"""
+    team = BLACK if code & _BLACK_FLAG else WHITE
+    class_ = KINDS[(code & 7) - 1]
+    symbol = next(key for key, value in PIECES.items() if value is class_)
+    new_piece = class_(DIRECTIONS[team], position, f"{symbol}{team}")
+    new_piece.captured = captured
+    if code & _MOVED_FLAG:
+        new_piece.position_history.append(position)
+    if code & _PROMOTED_FLAG and isinstance(new_piece, Pawn):
+        # promotions are derived from the last rank in the position history
+        new_piece.position_history[:] = [(position[0], 0 if team == WHITE else 7)]
+        new_piece.promoted = True
+        new_piece._moves = new_piece._promoted_moves  # pylint: disable=protected-access
+        new_piece.representation = f"{QUEEN}{team}"
+    if isinstance(new_piece, Queen):
+        new_piece.depth_counter = code >> _EXTENSIONS_SHIFT
+    return new_piece
+
+
+class PositionSnapshot(NamedTuple):
+    """Pieces of both teams and the recent move history of a board.
+
+    pieces holds two bytes per piece, its square (y * 8 + x) and its code (see
+    encode_piece, which includes the moved flags for castling and double
+    pawn moves), white pieces first in team order, then black pieces. white_pieces
+    is the amount of white pieces. history holds three bytes per ply of the last
+    100 plies: the index of the moved piece, its destination square and whether it
+    captured. Pieces captured since are indexed after the pieces on the board and
+    their codes are in captured.
+    """
+
+    pieces: bytes
+    white_pieces: int
+    history: bytes = b""
+    captured: bytes = b""
+
+
+def _square(position: Tuple[int, int]) -> int:
+    x, y = position
+    return y * SIZE + x
+
+
+def _position(square: int) -> Tuple[int, int]:
+    return square % SIZE, square // SIZE
+
+
+def snapshot_position(board: Board, teams: Dict[str, Team]) -> PositionSnapshot:
+    """Returns the snapshot of the board and the teams"""
+    pieces = teams[WHITE].pieces + teams[BLACK].pieces
+    indices = {id(piece): index for index, piece in enumerate(pieces)}
+    captured: List[Piece] = []
+    history = bytearray()
+    for piece, destination, capture in board.move_history[-HISTORY_PLIES:]:
+        if id(piece) not in indices:
+            indices[id(piece)] = len(pieces) + len(captured)
+            captured.append(piece)
+        history += bytes((indices[id(piece)], _square(destination), capture))
+    return PositionSnapshot(
+        bytes(
+            x
+            for piece in pieces
+            for x in (_square(piece.position), encode_piece(piece))
+        ),
+        len(teams[WHITE].pieces),
+        bytes(history),
+        bytes(encode_piece(piece) for piece in captured),
+    )
+
+
+def restore_position(
+    snapshot: PositionSnapshot,
+    board_factory: Callable[[List[Piece]], Board] = Board,
+) -> Tuple[Board, Dict[str, Team]]:
+    """Creates the board and the teams of the snapshot"""
+    pieces = [
+        decode_piece(code, _position(square))
+        for square, code in zip(snapshot.pieces[::2], snapshot.pieces[1::2])
+    ]
+    teams = {
+        WHITE: Team(pieces[: snapshot.white_pieces], WHITE),
+        BLACK: Team(pieces[snapshot.white_pieces :], BLACK),
+    }
+    board = board_factory(list(pieces))
+    history_pieces = pieces + [
+        decode_piece(code, (0, 0), captured=True) for code in snapshot.captured
+    ]
+    history = snapshot.history
+    board.move_history = [
+        (history_pieces[index], _position(square), bool(capture))
+        for index, square, capture in zip(history[::3], history[1::3], history[2::3])
+    ]
+    return board, teams
+
+
+class GameSnapshot(NamedTuple):
+    """Snapshot of a game: its position and the state of the game"""
+
+    position: PositionSnapshot
+    player: str
+    previously_moved: str
+    rating: float = 0.0
+    winner: Optional[str] = None
+    is_draw: bool = False
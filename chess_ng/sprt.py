@@ -0,0 +1,112 @@
+"""Module containing the sequential probability ratio test (SPRT) of engine changes"""
+
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+H0 = "H0"  # the change is at most elo0 stronger: reject it
+H1 = "H1"  # the change is at least elo1 stronger: accept it
+
+
+def expected_score(elo: float) -> float:
+    """Returns the expected score per game of an engine elo points stronger"""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+@dataclass(frozen=True)
+class Sprt:
+    """Tests the hypotheses H0: the Elo difference is elo0, against H1: it is elo1,
+    with the probabilities alpha of accepting H1 if H0 holds and beta of accepting
+    H0 if H1 holds.
+
+    The log-likelihood ratio of the game results uses the normal approximation of
+    the score distribution (the generalised SPRT), which handles draws.
+    """
+
+    elo0: float = 0.0
+    elo1: float = 5.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    def __post_init__(self):
+        if self.elo0 >= self.elo1:
+            raise ValueError("elo0 must be smaller than elo1.")
+        if not (0 < self.alpha < 1 and 0 < self.beta < 1):
+            raise ValueError("alpha and beta must be between 0 and 1.")
+
+    @property
+    def bounds(self) -> Tuple[float, float]:
+        """Returns the lower and upper bound of the log-likelihood ratio"""
+        return (
+            math.log(self.beta / (1 - self.alpha)),
+            math.log((1 - self.beta) / self.alpha),
+        )
+
+    def llr(self, wins: int, losses: int, draws: int) -> float:
+        """Returns the log-likelihood ratio of the results of the tested engine"""
+        games = wins + losses + draws
+        if not games:
+            return 0.0
+        if games in (wins, losses, draws):
+            # all results are equal: estimate the spread with a virtual win and loss
+            wins, losses = wins + 1, losses + 1
+        count = wins + losses + draws
+        score = (wins + draws / 2) / count
+        variance = (
+            wins * (1 - score) ** 2 + losses * score**2 + draws * (0.5 - score) ** 2
+        ) / count
+        score0, score1 = expected_score(self.elo0), expected_score(self.elo1)
+        return (
+            games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+        )
+
+    def status(self, wins: int, losses: int, draws: int) -> Optional[str]:
+        """Returns H0 or H1 once the log-likelihood ratio crosses a bound, else None"""
+        llr = self.llr(wins, losses, draws)
+        lower, upper = self.bounds
+        if llr >= upper:
+            return H1
+        if llr <= lower:
+            return H0
+        return None
+
+    def snapshot(self, wins: int, losses: int, draws: int) -> Dict[str, Any]:
+        """Returns the progress of the test as a JSON serializable dict"""
+        lower, upper = self.bounds
+        return {
+            "elo0": self.elo0,
+            "elo1": self.elo1,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "games": wins + losses + draws,
+            "wins": wins,
+            "losses": losses,
+            "draws": draws,
+            "llr": self.llr(wins, losses, draws),
+            "lower_bound": lower,
+            "upper_bound": upper,
+            "status": self.status(wins, losses, draws),
+        }
+
+    def format(self, wins: int, losses: int, draws: int) -> str:
+        """Returns a single line report of the progress of the test"""
+        lower, upper = self.bounds
+        status = self.status(wins, losses, draws)
+        outcome = "running" if status is None else f"{status} accepted"
+        return (
+            f"SPRT elo0={self.elo0:g} elo1={self.elo1:g}: "
+            f"LLR {self.llr(wins, losses, draws):.2f} ({lower:.2f}, {upper:.2f}), "
+            f"+{wins} -{losses} ={draws}: {outcome}"
+        )
+
+
+def write_snapshot(path: str, snapshot: Dict[str, Any]) -> None:
+    """Writes the snapshot to the JSON file, replacing it atomically so that readers
+    never see a partially written file
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, indent=4)
+    os.replace(temporary, path)
@@ -0,0 +1,142 @@
+"""Module containing the tables the search keeps between consecutive moves of a game"""
+
+from collections import defaultdict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple, Union
+
+Number = Union[int, float]
+MoveKey = Tuple[Tuple[int, int], Tuple[int, int]]  # source and destination position
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TableEntry(NamedTuple):
+    """Transposition table entry"""
+
+    score: Number
+    depth: int
+    flag: int
+    move: Optional[MoveKey]
+    generation: int
+
+
+class TranspositionTable:
+    """Bounded transposition table. Entries are aged by the generation they were
+    stored in, so that the table does not need to be cleared between moves:
+    once the table is full, entries older than the previous generation are evicted.
+    """
+
+    def __init__(self, max_entries: int = 2**18):
+        self.max_entries = max_entries
+        self.generation: int = 0
+        self._entries: Dict[Hashable, TableEntry] = {}
+        self._swept_generation: int = -1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def new_generation(self) -> None:
+        """Starts a new generation, to be called once per search"""
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Removes all entries"""
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[TableEntry]:
+        """Returns the entry stored for the key, if any"""
+        return self._entries.get(key)
+
+    # pylint: disable=too-many-arguments
+    def store(
+        self,
+        key: Hashable,
+        score: Number,
+        depth: int,
+        flag: int,
+        move: Optional[MoveKey] = None,
+    ) -> None:
+        """Stores the entry, unless a deeper entry of the current generation exists"""
+        existing = self._entries.get(key)
+        if existing is None:
+            if len(self._entries) >= self.max_entries and not self._sweep():
+                return
+        elif existing.generation == self.generation and existing.depth > depth:
+            return
+        self._entries[key] = TableEntry(score, depth, flag, move, self.generation)
+
+    def _sweep(self) -> bool:
+        """Evicts entries older than the previous generation. Sweeps at most once
+        per generation. Returns True if there is space for a new entry.
+        """
+        if self._swept_generation != self.generation:
+            self._swept_generation = self.generation
+            oldest = self.generation - 1
+            self._entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if entry.generation >= oldest
+            }
+        return len(self._entries) < self.max_entries
+
+
+class KillerTable:
+    """Stores up to two quiet moves per ply that caused a beta cutoff"""
+
+    def __init__(self, slots: int = 2):
+        self.slots = slots
+        self._moves: Dict[int, List[MoveKey]] = defaultdict(list)
+
+    def __getitem__(self, ply: int) -> List[MoveKey]:
+        return self._moves.get(ply, [])
+
+    def add(self, ply: int, move: MoveKey) -> None:
+        """Adds a killer move for the ply, replacing the oldest one"""
+        moves = self._moves[ply]
+        if move in moves:
+            return
+        moves.insert(0, move)
+        del moves[self.slots :]
+
+    def clear(self) -> None:
+        """Removes all killer moves"""
+        self._moves.clear()
+
+    def shift(self, plies: int) -> None:
+        """Moves the killers closer to the root, as the game has moved on by the
+        specified amount of plies since they were stored.
+        """
+        self._moves = defaultdict(
+            list,
+            {ply - plies: moves for ply, moves in self._moves.items() if ply >= plies},
+        )
+
+
+class HistoryTable:
+    """History heuristic, scoring quiet moves by how often they caused cutoffs"""
+
+    def __init__(self):
+        self._scores: Dict[Hashable, int] = defaultdict(int)
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self._scores.get(key, 0)
+
+    def add(self, key: Hashable, depth: int) -> None:
+        """Rewards the move for a cutoff at the specified remaining depth"""
+        self._scores[key] += depth * depth
+
+    def clear(self) -> None:
+        """Removes all scores"""
+        self._scores.clear()
+
+    def decay(self, factor: int = 2) -> None:
+        """Divides all scores by the factor, dropping scores decayed to zero"""
+        self._scores = defaultdict(
+            int,
+            {
+                key: score // factor
+                for key, score in self._scores.items()
+                if score // factor
+            },
+        )
@@ -0,0 +1,388 @@
+"""Module containing a self-play tournament runner between engine configurations,
+playing games concurrently in a process pool
+"""
+
+import contextlib
+import dataclasses
+import itertools
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from chess_ng import pgn
+from chess_ng.archive import ArchiveWriter
+from chess_ng.algorithm import CancellationToken, Minimax
+from chess_ng.analysis import create_executor, imap_bounded
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.engine import (
+    EVALUATIONS,
+    SearchLimits,
+    adjudicate,
+    create_minimax,
+    find_move,
+    format_move,
+    opponent,
+    search,
+)
+from chess_ng.epd import read_epd
+from chess_ng.fen import load_board
+from chess_ng.notation import format_san
+from chess_ng.sprt import Sprt, write_snapshot
+
+_minimaxes: Dict[str, Minimax] = {}  # reused by all games of a worker process
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Configuration of an engine taking part in a tournament. Moves are searched
+    up to depth, within the optional movetime (in seconds) and nodes limits.
+    """
+
+    name: str
+    depth: int = 3
+    evaluation: str = "moves"
+    movetime: Optional[float] = None
+    nodes: Optional[int] = None
+
+    @property
+    def limits(self) -> SearchLimits:
+        """Returns the search limits of each move"""
+        return SearchLimits(depth=self.depth, movetime=self.movetime, nodes=self.nodes)
+
+
+def parse_engine(spec: str) -> EngineConfig:
+    """Parses an engine configuration of comma separated key=value pairs, e.g.
+    'name=pst,depth=4,eval=pst,movetime=0.5'. The name defaults to the spec.
+    """
+    fields: Dict[str, Any] = {}
+    converters: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+        "name": ("name", str),
+        "depth": ("depth", int),
+        "eval": ("evaluation", str),
+        "movetime": ("movetime", float),
+        "nodes": ("nodes", int),
+    }
+    for pair in spec.split(","):
+        key, separator, value = pair.partition("=")
+        if not separator or key.strip() not in converters:
+            raise ValueError(
+                f"Invalid engine option {pair!r}, expected one of "
+                f"{', '.join(f'{key}=...' for key in converters)}."
+            )
+        name, converter = converters[key.strip()]
+        try:
+            fields[name] = converter(value.strip())
+        except ValueError:
+            raise ValueError(f"Invalid value of engine option {pair!r}.") from None
+    if fields.get("evaluation", "moves") not in EVALUATIONS:
+        raise ValueError(f"Unknown evaluation {fields['evaluation']}.")
+    return EngineConfig(**{"name": spec, **fields})
+
+
+@dataclass
+class GameRecord:  # pylint: disable=too-many-instance-attributes
+    """Result of a tournament game. Moves are in SAN and long algebraic notation"""
+
+    id: int  # pylint: disable=invalid-name
+    white: str
+    black: str
+    fen: str
+    result: str = "*"
+    termination: str = ""
+    moves: List[str] = field(default_factory=list)
+    uci_moves: List[str] = field(default_factory=list)
+    time: float = 0.0
+
+    @property
+    def white_score(self) -> float:
+        """Returns the points scored by white"""
+        return {"1-0": 1.0, "0-1": 0.0}.get(self.result, 0.5)
+
+    def to_pgn(self, event: str = "chess_ng tournament") -> str:
+        """Formats the game in PGN"""
+        headers = {
+            "Event": event,
+            "Site": "chess_ng",
+            "Round": str(self.id + 1),
+            "White": self.white,
+            "Black": self.black,
+            "Termination": self.termination,
+        }
+        return pgn.format_pgn(headers, self.moves, self.result, self.fen)
+
+
+def _worker_minimax(engine: EngineConfig) -> Minimax:
+    """Returns the minimax instance of the engine in the current worker process"""
+    minimax = _minimaxes.get(engine.name)
+    if minimax is None:
+        minimax = _minimaxes[engine.name] = create_minimax(engine.evaluation)
+    return minimax
+
+
+# pylint: disable=too-many-locals
+def play_game(
+    game_id: int,
+    white: EngineConfig,
+    black: EngineConfig,
+    fen: str = STARTING_FEN,
+    max_plies: int = 300,
+) -> GameRecord:
+    """Plays a game between the engines from the position. Games are drawn by
+    stalemate, repetition, the fifty move rule or after max_plies plies.
+    """
+    record = GameRecord(game_id, white.name, black.name, fen)
+    engines = {WHITE: white, BLACK: black}
+    board, teams, side = load_board(fen)
+    start = time.perf_counter()
+    while True:
+        outcome = adjudicate(board, teams, side)
+        if outcome is None and len(record.moves) >= max_plies:
+            outcome = "1/2-1/2", "max plies"
+        if outcome is not None:
+            record.result, record.termination = outcome
+            break
+
+        team, enemy = teams[side], teams[opponent(side)]
+        moves = team.compute_valid_moves(board, enemy.pieces)
+        engine = engines[side]
+        token = CancellationToken(timeout=engine.movetime)
+        result = search(
+            _worker_minimax(engine), board, teams, side, engine.limits, token
+        )
+        piece, move = find_move(moves, result.bestmove, board.size)
+        record.uci_moves.append(format_move(piece, move.position, board.size))
+        record.moves.append(format_san(board, teams, piece, move.position))
+        board.move_piece_and_capture(move.position, piece, enemy.pieces, log=False)
+        side = enemy.representation
+    record.time = time.perf_counter() - start
+    return record
+
+
+def schedule(
+    engines: Sequence[EngineConfig], openings: Sequence[str], rounds: int = 1
+) -> Iterator[Tuple[int, EngineConfig, EngineConfig, str]]:
+    """Yields the games of a round robin between the engines: each pair plays each
+    opening twice per round, with colours swapped.
+    """
+    games = (
+        (white, black, opening)
+        for _ in range(rounds)
+        for opening in openings
+        for first, second in itertools.combinations(engines, 2)
+        for white, black in ((first, second), (second, first))
+    )
+    for game_id, (white, black, opening) in enumerate(games):
+        yield game_id, white, black, opening
+
+
+@dataclass
+class _PlayGame:
+    """Picklable callable playing a scheduled game"""
+
+    max_plies: int
+
+    def __call__(self, game: Tuple[int, EngineConfig, EngineConfig, str]) -> GameRecord:
+        return play_game(*game, max_plies=self.max_plies)
+
+
+def elo_difference(wins: int, losses: int, draws: int) -> Tuple[float, float]:
+    """Returns the Elo difference implied by the score and the half width of its
+    95% confidence interval, from the variance of the game results
+    """
+    games = wins + losses + draws
+    if not games:
+        return 0.0, math.inf
+    score = (wins + draws / 2) / games
+    variance = (
+        wins * (1 - score) ** 2 + losses * score**2 + draws * (0.5 - score) ** 2
+    ) / games
+    error = 1.959964 * math.sqrt(variance / games)
+
+    def elo(value: float) -> float:
+        if value <= 0:
+            return -math.inf
+        if value >= 1:
+            return math.inf
+        return -400 * math.log10(1 / value - 1)
+
+    if not 0 < score < 1:
+        return elo(score), math.inf
+    return elo(score), (elo(score + error) - elo(score - error)) / 2
+
+
+@dataclass
+class Standings:
+    """Wins, losses and draws of each engine against each opponent"""
+
+    engines: List[str]
+    results: Dict[Tuple[str, str], List[int]] = field(default_factory=dict)
+
+    def add(self, record: GameRecord) -> None:
+        """Adds the result of the game"""
+        for name, other, score in (
+            (record.white, record.black, record.white_score),
+            (record.black, record.white, 1 - record.white_score),
+        ):
+            counts = self.results.setdefault((name, other), [0, 0, 0])
+            counts[0 if score == 1 else 1 if score == 0 else 2] += 1
+
+    def record(self, name: str, other: Optional[str] = None) -> Tuple[int, int, int]:
+        """Returns the wins, losses and draws of the engine against the other engine,
+        or against all engines
+        """
+        others = self.engines if other is None else [other]
+        counts = [self.results.get((name, x), [0, 0, 0]) for x in others]
+        wins, losses, draws = (sum(x[i] for x in counts) for i in range(3))
+        return wins, losses, draws
+
+    def format(self) -> str:
+        """Returns the crosstable, with the points of each engine (row) against each
+        engine (column), followed by the Elo differences of all pairs
+        """
+        width = max(len(name) for name in self.engines + ["Engine"]) + 2
+        header = f"{'Engine':<{width}}{'Score':>10}" + "".join(
+            f"{name[:10]:>12}" for name in self.engines
+        )
+        lines = [header]
+        for name in self.engines:
+            wins, losses, draws = self.record(name)
+            cells = []
+            for other in self.engines:
+                if other == name:
+                    cells.append(f"{'-':>12}")
+                    continue
+                o_wins, o_losses, o_draws = self.record(name, other)
+                games = o_wins + o_losses + o_draws
+                cells.append(f"{f'{o_wins + o_draws / 2:g}/{games}':>12}")
+            total = f"{wins + draws / 2:g}/{wins + losses + draws}"
+            lines.append(f"{name:<{width}}{total:>10}" + "".join(cells))
+
+        lines.append("")
+        for name, other in itertools.combinations(self.engines, 2):
+            wins, losses, draws = self.record(name, other)
+            elo, error = elo_difference(wins, losses, draws)
+            lines.append(
+                f"{name} vs {other}: +{wins} -{losses} ={draws}, "
+                f"Elo difference {elo:+.1f} +/- {error:.1f}"
+            )
+        return "\n".join(lines)
+
+
+# pylint: disable=too-many-arguments
+def run_tournament(
+    engines: Sequence[EngineConfig],
+    openings: Sequence[str],
+    rounds: int = 1,
+    workers: int = 1,
+    max_plies: int = 300,
+    on_game: Optional[Callable[[GameRecord], None]] = None,
+    stop: Optional[Callable[[Standings], bool]] = None,
+) -> Standings:
+    """Plays the scheduled games in a pool of worker processes, calling on_game with
+    each finished game in completion order. The tournament ends early once stop
+    returns True for the standings after a game. Returns the standings.
+    """
+    if len({engine.name for engine in engines}) != len(engines) or len(engines) < 2:
+        raise ValueError("A tournament needs at least two engines with unique names.")
+    standings = Standings([engine.name for engine in engines])
+    games = schedule(engines, openings, rounds)
+    with create_executor(workers) as executor:
+        for record in imap_bounded(
+            executor, _PlayGame(max_plies), games, 2 * workers, ordered=False
+        ):
+            standings.add(record)
+            if on_game is not None:
+                on_game(record)
+            if stop is not None and stop(standings):
+                break
+    return standings
+
+
+def read_openings(lines: Iterable[str]) -> List[str]:
+    """Reads the FENs of the FEN or EPD lines"""
+    return [record.fen for record in read_epd(lines)]
+
+
+def format_game(record: GameRecord) -> str:
+    """Returns a single line report of the game"""
+    return (
+        f"Game {record.id + 1}: {record.white} - {record.black} {record.result} "
+        f"({record.termination}, {len(record.moves)} plies, {record.time:.1f}s)"
+    )
+
+
+def run_command(args: Any) -> None:
+    """Runs the tournament subcommand with the parsed CLI args"""
+    engines = [parse_engine(spec) for spec in args.engine]
+    openings = [STARTING_FEN]
+    if args.openings is not None:
+        with open(args.openings, encoding="utf-8") as file:
+            openings = read_openings(file)
+    test: Optional[Sprt] = None
+    if args.sprt is not None:
+        if len(engines) != 2:
+            raise ValueError("SPRT needs exactly two engines: the tested and the base.")
+        test = Sprt(*args.sprt, alpha=args.alpha, beta=args.beta)
+
+    with contextlib.ExitStack() as stack:
+        pgn_file: Optional[TextIO] = (
+            stack.enter_context(open(args.pgn, "w", encoding="utf-8"))
+            if args.pgn is not None
+            else None
+        )
+        jsonl_file: Optional[TextIO] = (
+            stack.enter_context(open(args.jsonl, "w", encoding="utf-8"))
+            if args.jsonl is not None
+            else None
+        )
+        archive: Optional[ArchiveWriter] = (
+            stack.enter_context(ArchiveWriter(args.archive))
+            if args.archive is not None
+            else None
+        )
+
+        def on_game(record: GameRecord) -> None:
+            print(format_game(record))
+            sys.stdout.flush()
+            if pgn_file is not None:
+                pgn_file.write(record.to_pgn())
+                pgn_file.flush()
+            if jsonl_file is not None:
+                jsonl_file.write(json.dumps(dataclasses.asdict(record)) + "\n")
+                jsonl_file.flush()
+            if archive is not None:
+                archive.append(record.uci_moves, record.result, record.fen)
+
+        def stop(standings: Standings) -> bool:
+            if test is None:
+                return False
+            results = standings.record(engines[0].name, engines[1].name)
+            print(test.format(*results))
+            if args.progress is not None:
+                write_snapshot(args.progress, test.snapshot(*results))
+            return test.status(*results) is not None
+
+        standings = run_tournament(
+            engines,
+            openings,
+            rounds=args.rounds,
+            workers=args.workers,
+            max_plies=args.max_plies,
+            on_game=on_game,
+            stop=stop,
+        )
+    print(standings.format())
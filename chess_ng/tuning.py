@@ -0,0 +1,382 @@
+"""Module containing Texel-style tuning of the piece-square table evaluation on
+labelled positions stored in memory-mapped NumPy arrays
+"""
+
+import contextlib
+import itertools
+import json
+import math
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from chess_ng import pst
+from chess_ng.consts import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK
+from chess_ng.epd import EpdError, parse_epd
+
+SYMBOLS = (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)
+FEATURES = len(SYMBOLS) * 64
+FEN_SYMBOLS = dict(zip("pnbrqk", SYMBOLS))
+RESULTS = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}
+META_FILE = "dataset.json"
+
+ARRAYS = ("features", "phases", "results")
+
+# a result in brackets, a game result or a decimal score after the position
+_TRAILING_RESULT = re.compile(
+    r"^(?P<fen>.*?)[\s;|]+(?P<result>\[[^\]]*\]|1-0|0-1|1/2-1/2|[01]\.\d+)\s*$"
+)
+
+
+class LabelError(ValueError):
+    """Can be thrown when a labelled position line is invalid."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+def parse_result(text: str) -> float:
+    """Parses a game result (1-0, 0-1, 1/2-1/2 or a number between 0 and 1) as the
+    score of white
+    """
+    text = text.strip().strip('"[]')
+    if text in RESULTS:
+        return RESULTS[text]
+    try:
+        result = float(text)
+    except ValueError:
+        raise LabelError(f"Invalid result {text}.") from None
+    if not 0 <= result <= 1:
+        raise LabelError(f"Invalid result {text}, expected a score between 0 and 1.")
+    return result
+
+
+def parse_labelled(line: str) -> Tuple[str, float]:
+    """Parses a labelled position: an EPD line with a c9 or result operation (e.g.
+    '... w - - c9 "1-0";'), or a FEN followed by the result (e.g. '... w - - 0 1 [0.5]').
+    Results are the score of white. Returns the FEN and the result.
+    """
+    match = _TRAILING_RESULT.match(line.strip())
+    if match is not None and len(match.group("fen").split()) >= 2:
+        return match.group("fen"), parse_result(match.group("result"))
+    try:
+        record = parse_epd(line)
+    except EpdError as exc:
+        raise LabelError(exc.message) from exc
+    for opcode in ("c9", "result"):
+        if opcode in record.operations:
+            return record.fen, parse_result(record.operations[opcode])
+    raise LabelError(f"Position has no result: {line.strip()}")
+
+
+def encode_features(fen: str) -> Tuple[np.ndarray, int]:
+    """Encodes the piece placement of the FEN as feature counts: for each piece symbol
+    and square (from the perspective of white, see pst.Tables) the number of white
+    pieces minus the mirrored black pieces. Returns the features and the game phase.
+    """
+    features = np.zeros(FEATURES, dtype=np.int8)
+    phase = 0
+    rows = fen.split(maxsplit=1)[0].split("/")
+    if len(rows) < 8:
+        raise LabelError(f"Invalid FEN piece placement: {fen}")
+    for y, row in enumerate(rows[:8]):  # pylint: disable=invalid-name
+        x = 0  # pylint: disable=invalid-name
+        for char in row:
+            if char.isdigit():
+                x += int(char)  # pylint: disable=invalid-name
+                continue
+            symbol = FEN_SYMBOLS.get(char.lower())
+            if symbol is None or x >= 8:
+                raise LabelError(f"Invalid FEN piece placement: {fen}")
+            offset = SYMBOLS.index(symbol) * 64
+            if char.isupper():
+                features[offset + y * 8 + x] += 1
+            else:
+                features[offset + (7 - y) * 8 + x] -= 1
+            phase += pst.PHASE_WEIGHTS[symbol]
+            x += 1  # pylint: disable=invalid-name
+    return features, phase
+
+
+@dataclass
+class Dataset:
+    """Labelled positions as memory-mapped arrays: features (positions x 384, int8),
+    phases (int8) and results (float32, the score of white)
+    """
+
+    features: np.ndarray
+    phases: np.ndarray
+    results: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def chunks(
+        self, size: int, order: Optional[np.ndarray] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yields contiguous chunks of features, phase fractions and results, read
+        from the memory-mapped files. The order of the chunks can be permuted.
+        """
+        starts = range(0, len(self), size)
+        for start in (starts[i] for i in order) if order is not None else starts:
+            end = start + size
+            phases = np.minimum(self.phases[start:end], pst.MAX_PHASE)
+            yield (
+                self.features[start:end].astype(np.float32),
+                phases.astype(np.float32) / pst.MAX_PHASE,
+                self.results[start:end],
+            )
+
+
+def build_dataset(  # pylint: disable=too-many-locals
+    lines: Iterable[str],
+    directory: str,
+    chunk_size: int = 65536,
+    report: Optional[TextIO] = None,
+) -> Dataset:
+    """Encodes the labelled positions (see parse_labelled) in a single pass, appending
+    chunks of them to the files of the dataset in the directory. Empty lines and
+    comments are skipped, invalid lines are reported and skipped.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f"{name}.bin") for name in ARRAYS]
+    count = 0
+    with contextlib.ExitStack() as stack:
+        files = [stack.enter_context(open(path, "wb")) for path in paths]
+        for chunk in _chunked(lines, chunk_size):
+            encoded = []
+            for line in chunk:
+                try:
+                    fen, result = parse_labelled(line)
+                    features, phase = encode_features(fen)
+                except LabelError as exc:
+                    if report is not None:
+                        print(f"Skipped invalid line: {exc.message}", file=report)
+                    continue
+                encoded.append((features, phase, result))
+            if not encoded:
+                continue
+            features, phases, results = zip(*encoded)
+            np.stack(features).tofile(files[0])
+            np.array(phases, dtype=np.int8).tofile(files[1])
+            np.array(results, dtype=np.float32).tofile(files[2])
+            count += len(encoded)
+
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as file:
+        json.dump({"positions": count, "features": FEATURES}, file)
+    return load_dataset(directory)
+
+
+def load_dataset(directory: str) -> Dataset:
+    """Memory-maps the dataset written to the directory by build_dataset"""
+    with open(os.path.join(directory, META_FILE), encoding="utf-8") as file:
+        meta = json.load(file)
+    count = meta["positions"]
+    if meta["features"] != FEATURES:
+        raise ValueError(f"Dataset in {directory} has incompatible features.")
+
+    def memmap(name: str, dtype: Any, shape: Tuple[int, ...]) -> np.ndarray:
+        if not count:  # empty files cannot be memory-mapped
+            return np.zeros(shape, dtype=dtype)
+        path = os.path.join(directory, f"{name}.bin")
+        return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+    return Dataset(
+        memmap("features", np.int8, (count, FEATURES)),
+        memmap("phases", np.int8, (count,)),
+        memmap("results", np.float32, (count,)),
+    )
+
+
+def _chunked(lines: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = (
+        line for line in lines if line.strip() and not line.lstrip().startswith("#")
+    )
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def initial_parameters() -> np.ndarray:
+    """Returns the default middlegame and endgame tables of the pst evaluation as a
+    2 x 384 array of parameters, ordered like the features
+    """
+    middlegame, endgame = pst.default_tables()
+    return np.array(
+        [
+            [score for symbol in SYMBOLS for score in tables[symbol]]
+            for tables in (middlegame, endgame)
+        ],
+        dtype=np.float64,
+    )
+
+
+def to_tables(parameters: np.ndarray) -> Tuple[pst.Tables, pst.Tables]:
+    """Converts parameters to middlegame and endgame tables, rounded to centipawns"""
+    middlegame, endgame = (
+        {
+            symbol: [int(round(score)) for score in row[i * 64 : (i + 1) * 64]]
+            for i, symbol in enumerate(SYMBOLS)
+        }
+        for row in parameters
+    )
+    return middlegame, endgame
+
+
+def scores(
+    features: np.ndarray, phases: np.ndarray, parameters: np.ndarray
+) -> np.ndarray:
+    """Returns the tapered scores in centipawns of a chunk of positions. The phases
+    are fractions, 1 for the middlegame and 0 for the endgame.
+    """
+    tapered = features @ parameters.T.astype(np.float32)
+    return tapered[:, 0] * phases + tapered[:, 1] * (1 - phases)
+
+
+def sigmoid(values: np.ndarray, k: float) -> np.ndarray:
+    """Maps centipawn scores to expected results, with scaling constant k"""
+    return 1 / (1 + np.power(10, -k * values / 400))
+
+
+def mean_error(
+    dataset: Dataset, parameters: np.ndarray, k: float, chunk_size: int = 65536
+) -> float:
+    """Returns the mean squared error between the results and the expected results"""
+    total = 0.0
+    for features, phases, results in dataset.chunks(chunk_size):
+        errors = sigmoid(scores(features, phases, parameters), k) - results
+        total += float(np.dot(errors, errors))
+    return total / max(len(dataset), 1)
+
+
+def fit_k(
+    dataset: Dataset,
+    parameters: np.ndarray,
+    bounds: Tuple[float, float] = (0.01, 10.0),
+    chunk_size: int = 65536,
+) -> float:
+    """Finds the scaling constant k minimising the mean error of the parameters by
+    golden-section search. The scores are computed once and kept in memory.
+    """
+    values = np.concatenate(
+        [
+            scores(features, phases, parameters)
+            for features, phases, _ in dataset.chunks(chunk_size)
+        ]
+        or [np.zeros(0, dtype=np.float32)]
+    )
+    results = np.asarray(dataset.results)
+
+    def error(k: float) -> float:
+        errors = sigmoid(values, k) - results
+        return float(np.dot(errors, errors))
+
+    ratio = (math.sqrt(5) - 1) / 2
+    low, high = bounds
+    for _ in range(40):
+        left, right = high - ratio * (high - low), low + ratio * (high - low)
+        if error(left) < error(right):
+            high = right
+        else:
+            low = left
+    return (low + high) / 2
+
+
+@dataclass
+class TuningResult:
+    """Tuned parameters (see initial_parameters), the scaling constant k and the
+    mean error before tuning and after each epoch
+    """
+
+    parameters: np.ndarray
+    k: float
+    errors: List[float] = field(default_factory=list)
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def tune(
+    dataset: Dataset,
+    parameters: Optional[np.ndarray] = None,
+    epochs: int = 10,
+    learning_rate: float = 1.0,
+    batch_size: int = 16384,
+    k: Optional[float] = None,
+    seed: Optional[int] = None,
+    callback: Optional[Callable[[int, float], None]] = None,
+) -> TuningResult:
+    """Fits the parameters to the results by minimising the mean squared error of
+    the sigmoid-scaled scores with Adam, on mini-batches of contiguous positions in
+    shuffled order. The callback is called with the epoch and its mean error.
+    """
+    parameters = initial_parameters() if parameters is None else parameters.copy()
+    if k is None:
+        k = fit_k(dataset, parameters)
+    result = TuningResult(parameters, k, [mean_error(dataset, parameters, k)])
+    rng = np.random.default_rng(seed)
+    moment = np.zeros_like(parameters)
+    velocity = np.zeros_like(parameters)
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    slope = k * math.log(10) / 400
+    batches = math.ceil(len(dataset) / batch_size)
+    step = 0
+    for epoch in range(1, epochs + 1):
+        order = rng.permutation(batches)
+        for features, phases, results in dataset.chunks(batch_size, order):
+            expected = sigmoid(scores(features, phases, parameters), k)
+            # derivative of the mean squared error by the scores
+            gradient = (
+                2 * (expected - results) * slope * expected * (1 - expected)
+            ) / len(results)
+            gradients = np.stack(
+                [gradient * phases @ features, gradient * (1 - phases) @ features]
+            )
+            step += 1
+            moment = beta1 * moment + (1 - beta1) * gradients
+            velocity = beta2 * velocity + (1 - beta2) * gradients**2
+            corrected = moment / (1 - beta1**step)
+            parameters -= (
+                learning_rate
+                * corrected
+                / (np.sqrt(velocity / (1 - beta2**step)) + epsilon)
+            )
+        result.errors.append(mean_error(dataset, parameters, k))
+        if callback is not None:
+            callback(epoch, result.errors[-1])
+    return result
+
+
+def run_command(args: Any) -> None:
+    """Runs the tune subcommand with the parsed CLI args"""
+    if args.input:
+        with contextlib.ExitStack() as stack:
+            files = [
+                stack.enter_context(open(path, encoding="utf-8")) for path in args.input
+            ]
+            dataset = build_dataset(
+                itertools.chain.from_iterable(files), args.data, report=sys.stderr
+            )
+    else:
+        dataset = load_dataset(args.data)
+    print(f"Positions: {len(dataset)}")
+
+    result = tune(
+        dataset,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        batch_size=args.batch_size,
+        k=args.k,
+        seed=args.seed,
+        callback=lambda epoch, error: print(f"Epoch {epoch}: error {error:.6f}"),
+    )
+    print(
+        f"K: {result.k:.4f}, error: {result.errors[0]:.6f} -> {result.errors[-1]:.6f}"
+    )
+    pst.save_tables(args.output, *to_tables(result.parameters))
+    print(f"Tables written to {args.output}")
@@ -0,0 +1,293 @@
+"""Module implementing the UCI (universal chess interface) protocol, so that the
+engine can be used from chess GUIs and tournament managers
+"""
+
+import math
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from chess_ng.algorithm import CancellationToken, Minimax, Number
+from chess_ng.board import Board
+from chess_ng.cli import EVAL_ALGORITHMS
+from chess_ng.consts import STARTING_FEN, WHITE
+from chess_ng.engine import (
+    SearchLimits,
+    SearchResult,
+    create_minimax,
+    opponent,
+    search,
+)
+from chess_ng.fen import load_board
+from chess_ng.notation import NotationError, make_move, parse_move
+from chess_ng.piece import King, Pawn
+from chess_ng.tables import TranspositionTable
+from chess_ng.team import Team
+from chess_ng.util import convert_str
+
+NAME = "chess_ng"
+AUTHOR = "Korean_Crimson"
+MAX_DEPTH = 64
+DEFAULT_HASH = 16  # megabytes
+MAX_HASH = 1024
+ENTRY_SIZE = 256  # estimated bytes per transposition table entry
+MOVE_OVERHEAD = 0.05  # seconds reserved per move for communication with the GUI
+MOVES_TO_GO = 30  # moves assumed to be left in sudden death time controls
+
+
+def allocate_time(
+    remaining: float, increment: float = 0.0, moves_to_go: Optional[int] = None
+) -> float:
+    """Returns the time in seconds to spend on the next move, given the remaining
+    time and the increment per move of the side to move
+    """
+    available = max(remaining - MOVE_OVERHEAD, 0.0)
+    budget = available / (moves_to_go or MOVES_TO_GO) + 0.8 * increment
+    return max(min(budget, available / 2), 0.01)
+
+
+def table_entries(megabytes: int) -> int:
+    """Returns the amount of transposition table entries fitting in the memory"""
+    return max(megabytes * 1024 * 1024 // ENTRY_SIZE, 1)
+
+
+def format_score(score: Number, pv: List[str]) -> str:
+    """Formats the score of the side to move in centipawns, or as the moves to mate"""
+    if math.isinf(score):
+        moves = max(math.ceil(len(pv) / 2), 1)
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {round(score * 100)}"
+
+
+def parse_go(tokens: List[str], side_to_move: str) -> Tuple[SearchLimits, bool]:
+    """Parses the arguments of a go command into search limits. Returns whether the
+    search is infinite, i.e. runs until it is stopped.
+    """
+    values: Dict[str, str] = {}
+    iterator = iter(tokens)
+    for token in iterator:
+        values[token] = "" if token == "infinite" else next(iterator, "")
+    limits = SearchLimits(depth=MAX_DEPTH, movetime=math.inf)  # until stopped
+    if "depth" in values:
+        limits.depth = int(values["depth"])
+    if "nodes" in values:
+        limits.nodes = int(values["nodes"])
+    if "movetime" in values:
+        limits.movetime = int(values["movetime"]) / 1000
+    else:
+        clock, increment = (
+            ("wtime", "winc") if side_to_move == WHITE else ("btime", "binc")
+        )
+        if clock in values:
+            limits.movetime = allocate_time(
+                int(values[clock]) / 1000,
+                int(values.get(increment, 0)) / 1000,
+                int(values["movestogo"]) if "movestogo" in values else None,
+            )
+    return limits, "infinite" in values
+
+
+def apply_move(board: Board, teams: Dict[str, Team], side_to_move: str, move: str):
+    """Plays the move in long algebraic notation (e.g. e2e4) on the board. Castling
+    is given as the two square king move and moves the rook as well, and pawns
+    capturing en passant remove the passed pawn. Pawns are always promoted to queens.
+    """
+    try:
+        source, destination = convert_str(move[:2]), convert_str(move[2:4])
+    except Exception as exc:
+        raise NotationError(f"Invalid move {move}.") from exc
+    piece = board[source]
+    if piece is None or piece.team != side_to_move:
+        raise NotationError(f"Invalid move {move}: no piece of the side to move.")
+    (x, y), x2 = source, destination[0]
+    if isinstance(piece, King) and abs(x2 - x) == 2:
+        rook = board[0 if x2 < x else board.size - 1, y]
+        if rook is None or rook.team != side_to_move:
+            raise NotationError(f"Invalid castling move {move}.")
+    elif isinstance(piece, Pawn) and x2 != x and board[destination] is None:
+        passed_pawn = board[x2, y]
+        if not isinstance(passed_pawn, Pawn) or passed_pawn.team == side_to_move:
+            raise NotationError(f"Invalid en passant move {move}.")
+    else:
+        piece, legal_move = parse_move(board, teams, side_to_move, move)
+        destination = legal_move.position
+    make_move(board, teams, piece, destination)
+
+
+class UciEngine:  # pylint: disable=too-many-instance-attributes
+    """Engine speaking the UCI protocol. Commands are passed to handle line by line,
+    searches run in a background thread and report info lines and the best move to
+    the output.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout, evaluation: str = "moves"):
+        self.output = output
+        self.evaluation = evaluation
+        self.hash_size = DEFAULT_HASH
+        self.threads = 1
+        self.minimax = self._create_minimax()
+        self.board, self.teams, self.side_to_move = load_board(STARTING_FEN)
+        self._token: Optional[CancellationToken] = None
+        self._thread: Optional[threading.Thread] = None
+        self._infinite = False
+        self._lock = threading.Lock()
+        self._commands: Dict[str, Callable[[List[str]], None]] = {
+            "uci": self._uci,
+            "isready": lambda _: self.send("readyok"),
+            "ucinewgame": self._new_game,
+            "setoption": self._set_option,
+            "position": self._position,
+            "go": self._go,
+            "stop": lambda _: self.stop(),
+            "debug": lambda _: None,
+        }
+
+    def send(self, line: str) -> None:
+        """Writes a line to the output, flushing it for the GUI"""
+        with self._lock:
+            self.output.write(f"{line}\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """Handles a single command. Returns False once the engine should quit"""
+        command, *tokens = line.split() or [""]
+        if command == "quit":
+            self.stop()
+            return False
+        if command in self._commands:
+            try:
+                self._commands[command](tokens)
+            except (NotationError, ValueError, IndexError) as exc:
+                self.send(f"info string Invalid command {line.strip()!r}: {exc}")
+        elif command:
+            self.send(f"info string Unknown command {command}")
+        return True
+
+    def run(self, lines: TextIO = sys.stdin) -> None:
+        """Handles commands read from the lines until quit is received"""
+        for line in lines:
+            if not self.handle(line):
+                return
+        if self._thread is not None and not self._infinite:
+            self._thread.join()  # finish the last search at the end of the input
+        self.stop()
+
+    def stop(self) -> None:
+        """Stops the running search, if any, and waits for its best move"""
+        if self._token is not None:
+            self._token.cancel()
+        if self._thread is not None:
+            self._thread.join()
+        self._token, self._thread = None, None
+
+    def _create_minimax(self) -> Minimax:
+        minimax = create_minimax(self.evaluation)
+        minimax.transposition_table = TranspositionTable(table_entries(self.hash_size))
+        return minimax
+
+    def _uci(self, _: List[str]) -> None:
+        self.send(f"id name {NAME}")
+        self.send(f"id author {AUTHOR}")
+        self.send(
+            f"option name Hash type spin default {DEFAULT_HASH} min 1 max {MAX_HASH}"
+        )
+        self.send("option name Threads type spin default 1 min 1 max 1")
+        evaluations = " ".join(f"var {name}" for name in EVAL_ALGORITHMS)
+        self.send(
+            f"option name Evaluation type combo default {self.evaluation} {evaluations}"
+        )
+        self.send("uciok")
+
+    def _new_game(self, _: List[str]) -> None:
+        self.stop()
+        self.minimax = self._create_minimax()
+
+    def _set_option(self, tokens: List[str]) -> None:
+        text = " ".join(tokens)
+        name, _, value = text.partition(" value ")
+        name = name.replace("name", "", 1).strip().lower()
+        value = value.strip()
+        self.stop()
+        if name == "hash":
+            self.hash_size = min(max(int(value), 1), MAX_HASH)
+            self.minimax.transposition_table = TranspositionTable(
+                table_entries(self.hash_size)
+            )
+        elif name == "threads":
+            self.threads = 1  # the search is single threaded
+        elif name == "evaluation":
+            if value not in EVAL_ALGORITHMS:
+                raise ValueError(f"unknown evaluation {value}")
+            self.evaluation = value
+            self.minimax = self._create_minimax()
+        else:
+            self.send(f"info string Unknown option {name}")
+
+    def _position(self, tokens: List[str]) -> None:
+        self.stop()
+        moves: List[str] = []
+        if "moves" in tokens:
+            index = tokens.index("moves")
+            tokens, moves = tokens[:index], tokens[index + 1 :]
+        if tokens[0] == "startpos":
+            fen = STARTING_FEN
+        elif tokens[0] == "fen":
+            fen = " ".join(tokens[1:])
+        else:
+            raise ValueError("expected startpos or fen")
+        board, teams, side_to_move = load_board(fen)
+        for move in moves:
+            apply_move(board, teams, side_to_move, move)
+            side_to_move = opponent(side_to_move)
+        self.board, self.teams, self.side_to_move = board, teams, side_to_move
+
+    def _go(self, tokens: List[str]) -> None:
+        self.stop()
+        limits, self._infinite = parse_go(tokens, self.side_to_move)
+        self._token = CancellationToken(timeout=limits.movetime)
+        self._thread = threading.Thread(
+            target=self._search, args=(limits, self._infinite, self._token), daemon=True
+        )
+        self._thread.start()
+
+    def _search(
+        self, limits: SearchLimits, infinite: bool, token: CancellationToken
+    ) -> None:
+        start = time.perf_counter()
+        result = search(
+            self.minimax,
+            self.board,
+            self.teams,
+            self.side_to_move,
+            limits,
+            token,
+            info_callback=lambda result: self.send(self._format_info(result, start)),
+        )
+        if infinite:
+            while not token.cancelled:  # the best move is only sent after stop
+                time.sleep(0.01)
+        self._send_bestmove(result)
+
+    def _send_bestmove(self, result: SearchResult) -> None:
+        if result.bestmove is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {result.bestmove} ponder {result.pv[1]}")
+        else:
+            self.send(f"bestmove {result.bestmove}")
+
+    @staticmethod
+    def _format_info(result: SearchResult, start: float) -> str:
+        elapsed = time.perf_counter() - start
+        pv = result.pv or ([result.bestmove] if result.bestmove else [])
+        return (
+            f"info depth {result.depth} score {format_score(result.score, pv)} "
+            f"nodes {result.nodes} nps {int(result.nodes / max(elapsed, 1e-6))} "
+            f"time {int(elapsed * 1000)} pv {' '.join(pv)}"
+        ).rstrip()
+
+
+def run_command(args) -> None:
+    """Runs the UCI protocol on stdin and stdout"""
+    UciEngine(evaluation=args.eval_algorithm).run()
@@ -0,0 +1,97 @@
+"""Module containing evaluations of positions encoded as NumPy arrays, which score
+a batch of positions in a single vectorized call
+"""
+
+import abc
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from chess_ng.algorithm import Number, _TeamInterface
+from chess_ng.board import Board
+from chess_ng.consts import BISHOP, BLACK, KING, KNIGHT, PAWN, QUEEN, ROOK, WHITE
+from chess_ng.interfaces import Piece
+from chess_ng.piece import Pawn
+
+PIECE_CODES: Dict[str, int] = {
+    symbol + team: code
+    for code, (team, symbol) in enumerate(
+        itertools.product((WHITE, BLACK), (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)), 1
+    )
+}
+MATERIAL_VALUES = {PAWN: 1, KNIGHT: 3, BISHOP: 3, ROOK: 5, QUEEN: 9, KING: 0}
+
+
+def square_index(position: Tuple[int, int], size: int = 8) -> int:
+    """Returns the index of the square in an encoded position"""
+    x, y = position  # pylint: disable=invalid-name
+    return y * size + x
+
+
+def encode_board(board: Board) -> np.ndarray:
+    """Encodes the board as an array of piece codes (see PIECE_CODES) indexed by
+    square_index, with 0 for empty squares.
+    """
+    position = np.zeros(board.size**2, dtype=np.int8)
+    for index, piece in enumerate(itertools.chain.from_iterable(board)):
+        if piece is not None:
+            position[index] = PIECE_CODES[piece.representation]
+    return position
+
+
+class ArrayEvaluation(abc.ABC):
+    """Base class of evaluations scoring positions encoded by encode_board.
+    Subclasses implement evaluate_batch, single boards are scored as a batch of one.
+    """
+
+    def __call__(
+        self, board: Board, team: _TeamInterface, enemy: _TeamInterface
+    ) -> Number:
+        return self.evaluate_batch(self.encode(board)[np.newaxis], team, enemy)[0]
+
+    @staticmethod
+    def encode(board: Board) -> np.ndarray:
+        """Encodes the board as an array of piece codes"""
+        return encode_board(board)
+
+    @staticmethod
+    def encode_move(
+        position: np.ndarray, piece: Piece, destination: Tuple[int, int], size: int = 8
+    ) -> None:
+        """Updates the encoded position in place to the position after moving the
+        piece to the destination. Captured pieces are overwritten.
+        """
+        representation = piece.representation
+        if isinstance(piece, Pawn) and piece.promotes_at(destination, size):
+            representation = QUEEN + piece.team
+        position[square_index(piece.position, size)] = 0
+        position[square_index(destination, size)] = PIECE_CODES[representation]
+
+    @abc.abstractmethod
+    def evaluate_batch(
+        self, positions: np.ndarray, team: _TeamInterface, enemy: _TeamInterface
+    ) -> List[Number]:
+        """Scores the encoded positions (stacked along the first axis) from the
+        perspective of the team.
+        """
+
+
+class MaterialEvaluation(ArrayEvaluation):
+    """Evaluates positions by the material balance, using a lookup table from
+    piece codes to piece values, negated for the enemy pieces.
+    """
+
+    def __init__(self, values: Optional[Dict[str, Number]] = None):
+        values = MATERIAL_VALUES if values is None else values
+        table = np.zeros(len(PIECE_CODES) + 1)
+        for representation, code in PIECE_CODES.items():
+            sign = 1 if representation[1:] == WHITE else -1
+            table[code] = sign * values[representation[0]]
+        self._tables = {WHITE: table, BLACK: -table}
+
+    def evaluate_batch(
+        self, positions: np.ndarray, team: _TeamInterface, enemy: _TeamInterface
+    ) -> List[Number]:
+        scores = self._tables[team.representation][positions].sum(axis=1)
+        return scores.tolist()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import threading
+import time
+
+from chess_ng.algorithm import CancellationToken, ReversibleMove
+from chess_ng.fen import construct_fen_notation
+from chess_ng.consts import BLACK, WHITE
+from chess_ng.game import Game, GameParams
+from chess_ng.util import convert
+
+
+# pylint: disable=missing-function-docstring
+def _run(game, depth):
+    return game.minimax.run(
+        game.board, game.teams[WHITE], game.teams[BLACK], depth, True
+    )
+
+
+def test_token_cancel():
+    token = CancellationToken()
+    assert not token.cancelled
+    token.cancel()
+    assert token.cancelled
+
+
+def test_token_timeout():
+    token = CancellationToken(timeout=0)
+    assert token.cancelled
+    assert not CancellationToken(timeout=60).cancelled
+
+
+def test_best_so_far_matches_result():
+    game = Game.create_default()
+    rating, piece_move = _run(game, depth=2)
+    assert game.minimax.best_so_far == (rating, piece_move)
+    assert game.minimax.nodes > 0
+
+
+def test_cancelled_before_start_returns_valid_move():
+    game = Game.create_default()
+    game.minimax.cancellation_token = CancellationToken()
+    game.minimax.cancellation_token.cancel()
+    game.minimax.check_interval = 1
+    _, piece_move = _run(game, depth=3)
+    assert piece_move in game.teams[WHITE].compute_valid_moves(
+        game.board, game.teams[BLACK].pieces
+    )
+
+
+def test_cancel_from_other_thread():
+    game = Game.create_default()
+    fen = construct_fen_notation(game.board, WHITE)
+    game.minimax.cancellation_token = token = CancellationToken()
+    game.minimax.check_interval = 16
+    result = []
+    thread = threading.Thread(target=lambda: result.append(_run(game, depth=6)))
+    thread.start()
+    time.sleep(0.2)
+    token.cancel()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert result[0][1] is not None
+    assert construct_fen_notation(game.board, WHITE) == fen  # board restored
+
+
+def test_consecutive_searches_age_tables():
+    game = Game.create_default()
+    game.minimax.transposition_table.max_entries = 500
+    game.player = BLACK
+    game.run_team(GameParams(depth=3))
+    generation = game.minimax.transposition_table.generation
+    _, reply = game.minimax.principal_variation[1]
+    piece, _ = game.minimax.principal_variation[1]
+    game.run_player(convert(piece.position), convert(reply.position))
+    game.run_team(GameParams(depth=2))
+    assert game.minimax.transposition_table.generation == generation + 1
+    assert len(game.minimax.transposition_table) <= 500
+    assert game.minimax._seed  # expected reply was played
+
+
+def test_multipv_scores_are_exact():
+    game = Game.create_default()
+    team, enemy = game.teams[WHITE], game.teams[BLACK]
+    lines = game.minimax.run_multipv(game.board, team, enemy, depth=2, lines=3)
+    assert len(lines) == 3
+    assert [score for score, _ in lines] == sorted(
+        (score for score, _ in lines), reverse=True
+    )
+    assert lines[0][0] == Game.create_default().minimax.run(
+        game.board, team, enemy, 2, True
+    )[0]
+    for score, variation in lines:
+        piece, move = variation[0]
+        with ReversibleMove(game.board, piece, move.position, enemy.pieces):
+            expected = Game.create_default().minimax.run(
+                game.board, team, enemy, 1, False
+            )[0]
+        assert score == expected
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import concurrent.futures
+import io
+import json
+import time
+
+import pytest
+
+from chess_ng.analysis import imap_bounded, run_analysis
+from chess_ng.consts import STARTING_FEN
+from chess_ng.engine import SearchLimits
+
+LINES = [
+    STARTING_FEN,
+    "# comment",
+    "  # indented comment",
+    'k7/1Q6/1K6/8/8/8/8/8 b - - id "mated";',
+    "invalid",
+    "8/8/8/8/8/8/8/8 w - - 0 1",
+]
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_analysis(workers):
+    output = io.StringIO()
+    count = run_analysis(LINES, output, SearchLimits(depth=1), workers=workers)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert count == len(records) == 4
+    assert records[0]["bestmove"] is not None
+    assert records[1]["id"] == "mated"
+    assert records[1]["bestmove"] is None
+    assert "error" in records[2]
+    assert records[3]["error"] == "Invalid position, missing white king."
+
+
+def _sleep(value):
+    time.sleep(value / 100)
+    return value
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_imap_bounded(ordered):
+    items = [5, 1, 3, 0, 2, 4]
+    with concurrent.futures.ThreadPoolExecutor(3) as executor:
+        results = list(imap_bounded(executor, _sleep, items, 3, ordered))
+    assert sorted(results) == sorted(items)
+    if ordered:
+        assert results == items
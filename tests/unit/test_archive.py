@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import pytest
+
+from chess_ng.archive import (
+    Archive,
+    ArchiveError,
+    ArchivedGame,
+    ArchiveWriter,
+    decode_move,
+    encode_game,
+    encode_move,
+)
+from chess_ng.consts import STARTING_FEN
+
+FEN = "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"
+GAMES = [
+    ArchivedGame(["e2e4", "e7e5", "g1f3"], "*"),
+    ArchivedGame(["a7a8q", "e8d7"], "1-0", FEN),
+    ArchivedGame([], "1/2-1/2"),
+]
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize("move", ["a1h8", "h8a1", "e2e4", "a7a8q", "b2b1n", "c7d8r"])
+def test_encode_move_round_trip(move):
+    assert encode_move(move) < 1 << 16
+    assert decode_move(encode_move(move)) == move
+
+
+def test_encode_game_size():
+    assert len(encode_game(["e2e4", "e7e5"])) == 4 + 2 * 2
+    assert len(encode_game([], fen=FEN)) == 4 + len(FEN)
+    with pytest.raises(ArchiveError):
+        encode_game([], "2-0")
+
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "games.cng")
+    with ArchiveWriter(path, buffer_size=2) as writer:
+        for game in GAMES:
+            writer.append(*game)
+    with Archive(path) as archive:
+        assert len(archive) == 3
+        assert list(archive) == GAMES
+        assert archive[1] == GAMES[1]
+        assert archive[-1] == GAMES[2]
+        assert archive[0].fen == STARTING_FEN
+        with pytest.raises(IndexError):
+            archive[3]  # pylint: disable=pointless-statement
+
+
+def test_append_to_archive(tmp_path):
+    path = str(tmp_path / "games.cng")
+    with ArchiveWriter(path) as writer:
+        writer.append(*GAMES[0])
+    with ArchiveWriter(path) as writer:
+        writer.append(*GAMES[1])
+    with Archive(path) as archive:
+        assert list(archive) == GAMES[:2]
+
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / "games.cng")
+    ArchiveWriter(path).close()
+    with Archive(path) as archive:
+        assert len(archive) == 0
+        assert not list(archive)
+
+
+def test_invalid_archive(tmp_path):
+    path = tmp_path / "games.cng"
+    path.write_bytes(b"PGN\n")
+    with pytest.raises(ArchiveError):
+        Archive(str(path))
+    with pytest.raises(ArchiveError):
+        ArchiveWriter(str(path))
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import numpy as np
+
+from chess_ng import datagen
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.datagen import (
+    DatagenConfig,
+    KeySet,
+    generate,
+    load_progress,
+    pack_board,
+    play_game,
+    read_shards,
+    unpack_board,
+)
+from chess_ng.engine import SearchResult
+from chess_ng.fen import load_board
+from chess_ng.hashing import zobrist_key
+from chess_ng.vectorized import encode_board
+
+CONFIG = DatagenConfig(nodes=20, depth=2, random_plies=2, sample_rate=1.0, max_plies=12)
+
+
+# pylint: disable=missing-function-docstring
+def test_pack_board_round_trip():
+    board, *_ = load_board(STARTING_FEN)
+    packed = pack_board(board)
+    assert packed.shape == (32,)
+    assert (unpack_board(packed) == encode_board(board)).all()
+    assert (unpack_board(np.stack([packed, packed]))[1] == encode_board(board)).all()
+
+
+def test_zobrist_key():
+    board, *_ = load_board(STARTING_FEN)
+    assert zobrist_key(board, WHITE) == zobrist_key(load_board(STARTING_FEN)[0], WHITE)
+    assert zobrist_key(board, WHITE) != zobrist_key(board, BLACK)
+    assert zobrist_key(board, WHITE) < 1 << 64
+    other, *_ = load_board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1")
+    assert zobrist_key(board, BLACK) != zobrist_key(other, BLACK)
+
+
+def test_key_set():
+    keys = KeySet(np.array([3, 1], dtype=np.uint64))
+    keys.add(2**64 - 1)
+    assert 1 in keys and 2**64 - 1 in keys and 2 not in keys
+    keys.merge()
+    assert len(keys) == 3
+    assert 2**64 - 1 in keys and 2**64 - 2 not in keys
+
+
+def test_generate_and_resume(tmp_path):
+    directory = str(tmp_path)
+    progress = generate(directory, 10, CONFIG, shard_size=4)
+    assert (progress.shards, progress.positions) == (3, 10)
+    progress = generate(directory, 14, CONFIG, shard_size=4)
+    assert (progress.shards, progress.positions) == (4, 14)
+    assert load_progress(directory) == progress
+    shards = list(read_shards(directory))
+    assert [len(shard) for shard in shards] == [4, 4, 4, 2]
+    positions = np.concatenate(shards)
+    assert len(np.unique(positions["key"])) == 14
+    assert set(positions["result"]) <= {0.0, 0.5, 1.0}
+    assert set(positions["side"]) <= {0, 1}
+
+
+def test_play_game_without_best_move(monkeypatch):
+    # the search results have no best move, so the first valid move is played
+    monkeypatch.setattr(datagen, "search", lambda *_: SearchResult())
+    config = DatagenConfig(random_plies=0, sample_rate=0.0, max_plies=4)
+    assert len(play_game(0, config)) == 0
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import asyncio
+import math
+import time
+
+import pytest
+
+from chess_ng.async_engine import AsyncEngine
+from chess_ng.consts import STARTING_FEN
+from chess_ng.engine import SearchLimits, analyse, apply_move, play
+
+
+# pylint: disable=missing-function-docstring
+def test_analyse():
+    result = analyse(STARTING_FEN, SearchLimits(depth=2))
+    assert result.depth == 2
+    assert result.nodes > 0
+    assert result.pv[0] == result.bestmove
+    assert len(result.pv) == 2
+
+
+def test_analyse_node_limit():
+    result = analyse(STARTING_FEN, SearchLimits(depth=10, nodes=200))
+    assert result.bestmove is not None
+    assert result.nodes <= 201
+    assert result.depth < 10
+
+
+def test_analyse_movetime():
+    result = analyse(STARTING_FEN, SearchLimits(depth=10, movetime=0.3))
+    assert result.bestmove is not None
+    assert result.time < 2
+
+
+def test_analyse_lost_position():
+    # every move loses to a mate within the depth
+    result = analyse("k7/8/1K6/8/8/8/8/7R b - - 0 1", SearchLimits(depth=3))
+    assert result.bestmove == "a8b8"
+    assert result.score == -math.inf
+
+
+def test_analyse_checkmate():
+    result = analyse("k7/1Q6/1K6/8/8/8/8/8 b - - 1 1", SearchLimits(depth=2))
+    assert result.bestmove is None
+
+
+@pytest.mark.parametrize(
+    "move,expected",
+    [
+        ("e2e4", "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR/ b - - 1 1"),
+        ("g1f3", "rnbqkbnr/pppppppp/8/8/8/5N2/PPPPPPPP/RNBQKB1R/ b - - 1 1"),
+    ],
+)
+def test_apply_move(move, expected):
+    assert apply_move(STARTING_FEN, move) == expected
+
+
+def test_apply_invalid_move():
+    with pytest.raises(ValueError):
+        apply_move(STARTING_FEN, "e7e5")
+
+
+def test_play():
+    result = play(STARTING_FEN, SearchLimits(depth=1))
+    assert result.fen == apply_move(STARTING_FEN, result.move)
+
+
+def test_async_engine():
+    async def run():
+        async with AsyncEngine(max_workers=2) as engine:
+            return await asyncio.gather(
+                engine.analyse(STARTING_FEN, SearchLimits(depth=1)),
+                engine.play(STARTING_FEN, SearchLimits(depth=1)),
+            )
+
+    analysis, played = asyncio.run(run())
+    assert analysis.bestmove == played.move
+
+
+def test_async_engine_timeout():
+    async def run():
+        async with AsyncEngine(max_workers=1) as engine:
+            await engine.analyse(STARTING_FEN, SearchLimits(depth=8), timeout=0.2)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test_async_engine_close_does_not_block(monkeypatch):
+    shutdown = AsyncEngine._shutdown  # pylint: disable=protected-access
+
+    def slow_shutdown(pool, manager):
+        time.sleep(0.2)  # like a search which takes a while to stop
+        shutdown(pool, manager)
+
+    monkeypatch.setattr(AsyncEngine, "_shutdown", staticmethod(slow_shutdown))
+    ticks = []
+
+    async def tick():
+        while True:
+            await asyncio.sleep(0.01)
+            ticks.append(None)
+
+    async def run():
+        async with AsyncEngine(max_workers=1) as engine:
+            await engine.analyse(STARTING_FEN, SearchLimits(depth=1))
+            ticker = asyncio.ensure_future(tick())
+        ticker.cancel()
+
+    asyncio.run(run())
+    assert len(ticks) >= 5
+
+
+def test_analyse_multipv():
+    result = analyse(STARTING_FEN, SearchLimits(depth=2, multipv=3))
+    assert len(result.lines) == 3
+    assert result.lines[0].pv[0] == result.bestmove
+    assert len({line.pv[0] for line in result.lines}) == 3
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import pytest
+
+from chess_ng.epd import EpdError, parse_epd, read_epd
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize(
+    "line,fen,operations",
+    [
+        ("8/8/8/8/8/8/8/K6k w - -", "8/8/8/8/8/8/8/K6k w - -", {}),
+        ("8/8/8/8/8/8/8/K6k w - - 0 1", "8/8/8/8/8/8/8/K6k w - - 0 1", {}),
+        (
+            '8/8/8/8/8/8/8/K6k b - - bm Kg2; id "pos 1";',
+            "8/8/8/8/8/8/8/K6k b - -",
+            {"bm": "Kg2", "id": "pos 1"},
+        ),
+        (
+            "8/8/8/8/8/8/8/K6k b - - 3 10 am Kg2 Kh2;",
+            "8/8/8/8/8/8/8/K6k b - - 3 10",
+            {"am": "Kg2 Kh2"},
+        ),
+    ],
+)
+def test_parse_epd(line, fen, operations):
+    record = parse_epd(line)
+    assert record.fen == fen
+    assert record.operations == operations
+
+
+def test_parse_epd_invalid():
+    with pytest.raises(EpdError):
+        parse_epd("8/8/8/8/8/8/8/K6k")
+
+
+def test_read_epd_skips_comments():
+    lines = ["# comment", "", '8/8/8/8/8/8/8/K6k w - - id "a";']
+    assert [record.id for record in read_epd(lines)] == ["a"]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import io
+import json
+
+from chess_ng.analysis import init_worker
+from chess_ng.engine import SearchLimits
+from chess_ng.epd import parse_epd
+from chess_ng.epdtest import run_position, run_suite
+
+LINES = [
+    'k7/8/1K6/8/8/8/8/7R w - - bm Rh8#; id "mate";',
+    'k7/8/1K6/8/8/8/8/7R w - - am Rh8; id "avoid";',
+    'k7/8/1K6/8/8/8/8/7R w - - bm Rb2; id "illegal";',
+]
+
+
+# pylint: disable=missing-function-docstring
+def test_run_position():
+    result = run_position(parse_epd(LINES[0]), SearchLimits(depth=3, nodes=5000))
+    assert result.solved
+    assert result.bestmove == "Rh8#"
+    assert result.solution_depth <= result.depth
+    assert 0 < result.solution_nodes <= result.nodes
+
+
+def test_run_position_does_not_depend_on_previous_positions():
+    init_worker("moves")
+    record = parse_epd(LINES[1])
+    first = run_position(record, SearchLimits(depth=3))
+    second = run_position(record, SearchLimits(depth=3))
+    assert first.nodes == second.nodes
+    assert first.solution_nodes == second.solution_nodes
+
+
+def test_run_suite():
+    report = io.StringIO()
+    lines = LINES + ["  # indented comment"]
+    summary = run_suite(lines, SearchLimits(depth=2), report=report)
+    assert summary.positions == 2
+    assert summary.solved == 1
+    assert len(report.getvalue().splitlines()) == 3
+    data = json.loads(json.dumps(summary.to_dict()))
+    assert data["solve_rate"] == 0.5
+    assert data["results"][2]["error"] is not None
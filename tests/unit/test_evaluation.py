@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import math
+
+import numpy as np
+import pytest
+
+from chess_ng.algorithm import (
+    evaluate_distance,
+    evaluate_distance_np,
+    inverse_distance_sums,
+)
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "4k3/1P4P1/8/3q4/3Q4/8/1p4p1/4K3 b - - 1 1",
+]
+
+
+def _reference_distance(board, team, enemy):
+    """Previous implementation of evaluate_distance, computing each distance"""
+
+    def inverse_distance(point1, point2):
+        value = math.sqrt(
+            (point1[0] - point2[0]) ** 2 + abs(point1[1] - point2[1]) ** 2
+        )
+        return 1 / value if value else 1
+
+    sum_ally = sum(
+        inverse_distance(enemy.king.position, move.position)
+        for _, move in team.compute_all_moves(board)
+    )
+    sum_enemy = sum(
+        inverse_distance(team.king.position, move.position)
+        for _, move in enemy.compute_all_moves(board)
+    )
+    return sum_ally - sum_enemy
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize("fen", FENS)
+def test_evaluate_distance(fen):
+    board, teams, _ = load_board(fen)
+    for team, enemy in ((teams[WHITE], teams[BLACK]), (teams[BLACK], teams[WHITE])):
+        expected = _reference_distance(board, team, enemy)
+        assert evaluate_distance(board, team, enemy) == expected
+        assert evaluate_distance_np(board, team, enemy) == pytest.approx(expected)
+
+
+def test_inverse_distance_sums():
+    origins = np.array([0, 63])
+    targets = np.array([0, 1, 9, 63])
+    batch = np.array([0, 0, 0, 1])
+    sums = inverse_distance_sums(origins, targets, batch)
+    assert sums == pytest.approx([1 + 1 + 1 / math.sqrt(2), 1])
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import os
+import subprocess
+import sys
+
+import pytest
+
+import chess_ng
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(chess_ng.__file__)))
+HEAVY_MODULES = ("numpy", "PIL", "colorama", "asyncio")
+IMPORT_BUDGET = 0.5  # seconds, a few times the import time on a laptop
+
+
+def _import(module):
+    """Imports the module in a new interpreter. Returns the cumulative import time
+    of the module in seconds and the heavy modules which were imported.
+    """
+    code = f"import sys, {module}; print(*[x for x in {HEAVY_MODULES} if x in sys.modules])"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    line = next(
+        line
+        for line in process.stderr.splitlines()
+        if line.split("|")[-1].strip() == module
+    )
+    return int(line.split("|")[1]) / 1e6, process.stdout.split()
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize(
+    "module",
+    ["chess_ng.__main__", "chess_ng.analysis", "chess_ng.epdtest", "chess_ng.uci"],
+)
+def test_import_time(module):
+    import_time, imported = _import(module)
+    assert not imported
+    assert import_time < IMPORT_BUDGET
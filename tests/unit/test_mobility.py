@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import random
+
+import pytest
+
+from chess_ng.algorithm import (
+    ReversibleMove,
+    evaluate_distance,
+    evaluate_length,
+    evaluate_length_with_captures,
+)
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
+from chess_ng.mobility import DistanceEvaluation, MobilityEvaluation
+from chess_ng.util import convert_str
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "4k3/1P4P1/8/3q4/3Q4/8/1p4p1/4K3 b - - 1 1",
+]
+EVALUATIONS = [
+    (MobilityEvaluation, evaluate_length),
+    (lambda: MobilityEvaluation(captures=True), evaluate_length_with_captures),
+    (DistanceEvaluation, evaluate_distance),
+]
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize("fen", FENS)
+@pytest.mark.parametrize("factory,expected", EVALUATIONS)
+def test_matches_full_evaluation(fen, factory, expected):
+    """Plays random moves, taking some of them back, checking the evaluation
+    against the full evaluation after each move
+    """
+    random.seed(0)
+    board, teams, side = load_board(fen)
+    evaluation = factory()
+    moves = []
+    for _ in range(40):
+        team, enemy = teams[side], teams[BLACK if side == WHITE else WHITE]
+        assert evaluation(board, team, enemy) == expected(board, team, enemy)
+        assert evaluation(board, enemy, team) == expected(board, enemy, team)
+        valid_moves = team.compute_valid_moves(board, enemy.pieces)
+        if not valid_moves:
+            break
+        piece, move = random.choice(valid_moves)
+        moves.append(ReversibleMove(board, piece, move.position, enemy.pieces))
+        moves[-1].__enter__()
+        side = enemy.representation
+        if random.random() < 0.3:
+            moves.pop().__exit__()
+            side = team.representation
+
+    for move in reversed(moves):
+        move.__exit__()
+    assert evaluation(board, teams[WHITE], teams[BLACK]) == expected(
+        board, teams[WHITE], teams[BLACK]
+    )
+
+
+@pytest.mark.parametrize("factory,expected", EVALUATIONS)
+def test_promotion_taken_back(factory, expected):
+    """The pawn promotes, moves back to the square it came from and both moves are
+    taken back: the same pawn is on the same square, but no longer promoted
+    """
+    board, teams, _ = load_board("8/2P5/8/8/8/8/5p2/K6k w - - 0 1")
+    black, white = teams[BLACK], teams[WHITE]
+    evaluation = factory()
+    pawn = board[convert_str("f2")]
+    with ReversibleMove(board, pawn, convert_str("f1"), white.pieces):
+        assert evaluation(board, black, white) == expected(board, black, white)
+        with ReversibleMove(board, pawn, convert_str("f2"), white.pieces):
+            assert evaluation(board, black, white) == expected(board, black, white)
+    assert not pawn.promoted
+    assert evaluation(board, black, white) == expected(board, black, white)
+
+
+def test_new_board_resets_counts():
+    evaluation = MobilityEvaluation()
+    for fen in FENS:
+        board, teams, _ = load_board(fen)
+        assert evaluation(board, teams[WHITE], teams[BLACK]) == evaluate_length(
+            board, teams[WHITE], teams[BLACK]
+        )
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import random
+
+import numpy as np
+import pytest
+
+from chess_ng.__main__ import configure_nnue
+from chess_ng.algorithm import ReversibleMove
+from chess_ng.cli import create_parser
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.engine import EVALUATIONS
+from chess_ng.fen import load_board
+from chess_ng.nnue import (
+    FEATURES,
+    PATH_VARIABLE,
+    Network,
+    NetworkFormatError,
+    NnueEvaluation,
+    feature_index,
+    load_network,
+    random_network,
+)
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "4k3/1P4P1/8/3q4/3Q4/8/1p4p1/4K3 b - - 1 1",
+]
+
+
+def _evaluate_from_scratch(network, board, team):
+    features = np.zeros(FEATURES, dtype=np.float32)
+    for row in board:
+        for piece in row:
+            if piece is not None:
+                features[feature_index(piece)] = 1
+    accumulator = features @ network.feature_weights + network.feature_bias
+    score = float(network.forward(accumulator[np.newaxis])[0])
+    return score if team.representation == WHITE else -score
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize("quantized", [True, False])
+def test_save_and_load(tmp_path, quantized):
+    network = random_network((32, 8), quantized=quantized, seed=0)
+    network.save(tmp_path / "network.npz")
+    loaded = load_network(tmp_path / "network.npz")
+    assert loaded.feature_weights.dtype == (np.int16 if quantized else np.float32)
+    assert np.array_equal(loaded.feature_weights, network.feature_weights)
+    assert np.array_equal(loaded.feature_bias, network.feature_bias)
+    assert loaded.scale == network.scale
+    assert len(loaded.layers) == 2
+    for (weights, bias), (expected_weights, expected_bias) in zip(
+        loaded.layers, network.layers
+    ):
+        assert np.array_equal(weights, expected_weights)
+        assert np.array_equal(bias, expected_bias)
+
+
+def test_load_invalid_files(tmp_path):
+    with pytest.raises(NetworkFormatError):
+        load_network(tmp_path / "missing.npz")
+
+    np.savez(tmp_path / "other.npz", weights=np.zeros(3))
+    with pytest.raises(NetworkFormatError):
+        load_network(tmp_path / "other.npz")
+
+    network = random_network((8,), seed=0)
+    network.save(tmp_path / "network.npz")
+    with np.load(tmp_path / "network.npz") as file:
+        arrays = dict(file.items())
+    del arrays["feature_bias"]
+    np.savez(tmp_path / "incomplete.npz", **arrays)
+    with pytest.raises(NetworkFormatError):
+        load_network(tmp_path / "incomplete.npz")
+
+
+def test_invalid_shapes():
+    network = random_network((8, 4), seed=0)
+    with pytest.raises(NetworkFormatError):
+        Network(network.feature_weights[:10], network.feature_bias, network.layers)
+    with pytest.raises(NetworkFormatError):
+        Network(network.feature_weights, network.feature_bias, network.layers[:1])
+    with pytest.raises(NetworkFormatError):
+        Network(network.feature_weights, network.feature_bias, network.layers[1:])
+
+
+def test_selectable_by_name(tmp_path, monkeypatch):
+    random_network((8,), seed=0).save(tmp_path / "network.npz")
+    monkeypatch.setenv(PATH_VARIABLE, str(tmp_path / "network.npz"))
+    evaluation = EVALUATIONS["nnue"]()
+    board, teams, _ = load_board(STARTING_FEN)
+    assert isinstance(evaluation(board, teams[WHITE], teams[BLACK]), float)
+
+
+def test_nnue_option(tmp_path, monkeypatch):
+    monkeypatch.setenv(PATH_VARIABLE, "")  # restored after the test
+    parser = create_parser()
+    path = str(tmp_path / "network.npz")
+    with pytest.raises(SystemExit):
+        configure_nnue(parser, parser.parse_args(["--nnue", path]))
+    random_network((8,), seed=0).save(path)
+    configure_nnue(parser, parser.parse_args(["--nnue", path, "-e", "nnue"]))
+    assert isinstance(EVALUATIONS["nnue"](), NnueEvaluation)
+    monkeypatch.setenv(PATH_VARIABLE, str(tmp_path / "missing.npz"))
+    with pytest.raises(SystemExit):
+        configure_nnue(parser, parser.parse_args(["analyse", "-e", "nnue"]))
+    configure_nnue(parser, parser.parse_args(["analyse"]))
+
+
+@pytest.mark.parametrize("fen", FENS)
+@pytest.mark.parametrize("quantized", [True, False])
+def test_matches_full_evaluation(fen, quantized):
+    """Plays random moves, taking some of them back, checking the incremental and
+    the batch evaluation against the evaluation from scratch after each move
+    """
+    random.seed(0)
+    network = random_network((32, 8), quantized=quantized, seed=1)
+    evaluation = NnueEvaluation(network=network)
+    board, teams, side = load_board(fen)
+    moves = []
+    for _ in range(40):
+        team, enemy = teams[side], teams[BLACK if side == WHITE else WHITE]
+        expected = _evaluate_from_scratch(network, board, team)
+        assert evaluation(board, team, enemy) == pytest.approx(expected, abs=1e-5)
+        assert evaluation(board, enemy, team) == pytest.approx(-expected, abs=1e-5)
+        batch = evaluation.encode(board)[np.newaxis]
+        assert evaluation.evaluate_batch(batch, team, enemy)[0] == pytest.approx(
+            expected, abs=1e-5
+        )
+        valid_moves = team.compute_valid_moves(board, enemy.pieces)
+        if not valid_moves:
+            break
+        piece, move = random.choice(valid_moves)
+        moves.append(ReversibleMove(board, piece, move.position, enemy.pieces))
+        moves[-1].__enter__()
+        side = enemy.representation
+        if random.random() < 0.3:
+            moves.pop().__exit__()
+            side = team.representation
+
+    for move in reversed(moves):
+        move.__exit__()
+    assert evaluation(board, teams[WHITE], teams[BLACK]) == pytest.approx(
+        _evaluate_from_scratch(network, board, teams[WHITE]), abs=1e-5
+    )
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import pytest
+
+from chess_ng.consts import BLACK, STARTING_FEN
+from chess_ng.fen import load_board
+from chess_ng.notation import (
+    NotationError,
+    format_san,
+    make_move,
+    normalize_san,
+    parse_move,
+    parse_san,
+)
+from chess_ng.util import convert, convert_str
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize(
+    "fen,move,expected",
+    [
+        (STARTING_FEN, "Nf3", "g1f3"),
+        (STARTING_FEN, "e4", "e2e4"),
+        (STARTING_FEN, "g1f3", "g1f3"),
+        ("4k3/8/8/3p4/4P3/8/8/4K3 w - - 1 1", "exd5", "e4d5"),
+        ("4k3/8/8/8/8/8/4K3/R6R w - - 1 1", "Rad1", "a1d1"),
+        ("4k3/R7/8/8/8/8/8/R3K3 w - - 1 1", "R1a4", "a1a4"),
+        ("4k3/7P/8/8/8/8/8/4K3 w - - 1 1", "h8=Q+", "h7h8"),
+        ("k7/8/1K6/8/8/8/8/7R w - - 1 1", "Rh8#", "h1h8"),
+    ],
+)
+def test_parse_move(fen, move, expected):
+    board, teams, side_to_move = load_board(fen)
+    piece, piece_move = parse_move(board, teams, side_to_move, move)
+    assert convert(piece.position) + convert(piece_move.position) == expected
+
+
+@pytest.mark.parametrize(
+    "fen,move,expected",
+    [
+        (STARTING_FEN, "b1c3", "Nc3"),
+        ("4k3/8/8/8/8/8/4K3/R6R w - - 1 1", "a1d1", "Rad1"),
+        ("4k3/7P/8/8/8/8/8/4K3 w - - 1 1", "h7h8", "h8=Q+"),
+        ("k7/8/1K6/8/8/8/8/7R w - - 1 1", "h1h8", "Rh8#"),
+    ],
+)
+def test_format_san(fen, move, expected):
+    board, teams, side_to_move = load_board(fen)
+    piece, piece_move = parse_move(board, teams, side_to_move, move)
+    assert format_san(board, teams, piece, piece_move.position) == expected
+
+
+def test_parse_illegal_move():
+    board, teams, side_to_move = load_board(STARTING_FEN)
+    with pytest.raises(NotationError):
+        parse_move(board, teams, side_to_move, "Nf6")
+
+
+def test_normalize_san():
+    assert normalize_san("Qxf7+!") == "Qxf7"
+
+
+@pytest.mark.parametrize(
+    "fen,move,expected",
+    [
+        (STARTING_FEN, "Nf3", "g1f3"),
+        (STARTING_FEN, "e4", "e2e4"),
+        ("4k3/8/8/3p4/4P3/8/8/4K3 w - - 1 1", "exd5", "e4d5"),
+        ("4k3/8/8/8/8/8/4K3/R6R w - - 1 1", "Rad1", "a1d1"),
+        ("4k3/R7/8/8/8/8/8/R3K3 w - - 1 1", "R1a4", "a1a4"),
+        ("4k3/7P/8/8/8/8/8/4K3 w - - 1 1", "h8=Q+", "h7h8"),
+        ("4k3/8/8/8/8/8/8/4K2R w K - 1 1", "O-O", "e1g1"),
+        ("r3k3/8/8/8/8/8/8/4K3 b q - 1 1", "O-O-O", "e8c8"),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 1 1", "exd6", "e5d6"),
+        ("4k3/4r3/8/8/8/2N3N1/8/4K3 w - - 1 1", "Nf5", "g3f5"),  # e2 is pinned
+    ],
+)
+def test_parse_san(fen, move, expected):
+    board, teams, side_to_move = load_board(fen)
+    piece, destination = parse_san(board, teams, side_to_move, move)
+    assert convert(piece.position) + convert(destination) == expected
+
+
+@pytest.mark.parametrize("move", ["Nf6", "Qd4", "e5", "xx", "Nd2"])
+def test_parse_san_invalid(move):
+    board, teams, side_to_move = load_board(STARTING_FEN)
+    with pytest.raises(NotationError):
+        parse_san(board, teams, side_to_move, move)
+
+
+def test_make_move_castling_and_en_passant():
+    board, teams, _ = load_board("4k3/8/8/3pP3/8/8/8/4K2R w K - 1 1")
+    make_move(board, teams, board[4, 3], (3, 2))
+    assert board[3, 3] is None
+    assert len(teams[BLACK].pieces) == 1
+    make_move(board, teams, board[4, 7], (6, 7))
+    assert board[6, 7].representation == "K1"
+    assert board[5, 7].representation == "R1"
+
+
+@pytest.mark.parametrize(
+    "fen,move,expected",
+    [
+        ("4k3/8/8/8/8/8/8/4K2R w K - 1 1", "e1g1", "O-O"),
+        ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 1 1", "e5d6", "exd6"),
+    ],
+)
+def test_format_san_special_moves(fen, move, expected):
+    board, teams, _ = load_board(fen)
+    piece = board[convert_str(move[:2])]
+    assert format_san(board, teams, piece, convert_str(move[2:])) == expected
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import glob
+import json
+import logging
+
+from chess_ng.consts import BLACK, WHITE
+from chess_ng.fen import load_board
+from chess_ng.output import GAME_LOG, Logger, NoLogger
+
+FEN = "4k3/8/8/8/8/8/8/r3K2Q w - - 0 1"
+
+
+# pylint: disable=missing-function-docstring
+def test_logger_writes_json_lines(tmp_path, capsys):
+    board, teams, _ = load_board(FEN)
+    with Logger(str(tmp_path), "game.log") as logger:
+        logger.info("Depth: %s", 3)
+        board.move_piece_and_capture((0, 7), board[7, 7], teams[BLACK].pieces)
+        logger.info(
+            "Turn %s: %s",
+            1,
+            "h1a1",
+            extra={"turn": 1, "side": WHITE, "move": "h1a1", "score": 5.0},
+        )
+    (path,) = glob.glob(str(tmp_path / "*game.log"))
+    with open(path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["message"] for record in records] == [
+        "Depth: 3",
+        "Captured Rook(a1)",
+        "Turn 1: Team 1: Q1 from h1 to a1",
+        "Turn 1: h1a1",
+    ]
+    assert records[-1]["move"] == "h1a1" and records[-1]["score"] == 5.0
+    assert "nodes" not in records[-1]
+    assert capsys.readouterr().out.splitlines()[0] == "Depth: 3"
+
+
+def test_no_logger_is_silent(capsys):
+    board, teams, _ = load_board(FEN)
+    with NoLogger() as logger:
+        logger.info("Depth: %s", 3)
+        assert not logging.getLogger(GAME_LOG).isEnabledFor(logging.INFO)
+        board.move_piece_and_capture((0, 7), board[7, 7], teams[BLACK].pieces)
+    assert capsys.readouterr().out == ""
+    assert board[0, 7].turn_counter == 0.5
+
+
+def test_no_logger_restores_level():
+    game_log = logging.getLogger(GAME_LOG)
+    game_log.setLevel(logging.INFO)
+    with NoLogger():
+        assert game_log.level == logging.WARNING
+    assert game_log.level == logging.INFO
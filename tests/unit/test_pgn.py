@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import io
+
+import pytest
+
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import construct_fen_notation
+from chess_ng.game import Game, GameParams
+from chess_ng.notation import NotationError
+from chess_ng.pgn import (
+    PgnGame,
+    format_game,
+    format_movetext,
+    format_pgn,
+    read_pgn,
+    replay,
+)
+
+PGN = """[Event "Test \\"quoted\\""]
+[White "a"]
+[Black "b"]
+[Result "1-0"]
+
+1. e4 {a comment
+spanning lines} e5 2. Nf3 (2. f4 exf4 (2... d5)) 2... Nc6 $1 3. Bc4 ; rest
+3... Nf6 4.O-O Bc5 1-0
+
+% escaped line
+[Event "second"]
+[SetUp "1"]
+[FEN "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"]
+
+1. exd6 Kd7 *
+"""
+
+
+# pylint: disable=missing-function-docstring
+def test_format_pgn():
+    text = format_pgn({"White": "a", "Black": 'b "c"'}, ["e4", "e5"], "1-0")
+    assert text == (
+        '[Event "?"]\n[Site "?"]\n[Date "?"]\n[Round "?"]\n[White "a"]\n'
+        '[Black "b \\"c\\""]\n[Result "1-0"]\n\n1. e4 e5 1-0\n\n'
+    )
+
+
+def test_format_pgn_with_fen():
+    fen = "4k3/8/8/8/8/8/8/R3K3 b - - 3 20"
+    text = format_pgn({}, ["Kd7", "Ra7+"], "*", fen)
+    assert f'[SetUp "1"]\n[FEN "{fen}"]' in text
+    assert text.endswith("20... Kd7 21. Ra7+ *\n\n")
+    assert "SetUp" not in format_pgn({}, [], "*", STARTING_FEN)
+
+
+def test_format_movetext_wraps_lines():
+    text = format_movetext(["Nf3", "Nf6", "Ng1", "Ng8"] * 10, "1/2-1/2")
+    lines = text.split("\n")
+    assert len(lines) > 1
+    assert all(len(line) <= 79 for line in lines)
+    assert lines[-1].endswith("1/2-1/2")
+
+
+def test_invalid_result():
+    with pytest.raises(ValueError):
+        format_pgn({}, [], "2-0")
+
+
+def test_read_pgn():
+    first, second = read_pgn(io.StringIO(PGN))
+    assert first.headers["Event"] == 'Test "quoted"'
+    assert first.moves == ["e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6", "O-O", "Bc5"]
+    assert first.result == "1-0"
+    assert second.fen == "4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1"
+    assert second.moves == ["exd6", "Kd7"]
+    assert second.result == "*"
+
+
+def test_read_pgn_without_result():
+    games = list(read_pgn(["1. d4 d5", '[Event "next"]', "1. c4 *"]))
+    assert [game.moves for game in games] == [["d4", "d5"], ["c4"]]
+
+
+def test_replay():
+    first, second = read_pgn(io.StringIO(PGN))
+    positions = [(side, move) for _, _, side, move in replay(first)]
+    assert positions[:2] == [(WHITE, "e4"), (BLACK, "e5")]
+    *_, (board, teams, _, _) = replay(first)
+    assert board[6, 7].representation[0] == "K"  # castled
+    assert board[5, 7].representation[0] == "R"
+    *_, (board, teams, _, _) = replay(second)
+    assert construct_fen_notation(board, WHITE).startswith("8/3k4/3P4/8/8/")
+    assert len(teams[BLACK].pieces) == 1
+
+
+def test_replay_illegal_move():
+    with pytest.raises(NotationError):
+        list(replay(PgnGame(moves=["e4", "e4", "Ke2"])))
+
+
+def test_format_game_round_trip():
+    game = Game.create_default()
+    game.player = BLACK  # the engine plays white first
+    for _ in range(8):
+        game.run_team(GameParams(depth=1))
+        game.player = game.team.representation
+    text = format_game(game, {"Event": "test"})
+    (pgn_game,) = read_pgn(io.StringIO(text))
+    assert pgn_game.headers["Event"] == "test"
+    assert len(pgn_game.moves) == len(game.moves) == 8
+    *_, (board, _, side, move) = replay(pgn_game)
+    assert move == pgn_game.moves[-1]
+    assert side == BLACK
+    assert board is not game.board
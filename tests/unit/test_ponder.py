@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+from chess_ng.algorithm import CancellationToken
+from chess_ng.consts import BLACK
+from chess_ng.fen import construct_fen_notation
+from chess_ng.game import Game, GameParams
+from chess_ng.ponder import Ponderer
+from chess_ng.util import convert
+
+PARAMS = GameParams(depth=2)
+
+
+# pylint: disable=missing-function-docstring
+def _create_game():
+    game = Game.create_default()
+    game.player = BLACK
+    game.run_team(PARAMS)
+    return game
+
+
+def test_ponder_hit_reuses_result():
+    game = _create_game()
+    ponderer = Ponderer()
+    assert ponderer.start(game, PARAMS)
+    squares = tuple(map(convert, ponderer.expected_reply))
+    assert ponderer.stop(game, *squares)
+    game.run_player(*squares)
+
+    assert game.minimax._saved_result is not None
+
+    cold_game = _create_game()
+    cold_game.run_player(*squares)
+    piece, *move = game.run_team(PARAMS)
+    cold_piece, *cold_move = cold_game.run_team(PARAMS)
+    assert (repr(piece), move) == (repr(cold_piece), cold_move)
+    assert game.minimax._saved_result is None
+
+
+def test_ponder_miss_restores_board():
+    game = _create_game()
+    fen = construct_fen_notation(game.board, BLACK)
+    ponderer = Ponderer()
+    assert ponderer.start(game, PARAMS)
+    source, destination = map(convert, ponderer.expected_reply)
+    assert not ponderer.stop(game, destination, source)
+    assert construct_fen_notation(game.board, BLACK) == fen
+    assert game.minimax.cancellation_token is None
+
+
+def test_ponder_restores_token():
+    game = _create_game()
+    token = game.minimax.cancellation_token = CancellationToken()
+    ponderer = Ponderer()
+    assert ponderer.start(game, PARAMS)
+    ponderer.stop(game)
+    assert game.minimax.cancellation_token is token
+    assert not token.cancelled
+
+
+def test_ponder_without_prediction():
+    game = Game.create_default()
+    assert not Ponderer().start(game, PARAMS)
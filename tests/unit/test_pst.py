@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import random
+
+import pytest
+
+from chess_ng.algorithm import ReversibleMove, evaluate_length
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
+from chess_ng.pst import MAX_PHASE, PstEvaluation, evaluate_pst, taper
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "4k3/1P4P1/8/3q4/3Q4/8/1p4p1/4K3 b - - 1 1",
+]
+
+
+# pylint: disable=missing-function-docstring
+def test_starting_position_is_balanced():
+    board, teams, _ = load_board(STARTING_FEN)
+    assert evaluate_pst(board, teams[WHITE], teams[BLACK]) == 0
+    assert PstEvaluation()(board, teams[WHITE], teams[BLACK]) == 0
+
+
+def test_taper():
+    assert taper(100, 300, MAX_PHASE) == 1
+    assert taper(100, 300, 0) == 3
+    assert taper(100, 300, MAX_PHASE // 2) == 2
+    assert taper(100, 300, 2 * MAX_PHASE) == 1
+
+
+def test_scores_material_and_squares():
+    board, teams, _ = load_board("4k3/8/8/8/3N4/8/8/4K3 w - - 0 1")
+    centre = evaluate_pst(board, teams[WHITE], teams[BLACK])
+    assert centre > 2.5
+    assert evaluate_pst(board, teams[BLACK], teams[WHITE]) == -centre
+
+    board, teams, _ = load_board("4k3/8/8/8/8/8/8/N3K3 w - - 0 1")
+    assert evaluate_pst(board, teams[WHITE], teams[BLACK]) < centre
+
+
+def test_mirrored_position_is_negated():
+    board, teams, _ = load_board("4k3/8/8/8/2N5/8/5P2/4K3 w - - 0 1")
+    mirrored_board, mirrored_teams, _ = load_board("4k3/5p2/8/2n5/8/8/8/4K3 b - - 0 1")
+    assert evaluate_pst(board, teams[WHITE], teams[BLACK]) == evaluate_pst(
+        mirrored_board, mirrored_teams[BLACK], mirrored_teams[WHITE]
+    )
+
+
+def test_mobility_term():
+    board, teams, _ = load_board(FENS[1])
+    team, enemy = teams[WHITE], teams[BLACK]
+    expected = evaluate_pst(board, team, enemy) + 0.1 * evaluate_length(
+        board, team, enemy
+    )
+    assert PstEvaluation(mobility_weight=0.1)(board, team, enemy) == pytest.approx(
+        expected
+    )
+
+
+@pytest.mark.parametrize("fen", FENS)
+@pytest.mark.parametrize("mobility_weight", [0, 0.04])
+def test_matches_full_evaluation(fen, mobility_weight):
+    """Plays random moves, taking some of them back, checking the incremental
+    evaluation against the evaluation from scratch after each move
+    """
+    random.seed(0)
+    board, teams, side = load_board(fen)
+    evaluation = PstEvaluation(mobility_weight)
+
+    def expected(team, enemy):
+        mobility = mobility_weight * evaluate_length(board, team, enemy)
+        return evaluate_pst(board, team, enemy) + mobility
+
+    moves = []
+    for _ in range(40):
+        team, enemy = teams[side], teams[BLACK if side == WHITE else WHITE]
+        assert evaluation(board, team, enemy) == pytest.approx(expected(team, enemy))
+        assert evaluation(board, enemy, team) == pytest.approx(expected(enemy, team))
+        valid_moves = team.compute_valid_moves(board, enemy.pieces)
+        if not valid_moves:
+            break
+        piece, move = random.choice(valid_moves)
+        moves.append(ReversibleMove(board, piece, move.position, enemy.pieces))
+        moves[-1].__enter__()
+        side = enemy.representation
+        if random.random() < 0.3:
+            moves.pop().__exit__()
+            side = team.representation
+
+    for move in reversed(moves):
+        move.__exit__()
+    assert evaluation(board, teams[WHITE], teams[BLACK]) == pytest.approx(
+        expected(teams[WHITE], teams[BLACK])
+    )
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
+import io
 import os
 import random
+import re
 
 from PIL import Image
 
 from chess_ng.board import Board
-from chess_ng.consts import BLACK, WHITE
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
 from chess_ng.piece import PIECES
-from chess_ng.renderer import ImageRenderer
+from chess_ng.renderer import CLEAR_SCREEN, ImageRenderer, TerminalRenderer
 
 FILENAME = "board.png"
 
+
 # pylint: disable=missing-function-docstring
 def setup():
     if os.path.isfile(FILENAME):
@@ -23,7 +27,10 @@ def teardown():
 
 
 class DummyReader:
+    calls = 0
+
     def read_pieces(self):
+        self.calls += 1
         im = Image.new("RGBA", (60, 60), color=(255, 0, 0, 255))
         piece_dict = {
             x: im for x in ["queen", "king", "rook", "knight", "bishop", "pawn"]
@@ -43,3 +50,44 @@ def test_render():
     board = Board(pieces)
     ImageRenderer(piece_reader=DummyReader()).render(board).save(FILENAME)
     assert os.path.isfile(FILENAME)
+
+
+def test_render_uses_cached_tiles():
+    board, teams, _ = load_board(STARTING_FEN)
+    reader = DummyReader()
+    renderer = ImageRenderer(piece_reader=reader)
+    first = renderer.render(board)
+    board.move_piece_and_capture((4, 4), board[4, 6], teams[BLACK].pieces, log=False)
+    second = renderer.render(board)
+    assert reader.calls == 1
+    assert first.size == second.size == (8 * 60 + 23,) * 2
+    assert first.getpixel((4 * 60 + 23, 6 * 60)) == (255, 0, 0, 255)  # e2 pawn
+    assert second.getpixel((4 * 60 + 23, 6 * 60)) != (255, 0, 0, 255)
+    assert second.getpixel((4 * 60 + 23, 4 * 60)) == (255, 0, 0, 255)
+
+
+def test_terminal_renderer():
+    board, *_ = load_board(STARTING_FEN)
+    output = io.StringIO()
+    renderer = TerminalRenderer(output)
+    renderer(board)
+    renderer(board)
+    assert output.getvalue() == 2 * (repr(board) + "\n")
+
+
+def test_terminal_renderer_redraws_changed_squares():
+    board, teams, _ = load_board(STARTING_FEN)
+    output = io.StringIO()
+    renderer = TerminalRenderer(output, diff=True)
+    renderer(board)
+    assert output.getvalue() == CLEAR_SCREEN + repr(board)
+    output.seek(0)
+    output.truncate()
+    board.move_piece_and_capture((4, 4), board[4, 6], teams[BLACK].pieces, log=False)
+    renderer(board)
+    # e4 and e2 are redrawn, then the cursor is moved below the board
+    assert re.findall(r"\x1b\[\d+;\d+H", output.getvalue()) == [
+        "\x1b[5;9H",
+        "\x1b[7;9H",
+        "\x1b[9;1H",
+    ]
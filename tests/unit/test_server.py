@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import asyncio
+import concurrent.futures
+import json
+
+import pytest
+
+from chess_ng import server
+from chess_ng.engine import SearchLimits, SearchResult
+from chess_ng.server import GameServer, SearchScheduler, Session
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+def _run(coroutine_function, workers=1):
+    async def run():
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            scheduler = SearchScheduler(executor, workers, max_queued=8)
+            try:
+                return await coroutine_function(GameServer(scheduler))
+            finally:
+                await scheduler.close()
+
+    return asyncio.run(run())
+
+
+# pylint: disable=missing-function-docstring
+def test_session_play_and_state():
+    session = Session("1")
+    session.play("e2e4")
+    session.play("e7e5")
+    state = session.state()
+    assert state["moves"] == ["e2e4", "e7e5"]
+    assert state["fen"].split()[1] == "w"
+    assert state["result"] == "*"
+
+
+def test_session_checkmate():
+    session = Session("1", MATE_IN_ONE)
+    session.play("a1a8")
+    assert session.state()["result"] == "1-0"
+    assert session.state()["termination"] == "checkmate"
+    with pytest.raises(server.ServerError):
+        session.play("g8h8")
+
+
+def test_create_move_and_play():
+    async def run(game_server):
+        status, game = await game_server.dispatch(
+            "POST", "/games", {"fen": MATE_IN_ONE, "depth": 2}
+        )
+        assert status == 201
+        status, response = await game_server.dispatch(
+            "POST", f"/games/{game['id']}/play", {}
+        )
+        return status, response, await game_server.dispatch("GET", "/metrics", {})
+
+    status, response, (_, metrics) = _run(run)
+    assert status == 200
+    assert response["move"] == "a1a8"
+    assert response["result"] == "1-0"
+    assert metrics["sessions"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["queued"] == 0
+    assert metrics["latency"]["count"] == 1
+
+
+@pytest.mark.parametrize(
+    "method, path, body, status",
+    [
+        ("GET", "/games/42", {}, 404),
+        ("GET", "/unknown", {}, 404),
+        ("PUT", "/metrics", {}, 405),
+        ("POST", "/games", {"fen": "invalid"}, 400),
+        ("POST", "/games", {"fen": "8/8/8/8/8/8/8/8 w - - 0 1"}, 400),
+        ("POST", "/games", {"fen": 1}, 400),
+        ("POST", "/games", {"depth": "x"}, 400),
+        ("POST", "/games", {"movetime": -1}, 400),
+        ("POST", "/games", {"nodes": 1.5}, 400),
+        ("POST", "/games/1/moves", {"move": "e2e5"}, 400),
+    ],
+)
+def test_invalid_requests(method, path, body, status):
+    async def run(game_server):
+        await game_server.dispatch("POST", "/games", {})
+        return await game_server.dispatch(method, path, body)
+
+    response_status, response = _run(run)
+    assert response_status == status
+    assert "error" in response
+
+
+def test_scheduler_serves_games_round_robin(monkeypatch):
+    searched = []
+
+    def search_game(fen, moves, limits):
+        searched.append(fen)
+        return SearchResult()
+
+    monkeypatch.setattr(server, "search_game", search_game)
+
+    async def run(_):
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            scheduler = SearchScheduler(executor, 1)
+            busy, other = Session("busy", "busy"), Session("other", "other")
+            requests = [scheduler.submit(busy, 10) for _ in range(3)]
+            requests.append(scheduler.submit(other, 10))
+            await asyncio.gather(*requests)
+            await scheduler.close()
+
+    _run(run)
+    assert searched == ["busy", "other", "busy", "busy"]
+
+
+def test_scheduler_expires_queued_requests():
+    async def run(_):
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            scheduler = SearchScheduler(executor, 1)
+            with pytest.raises(server.DeadlineExceeded):
+                await scheduler.submit(Session("1"), 0)
+            await scheduler.close()
+            return scheduler.metrics()
+
+    assert _run(run)["expired"] == 1
+
+
+def test_scheduler_rejects_full_queue():
+    async def run(_):
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            scheduler = SearchScheduler(executor, 1, max_queued=1)
+            first = asyncio.ensure_future(scheduler.submit(Session("1"), 10))
+            await asyncio.sleep(0)
+            with pytest.raises(server.ServerError):
+                await scheduler.submit(Session("2"), 10)
+            first.cancel()
+            await scheduler.close()
+
+    _run(run)
+
+
+def _http_request(request):
+    """Sends the raw request to a game server, returning the raw response"""
+
+    async def run(game_server):
+        tcp_server = await asyncio.start_server(
+            game_server.handle_connection, "127.0.0.1", 0
+        )
+        port = tcp_server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        response = await reader.read()
+        writer.close()
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        return response
+
+    return _run(run)
+
+
+def test_http_connection():
+    body = json.dumps({"depth": 1}).encode()
+    response = _http_request(
+        b"POST /games HTTP/1.1\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    headers, _, body = response.partition(b"\r\n\r\n")
+    assert headers.startswith(b"HTTP/1.1 201 Created")
+    assert json.loads(body)["moves"] == []
+
+
+@pytest.mark.parametrize(
+    "headers, body, status",
+    [
+        (f"Content-Length: {server.MAX_BODY + 1}", b"", 413),
+        ("Content-Length: 5", b"{fen:", 400),
+        ("Content-Length: 2", b"[]", 400),
+        ("Content-Length: five", b"", 400),
+    ],
+)
+def test_http_invalid_requests(headers, body, status):
+    response = _http_request(
+        f"POST /games HTTP/1.1\r\n{headers}\r\n\r\n".encode() + body
+    )
+    headers, _, body = response.partition(b"\r\n\r\n")
+    assert headers.startswith(f"HTTP/1.1 {status} ".encode())
+    assert b"Connection: close" in headers
+    assert "error" in json.loads(body)
+
+
+def test_search_game_replays_moves():
+    result = server.search_game(MATE_IN_ONE, [], SearchLimits(depth=2))
+    assert result.bestmove == "a1a8"
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import pickle
+
+import pytest
+
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.engine import EVALUATIONS
+from chess_ng.fen import construct_fen_notation, load_board
+from chess_ng.game import Game, GameParams
+from chess_ng.nnue import NnueEvaluation, random_network
+from chess_ng.piece import Pawn, Queen
+from chess_ng.snapshot import (
+    decode_piece,
+    encode_piece,
+    restore_position,
+    snapshot_position,
+)
+
+
+def _move(board, teams, source, destination):
+    piece = board[source]
+    enemy = teams[BLACK if piece.team == WHITE else WHITE]
+    board.move_piece_and_capture(destination, piece, enemy.pieces, log=False)
+
+
+# pylint: disable=missing-function-docstring
+def test_encode_piece_round_trip():
+    board, teams, _ = load_board("4k3/P7/8/8/8/8/8/4K2Q w - - 0 1")
+    _move(board, teams, (0, 1), (0, 0))
+    pawn, queen = board[0, 0], board[7, 7]
+    queen.depth_counter = 1
+    restored_pawn = decode_piece(encode_piece(pawn), pawn.position)
+    restored_queen = decode_piece(encode_piece(queen), queen.position)
+    assert isinstance(restored_pawn, Pawn) and restored_pawn.promoted
+    assert restored_pawn.representation == pawn.representation == "Q1"
+    assert restored_pawn.position_history
+    assert isinstance(restored_queen, Queen) and restored_queen.depth_counter == 1
+    assert not restored_queen.position_history
+
+
+def test_pickle_piece():
+    board, *_ = load_board("4k3/8/8/8/8/8/8/4K2R w - - 0 1")
+    rook = board[7, 7]
+    restored = pickle.loads(pickle.dumps(rook))
+    assert restored.representation == rook.representation
+    assert restored.position == rook.position
+    assert restored.team == rook.team
+
+
+def test_snapshot_position_round_trip():
+    board, teams, _ = load_board("r3k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    _move(board, teams, (0, 7), (0, 0))  # captures the rook
+    _move(board, teams, (4, 0), (3, 0))
+    snapshot = snapshot_position(board, teams)
+    restored_board, restored_teams = restore_position(snapshot)
+    assert construct_fen_notation(restored_board, WHITE) == construct_fen_notation(
+        board, WHITE
+    )
+    assert [x.representation for x in restored_teams[WHITE].pieces] == [
+        x.representation for x in teams[WHITE].pieces
+    ]
+    assert len(snapshot.captured) == 0
+    assert [
+        (square, capture) for _, square, capture in restored_board.move_history
+    ] == [
+        ((0, 0), True),
+        ((3, 0), False),
+    ]
+    assert restored_board[0, 0].position_history  # the moved rook cannot castle
+
+
+def test_snapshot_keeps_repetitions():
+    board, teams, _ = load_board("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    for _ in range(3):
+        _move(board, teams, (0, 7), (0, 6))
+        _move(board, teams, (4, 0), (3, 0))
+        _move(board, teams, (0, 6), (0, 7))
+        _move(board, teams, (3, 0), (4, 0))
+    assert board.is_draw_by_repetition()
+    restored_board, _ = restore_position(snapshot_position(board, teams))
+    assert restored_board.is_draw_by_repetition()
+
+
+def test_snapshot_indexes_captured_pieces():
+    board, teams, _ = load_board("4k3/8/8/8/8/8/r7/R3K3 w - - 0 1")
+    _move(board, teams, (4, 7), (3, 7))
+    _move(board, teams, (0, 6), (1, 6))
+    _move(board, teams, (1, 6), (1, 7))
+    _move(board, teams, (0, 7), (1, 7))  # captures the rook which moved twice
+    snapshot = snapshot_position(board, teams)
+    assert len(snapshot.captured) == 1
+    restored_board, restored_teams = restore_position(snapshot)
+    history = restored_board.move_history
+    assert history[1][0] is history[2][0]
+    assert history[1][0].captured
+    assert history[3][2]
+    assert len(restored_teams[BLACK].pieces) == 1
+
+
+def test_pickle_game():
+    game = Game.create_default()
+    for _ in range(6):
+        game.run_team(GameParams(depth=1))
+        game.player = game.team.representation
+    restored = pickle.loads(pickle.dumps(game))
+    assert construct_fen_notation(restored.board, restored.side_to_move) == (
+        construct_fen_notation(game.board, game.side_to_move)
+    )
+    assert restored.side_to_move == game.side_to_move
+    assert len(restored.board.move_history) == len(game.board.move_history)
+    assert restored.run_team(GameParams(depth=1)) is not None
+    assert b"chess_ng.piece" not in pickle.dumps(game)
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        EVALUATIONS["moves"],
+        EVALUATIONS["move-distance"],
+        EVALUATIONS["pst"],
+        lambda: NnueEvaluation(network=random_network((8,), seed=0)),
+    ],
+)
+def test_pickle_evaluation_drops_incremental_state(factory):
+    board, teams, _ = load_board(STARTING_FEN)
+    evaluation = factory()
+    evaluation(board, teams[WHITE], teams[BLACK])
+    data = pickle.dumps(evaluation)
+    assert b"chess_ng.piece" not in data
+    _move(board, teams, (4, 6), (4, 4))
+    restored = pickle.loads(data)
+    assert restored(board, teams[WHITE], teams[BLACK]) == factory()(
+        board, teams[WHITE], teams[BLACK]
+    )
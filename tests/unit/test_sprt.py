@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import json
+import math
+
+import pytest
+
+from chess_ng.sprt import H0, H1, Sprt, expected_score, write_snapshot
+from chess_ng.tournament import EngineConfig, run_tournament
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+
+
+# pylint: disable=missing-function-docstring
+def test_expected_score():
+    assert expected_score(0) == 0.5
+    assert expected_score(400) == pytest.approx(10 / 11)
+    assert expected_score(-100) == pytest.approx(1 - expected_score(100))
+
+
+def test_bounds():
+    lower, upper = Sprt(0, 5, alpha=0.05, beta=0.05).bounds
+    assert upper == pytest.approx(math.log(19))
+    assert lower == pytest.approx(-math.log(19))
+
+
+@pytest.mark.parametrize(
+    "elo0,elo1,alpha,beta", [(5, 0, 0.05, 0.05), (0, 5, 0, 0.05), (0, 5, 0.05, 1)]
+)
+def test_invalid_parameters(elo0, elo1, alpha, beta):
+    with pytest.raises(ValueError):
+        Sprt(elo0, elo1, alpha, beta)
+
+
+def test_llr():
+    test = Sprt(0, 10)
+    assert test.llr(0, 0, 0) == 0
+    assert test.llr(300, 200, 500) > 0
+    assert test.llr(200, 300, 500) < 0
+    # the ratio grows with the amount of games at the same score
+    assert test.llr(600, 400, 1000) > test.llr(300, 200, 500)
+
+
+def test_status():
+    test = Sprt(0, 10)
+    assert test.status(10, 8, 20) is None
+    assert test.status(3000, 2000, 5000) == H1
+    assert test.status(2000, 3000, 5000) == H0
+    # results without spread still end the test
+    assert Sprt(0, 200).status(10, 0, 0) == H1
+    assert Sprt(0, 200).status(0, 0, 200) == H0
+
+
+def test_snapshot(tmp_path):
+    test = Sprt(0, 10)
+    write_snapshot(str(tmp_path / "progress.json"), test.snapshot(30, 20, 50))
+    with open(tmp_path / "progress.json", encoding="utf-8") as file:
+        snapshot = json.load(file)
+    assert snapshot["games"] == 100
+    assert snapshot["llr"] == pytest.approx(test.llr(30, 20, 50))
+    assert snapshot["status"] is None
+    assert "LLR" in test.format(30, 20, 50)
+
+
+def test_stops_tournament():
+    test = Sprt(-400, 0)
+    engines = [EngineConfig("a", depth=1), EngineConfig("b", depth=1)]
+    games = []
+
+    def stop(standings):
+        return test.status(*standings.record("a", "b")) is not None
+
+    run_tournament(engines, [MATE_IN_ONE], rounds=50, on_game=games.append, stop=stop)
+    assert 0 < len(games) < 100
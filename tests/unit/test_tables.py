@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+from chess_ng.tables import (
+    EXACT,
+    LOWER_BOUND,
+    HistoryTable,
+    KillerTable,
+    TranspositionTable,
+)
+
+
+# pylint: disable=missing-function-docstring
+def test_transposition_table_keeps_deeper_entry():
+    table = TranspositionTable()
+    table.store("a", 1, depth=3, flag=EXACT)
+    table.store("a", 2, depth=1, flag=LOWER_BOUND)
+    assert table.get("a").score == 1
+
+    table.new_generation()
+    table.store("a", 2, depth=1, flag=LOWER_BOUND)
+    assert table.get("a").score == 2
+
+
+def test_transposition_table_ages_entries():
+    table = TranspositionTable(max_entries=2)
+    table.store("a", 1, depth=1, flag=EXACT)
+    table.store("b", 1, depth=1, flag=EXACT)
+    table.store("c", 1, depth=1, flag=EXACT)
+    assert table.get("c") is None  # full, nothing old enough to evict
+
+    table.new_generation()
+    table.new_generation()
+    table.store("c", 1, depth=1, flag=EXACT)
+    assert table.get("c") is not None
+    assert table.get("a") is None
+    assert len(table) == 1
+
+
+def test_killer_table():
+    killers = KillerTable()
+    for move in ["a", "b", "c", "c"]:
+        killers.add(3, move)
+    assert killers[3] == ["c", "b"]
+    killers.shift(2)
+    assert killers[1] == ["c", "b"]
+    assert killers[3] == []
+    killers.clear()
+    assert killers[1] == []
+
+
+def test_history_table():
+    history = HistoryTable()
+    history.add("a", depth=3)
+    history.add("b", depth=1)
+    history.decay()
+    assert history["a"] == 4
+    assert history["b"] == 0
+    history.clear()
+    assert history["a"] == 0
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import math
+
+import pytest
+
+from chess_ng.tournament import (
+    EngineConfig,
+    GameRecord,
+    Standings,
+    elo_difference,
+    parse_engine,
+    play_game,
+    run_tournament,
+    schedule,
+)
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+STALEMATE = "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"
+FORCED_MATE = "k7/8/1K6/8/8/8/8/7R b - - 0 1"
+
+
+# pylint: disable=missing-function-docstring
+def test_parse_engine():
+    engine = parse_engine("name=pst,depth=4,eval=pst,movetime=0.5,nodes=1000")
+    assert engine == EngineConfig("pst", 4, "pst", 0.5, 1000)
+    assert parse_engine("depth=2").name == "depth=2"
+
+
+@pytest.mark.parametrize("spec", ["depth", "depth=x", "colour=white", "eval=foo"])
+def test_parse_invalid_engine(spec):
+    with pytest.raises(ValueError):
+        parse_engine(spec)
+
+
+def test_schedule_swaps_colours():
+    engines = [EngineConfig("a"), EngineConfig("b"), EngineConfig("c")]
+    games = list(schedule(engines, ["fen1", "fen2"], rounds=2))
+    assert len(games) == 2 * 2 * 3 * 2
+    assert [game_id for game_id, *_ in games] == list(range(len(games)))
+    pairs = [(white.name, black.name, fen) for _, white, black, fen in games]
+    assert pairs[:2] == [("a", "b", "fen1"), ("b", "a", "fen1")]
+    assert pairs.count(("c", "a", "fen2")) == 2
+
+
+def test_elo_difference():
+    assert elo_difference(3, 1, 0)[0] == pytest.approx(190.85, abs=0.01)
+    elo, error = elo_difference(30, 10, 20)
+    assert elo == pytest.approx(120.41, abs=0.01)
+    assert 0 < error < elo
+    assert elo_difference(5, 5, 10)[0] == 0
+    assert elo_difference(0, 0, 0) == (0, math.inf)
+    assert elo_difference(2, 0, 0)[0] == math.inf
+
+
+def test_play_game_checkmate():
+    record = play_game(0, EngineConfig("a", depth=2), EngineConfig("b"), MATE_IN_ONE)
+    assert record.result == "1-0"
+    assert record.termination == "checkmate"
+    assert record.moves == ["Ra8#"]
+    assert record.uci_moves == ["a1a8"]
+    assert '[FEN "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"]' in record.to_pgn()
+
+
+def test_play_game_forced_mate():
+    # every move of black loses to a mate within the depth
+    engines = EngineConfig("a", depth=3), EngineConfig("b", depth=3)
+    record = play_game(0, *engines, FORCED_MATE)
+    assert (record.result, record.termination) == ("1-0", "checkmate")
+    assert record.uci_moves == ["a8b8", "h1h8"]
+
+
+def test_play_game_draws():
+    record = play_game(0, EngineConfig("a"), EngineConfig("b"), STALEMATE)
+    assert (record.result, record.termination) == ("1/2-1/2", "stalemate")
+    record = play_game(
+        0, EngineConfig("a", depth=1), EngineConfig("b", depth=1), max_plies=4
+    )
+    assert (record.result, record.termination) == ("1/2-1/2", "max plies")
+    assert len(record.moves) == 4
+
+
+def test_run_tournament():
+    engines = [EngineConfig("a", depth=2), EngineConfig("b", depth=2)]
+    games = []
+    standings = run_tournament(engines, [MATE_IN_ONE], on_game=games.append)
+    assert len(games) == 2
+    assert standings.record("a") == (1, 1, 0)
+    assert standings.record("a", "b") == (1, 1, 0)
+    table = standings.format()
+    assert "a vs b: +1 -1 =0" in table
+
+
+def test_run_tournament_needs_unique_engines():
+    with pytest.raises(ValueError):
+        run_tournament([EngineConfig("a"), EngineConfig("a")], [MATE_IN_ONE])
+
+
+def test_standings():
+    standings = Standings(["a", "b"])
+    standings.add(GameRecord(0, "a", "b", "", result="1-0"))
+    standings.add(GameRecord(1, "b", "a", "", result="1/2-1/2"))
+    assert standings.record("a") == (1, 0, 1)
+    assert standings.record("b") == (0, 1, 1)
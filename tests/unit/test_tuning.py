@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import numpy as np
+import pytest
+
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
+from chess_ng.pst import PstEvaluation, default_tables, evaluate_pst, save_tables
+from chess_ng.tuning import (
+    LabelError,
+    build_dataset,
+    encode_features,
+    initial_parameters,
+    load_dataset,
+    parse_labelled,
+    scores,
+    to_tables,
+    tune,
+)
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "4k3/1P4P1/8/3q4/3Q4/8/1p4p1/4K3 b - - 1 1",
+    "4k3/8/8/8/3N4/8/8/4K3 w - - 0 1",
+]
+
+
+# pylint: disable=missing-function-docstring
+@pytest.mark.parametrize(
+    "line,fen,result",
+    [
+        ("4k3/8/8/8/8/8/8/4K3 w - - 0 1 [0.5]", "4k3/8/8/8/8/8/8/4K3 w - - 0 1", 0.5),
+        ("4k3/8/8/8/8/8/8/4K3 w - - 0 1 [1.0]", "4k3/8/8/8/8/8/8/4K3 w - - 0 1", 1),
+        ("4k3/8/8/8/8/8/8/4K3 b - - 0 1; 0-1", "4k3/8/8/8/8/8/8/4K3 b - - 0 1", 0),
+        ("4k3/8/8/8/8/8/8/4K3 w - - | 0.25", "4k3/8/8/8/8/8/8/4K3 w - -", 0.25),
+        ('4k3/8/8/8/8/8/8/4K3 w - - c9 "1-0";', "4k3/8/8/8/8/8/8/4K3 w - -", 1),
+        ('4k3/8/8/8/8/8/8/4K3 w - - c9 "1/2-1/2";', "4k3/8/8/8/8/8/8/4K3 w - -", 0.5),
+    ],
+)
+def test_parse_labelled(line, fen, result):
+    assert parse_labelled(line) == (fen, result)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "4k3/8/8/8/8/8/8/4K3 w - - 0 1",
+        "4k3/8/8/8/8/8/8/4K3 w - - 0 1 [2.0]",
+        '4k3/8/8/8/8/8/8/4K3 w - - c9 "win";',
+    ],
+)
+def test_parse_invalid_labels(line):
+    with pytest.raises(LabelError):
+        parse_labelled(line)
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_features_match_pst_evaluation(fen):
+    features, phase = encode_features(fen)
+    score = scores(
+        features[np.newaxis].astype(np.float32),
+        np.array([min(phase, 24) / 24], dtype=np.float32),
+        initial_parameters(),
+    )[0]
+    board, teams, _ = load_board(fen)
+    expected = evaluate_pst(board, teams[WHITE], teams[BLACK])
+    assert score / 100 == pytest.approx(expected, abs=1e-4)
+
+
+def test_build_and_load_dataset(tmp_path):
+    lines = [f"{fen} [{i / 4}]" for i, fen in enumerate(FENS)]
+    lines += ["", "# comment", "invalid line"]
+    dataset = build_dataset(lines, str(tmp_path), chunk_size=2)
+    assert len(dataset) == len(FENS)
+    loaded = load_dataset(str(tmp_path))
+    assert isinstance(loaded.features, np.memmap)
+    assert np.array_equal(loaded.features[1], encode_features(FENS[1])[0])
+    assert loaded.phases[0] == 24
+    assert loaded.results.tolist() == [0, 0.25, 0.5, 0.75]
+
+
+def test_tune_reduces_error(tmp_path):
+    # white wins whenever it has an extra knight, black wins otherwise
+    lines = [f"4k3/8/8/8/{i}N{7 - i}/8/8/4K3 w - - 0 1 [1.0]" for i in range(8)] + [
+        f"4k3/8/8/8/8/{i}n{7 - i}/8/4K3 w - - 0 1 [0.0]" for i in range(8)
+    ]
+    dataset = build_dataset(lines * 8, str(tmp_path / "data"))
+    result = tune(dataset, epochs=5, batch_size=16, learning_rate=5.0, k=1.0, seed=0)
+    assert len(result.errors) == 6
+    assert result.errors[-1] < result.errors[0]
+
+    save_tables(tmp_path / "pst.json", *to_tables(result.parameters))
+    evaluation = PstEvaluation(mobility_weight=0, path=tmp_path / "pst.json")
+    board, teams, _ = load_board(lines[0])
+    assert evaluation(board, teams[WHITE], teams[BLACK]) > evaluate_pst(
+        board, teams[WHITE], teams[BLACK]
+    )
+
+
+def test_initial_parameters_are_default_tables():
+    assert to_tables(initial_parameters()) == default_tables()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import io
+import math
+import time
+
+import pytest
+
+from chess_ng.consts import BLACK, WHITE
+from chess_ng.fen import construct_fen_notation
+from chess_ng.uci import (
+    MAX_DEPTH,
+    UciEngine,
+    allocate_time,
+    format_score,
+    parse_go,
+    table_entries,
+)
+
+MATE_IN_ONE = "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1"
+
+
+def _engine():
+    output = io.StringIO()
+    return UciEngine(output), output
+
+
+def _lines(output):
+    return output.getvalue().splitlines()
+
+
+def _placement(engine):
+    return construct_fen_notation(engine.board, engine.side_to_move).split()[0]
+
+
+# pylint: disable=missing-function-docstring
+def test_uci_handshake():
+    engine, output = _engine()
+    engine.handle("uci")
+    engine.handle("isready")
+    lines = _lines(output)
+    assert lines[0] == "id name chess_ng"
+    assert "option name Hash type spin default 16 min 1 max 1024" in lines
+    assert lines[-2:] == ["uciok", "readyok"]
+
+
+def test_unknown_command_is_reported():
+    engine, output = _engine()
+    assert engine.handle("foo bar")
+    assert engine.handle("")
+    assert not engine.handle("quit")
+    assert _lines(output) == ["info string Unknown command foo"]
+
+
+def test_position_startpos_moves():
+    engine, _ = _engine()
+    engine.handle("position startpos moves e2e4 e7e5 g1f3")
+    assert engine.side_to_move == BLACK
+    assert (
+        _placement(engine).rstrip("/")
+        == "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R"
+    )
+
+
+def test_position_with_castling_and_en_passant():
+    engine, _ = _engine()
+    engine.handle(
+        "position fen 4k3/8/8/8/3p4/8/4P3/4K2R w K - 0 1 moves e2e4 d4e3 e1g1"
+    )
+    assert engine.side_to_move == BLACK
+    assert _placement(engine).rstrip("/") == "4k3/8/8/8/8/4p3/8/5RK1"
+    assert len(engine.teams[WHITE].pieces) == 2
+
+
+def test_illegal_move_is_reported():
+    engine, output = _engine()
+    engine.handle("position startpos moves e2e5")
+    assert _lines(output)[0].startswith("info string Invalid command")
+    assert engine.side_to_move == WHITE
+
+
+def test_set_option_hash():
+    engine, _ = _engine()
+    engine.handle("setoption name Hash value 1")
+    assert engine.minimax.transposition_table.max_entries == table_entries(1)
+    engine.handle("setoption name Threads value 4")
+    assert engine.threads == 1
+    engine.handle("setoption name Evaluation value pst")
+    assert engine.evaluation == "pst"
+
+
+def test_parse_go():
+    limits, infinite = parse_go(["depth", "4", "nodes", "1000"], WHITE)
+    assert (limits.depth, limits.nodes, limits.movetime) == (4, 1000, math.inf)
+    assert not infinite
+    limits, _ = parse_go(["movetime", "500"], WHITE)
+    assert limits.movetime == 0.5
+    limits, _ = parse_go(["wtime", "1000", "btime", "60000"], WHITE)
+    assert limits.movetime == allocate_time(1)
+    limits, infinite = parse_go(["infinite"], BLACK)
+    assert (limits.depth, infinite) == (MAX_DEPTH, True)
+
+
+def test_allocate_time():
+    assert allocate_time(60, 1) == pytest.approx((60 - 0.05) / 30 + 0.8)
+    assert allocate_time(60, 0, moves_to_go=1) == pytest.approx((60 - 0.05) / 2)
+    assert allocate_time(0) == 0.01
+
+
+def test_format_score():
+    assert format_score(1.234, []) == "cp 123"
+    assert format_score(math.inf, ["a1a8"]) == "mate 1"
+    assert format_score(-math.inf, ["e2e4", "a1a8", "g2g3"]) == "mate -2"
+
+
+def test_go_depth_reports_info_and_bestmove():
+    engine, output = _engine()
+    engine.run(io.StringIO(f"position fen {MATE_IN_ONE}\ngo depth 2\n"))
+    lines = _lines(output)
+    assert lines[0].startswith("info depth 1 score cp")
+    assert "score mate 1" in lines[-2]
+    assert lines[-1] == "bestmove a1a8"
+
+
+def test_go_infinite_waits_for_stop():
+    engine, output = _engine()
+    engine.handle(f"position fen {MATE_IN_ONE}")
+    engine.handle("go infinite")
+    time.sleep(0.5)
+    assert not any(line.startswith("bestmove") for line in _lines(output))
+    engine.handle("stop")
+    assert _lines(output)[-1] == "bestmove a1a8"
+
+
+def test_run_finishes_last_search():
+    engine, output = _engine()
+    engine.run(io.StringIO("position startpos\ngo nodes 200\n"))
+    assert _lines(output)[-1].startswith("bestmove")
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# type: ignore
+import numpy as np
+import pytest
+
+from chess_ng import hashing
+from chess_ng.algorithm import Minimax
+from chess_ng.consts import BLACK, STARTING_FEN, WHITE
+from chess_ng.fen import load_board
+from chess_ng.vectorized import (
+    PIECE_CODES,
+    ArrayEvaluation,
+    MaterialEvaluation,
+    encode_board,
+    square_index,
+)
+
+FENS = [
+    STARTING_FEN,
+    "r3k2r/pP3ppp/2n2n2/3pp3/2BPP3/2N2N2/Pp3PPP/R3K2R w - - 1 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b - - 1 1",
+]
+
+
+# pylint: disable=missing-function-docstring
+def test_encode_board():
+    board, _, _ = load_board(STARTING_FEN)
+    position = encode_board(board)
+    assert position.shape == (64,)
+    assert np.count_nonzero(position) == 32
+    assert position[square_index((4, 7))] == PIECE_CODES["K1"]
+
+
+def test_material_evaluation():
+    board, teams, _ = load_board("4k3/8/8/8/8/8/q7/RR2K3 w - - 1 1")
+    evaluation = MaterialEvaluation()
+    assert evaluation(board, teams[WHITE], teams[BLACK]) == 1
+    assert evaluation(board, teams[BLACK], teams[WHITE]) == -1
+
+
+def test_array_evaluation_is_abstract():
+    with pytest.raises(TypeError):
+        ArrayEvaluation()  # pylint: disable=abstract-class-instantiated
+
+
+def test_encode_move_promotes_pawns():
+    board, teams, _ = load_board("4k3/1P6/8/8/8/8/8/4K3 w - - 1 1")
+    evaluation = MaterialEvaluation()
+    position = evaluation.encode(board)
+    pawn = board[1, 1]
+    evaluation.encode_move(position, pawn, (1, 0))
+    assert position[square_index((1, 0))] == PIECE_CODES["Q1"]
+    assert evaluation.evaluate_batch(position[np.newaxis], teams[WHITE], None) == [9]
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_batch_search_matches_scalar_search(fen):
+    """Searches with a plain function lacking evaluate_batch for comparison"""
+    evaluation = MaterialEvaluation()
+    results = []
+    for function in (evaluation, lambda *args: evaluation(*args)):
+        board, teams, side = load_board(fen)
+        other = BLACK if side == WHITE else WHITE
+        minimax = Minimax(function, hashing.get_all_hash_values())
+        results.append(minimax.run(board, teams[side], teams[other], 2, True)[0])
+    assert results[0] == results[1]